@@ -0,0 +1,91 @@
+"""
+Micro-benchmark for AllergiesEncoder encode/decode.
+
+Compares the table-driven encoder against the previous list-scanning
+implementation on large allergen lists, and the vectorized bulk API
+against a per-profile loop.
+
+Usage:
+    python benchmarks/bench_encoder.py [repeats]
+"""
+
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from allergies_encoder import AllergiesEncoder
+
+
+def linear_encode_all(encoder: AllergiesEncoder, allergens: list[str]) -> list[int]:
+    """Reference copy of the old algorithm: list membership and list.index per allergen."""
+    allergens = [a.lower() for a in allergens]
+    unique = []
+    for allergen in allergens:
+        if allergen not in unique:
+            unique.append(allergen)
+    for allergen in unique:
+        if allergen not in encoder.all_list:
+            raise ValueError(f"Allergen '{allergen}' not recognized.")
+
+    def encode(active, ref_list):
+        encoding = 0
+        for allergen in active:
+            if allergen in ref_list:
+                encoding |= 1 << ref_list.index(allergen)
+        return encoding
+
+    main = encode([a for a in unique if a in encoder.lists['main']], encoder.lists['main'])
+    secondary = [a for a in unique if a not in encoder.lists['main']]
+    subgroups = {}
+    for group, allergen_list in encoder.lists.items():
+        if group == 'main':
+            continue
+        for allergen in secondary:
+            if allergen in allergen_list:
+                subgroups.setdefault(group, set()).add(allergen)
+    map_encode = encode(list(subgroups), [0, 1, 2, 3, 4, 5])
+    group_5 = subgroups.pop(5, None)
+    if group_5:
+        map_encode |= encode(list(group_5), encoder.lists[5]) << 6
+    return [main, map_encode, *[encode(list(subgroups[g]), encoder.lists[g]) for g in subgroups]]
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    encoder = AllergiesEncoder()
+    random.seed(0)
+
+    # Large profiles: every allergen, shuffled and repeated with mixed case
+    profile = encoder.all_list * 20
+    random.shuffle(profile)
+    profile = [a.upper() if i % 3 == 0 else a for i, a in enumerate(profile)]
+    encoded = encoder.encode_all(profile)
+    assert encoded == linear_encode_all(encoder, profile)
+
+    print(f"Profile size: {len(profile)} allergens, {repeats} repeats")
+    for label, fn in [
+        ("encode_all (tables)", lambda: encoder.encode_all(profile)),
+        ("encode_all (linear)", lambda: linear_encode_all(encoder, profile)),
+        ("decode_all", lambda: encoder.decode_all(encoded)),
+    ]:
+        seconds = timeit.timeit(fn, number=repeats)
+        print(f"  {label:<22} {seconds / repeats * 1e6:9.1f} us/call")
+
+    # Bulk re-encode of many small profiles
+    n_profiles = 100_000
+    profiles = [random.sample(encoder.allergen_columns, random.randint(0, 8)) for _ in range(n_profiles)]
+    matrix = encoder.profiles_to_matrix(profiles)
+    print(f"Bulk: {n_profiles} profiles")
+    for label, fn in [
+        ("encode_all loop", lambda: [encoder.encode_all(p) for p in profiles]),
+        ("encode_many", lambda: encoder.encode_many(matrix)),
+        ("decode_many", lambda: encoder.decode_many(encoder.encode_many(matrix))),
+    ]:
+        seconds = timeit.timeit(fn, number=1)
+        print(f"  {label:<22} {seconds * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark OCR image preprocessing.
+
+Compares the old fixed 2x upscale (full decode, then resize) against the
+adaptive pipeline in menu_ocr.preprocess_image (draft-mode decode, scale
+chosen from measured text height). Each run happens in a fresh interpreter
+so peak RSS reflects that one image only.
+
+Usage:
+    python benchmarks/bench_preprocess.py [image or folder ...]   (default: menu.jpg/)
+"""
+
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def legacy_preprocess(image_path):
+    """Reference copy of the old preprocessing."""
+    from PIL import Image, ImageOps
+    img = Image.open(image_path)
+    img = ImageOps.exif_transpose(img)
+    img = img.convert("L")
+    img = ImageOps.autocontrast(img)
+    return img.resize((img.width * 2, img.height * 2))
+
+
+def run_child(variant: str, image_path: str):
+    """Preprocess one image and print timing and memory as JSON."""
+    from menu_ocr import preprocess_image
+    fn = legacy_preprocess if variant == "legacy" else preprocess_image
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    img = fn(image_path)
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux
+    print(json.dumps({"seconds": seconds, "peak_mb": (peak - baseline) / 1024, "size": img.size}))
+
+
+def measure(variant: str, image_path: Path) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", variant, str(image_path)],
+        check=True, capture_output=True, text=True
+    )
+    return json.loads(out.stdout)
+
+
+def main():
+    from menu_ocr import IMAGE_EXTS
+
+    targets = [Path(a) for a in sys.argv[1:]] or [ROOT / "menu.jpg"]
+    images = []
+    for target in targets:
+        if target.is_dir():
+            images.extend(sorted(p for p in target.iterdir() if p.suffix.lower() in IMAGE_EXTS))
+        else:
+            images.append(target)
+    if not images:
+        raise SystemExit("No images to benchmark.")
+
+    print(f"{'image':<40} {'variant':<9} {'output':>12} {'ms':>8} {'peak MB':>8}")
+    for image in images:
+        for variant in ("legacy", "adaptive"):
+            r = measure(variant, image)
+            size = f"{r['size'][0]}x{r['size'][1]}"
+            print(f"{image.name[:40]:<40} {variant:<9} {size:>12} {r['seconds'] * 1e3:8.1f} {r['peak_mb']:8.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        run_child(sys.argv[2], sys.argv[3])
+    else:
+        main()
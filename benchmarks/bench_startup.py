@@ -0,0 +1,103 @@
+"""
+Benchmark Flask app cold start.
+
+Runs `create_app()` in fresh interpreters under `python -X importtime`,
+reports the slowest imports, and fails if start-up pulls in a heavy
+dependency or the median import time exceeds the budget. The heavy
+modules are only needed by specific routes (OCR, stored menus, the
+PostgreSQL word store) and must be imported there, not at start-up.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--budget-ms 400] [--top 15]
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).parent.parent
+
+# Top-level packages that must not be imported by create_app()
+HEAVY_MODULES = ("numpy", "pandas", "nltk", "PIL", "pytesseract", "tesserocr", "psycopg2", "dotenv")
+
+STARTUP_CODE = "from flaskr import create_app; create_app({'TESTING': True})"
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        (module, self µs, cumulative µs, nesting depth) for every import
+    """
+    imports = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            depth = (len(match.group(3)) - 1) // 2
+            imports.append((match.group(4), int(match.group(1)), int(match.group(2)), depth))
+    return imports
+
+
+def measure_startup(code: str = STARTUP_CODE) -> Dict:
+    """
+    Run `code` once in a fresh interpreter with -X importtime.
+
+    Returns:
+        Dictionary with "wall_seconds", "import_us" (sum of self times),
+        "imports" (parsed rows) and "heavy" (heavy packages that were imported)
+    """
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, check=True, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    imports = parse_importtime(out.stderr)
+    loaded = {module.split(".")[0] for module, _, _, _ in imports}
+    return {
+        "wall_seconds": wall,
+        "import_us": sum(self_us for _, self_us, _, _ in imports),
+        "imports": imports,
+        "heavy": sorted(loaded.intersection(HEAVY_MODULES)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure and guard Flask app cold start.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure")
+    parser.add_argument("--budget-ms", type=float, default=400.0, help="Median import-time budget")
+    parser.add_argument("--top", type=int, default=15, help="Slowest top-level imports to show")
+    args = parser.parse_args()
+
+    runs = [measure_startup() for _ in range(args.runs)]
+    import_ms = statistics.median(r["import_us"] for r in runs) / 1e3
+    wall_ms = statistics.median(r["wall_seconds"] for r in runs) * 1e3
+
+    print(f"{'module':<40} {'cumulative ms':>14}")
+    top_level = [row for row in runs[-1]["imports"] if row[3] == 0]
+    for module, _, cumulative, _ in sorted(top_level, key=lambda row: row[2], reverse=True)[:args.top]:
+        print(f"{module:<40} {cumulative / 1e3:14.1f}")
+    print(f"\nmedian of {args.runs}: imports {import_ms:.1f} ms, process wall {wall_ms:.1f} ms "
+          f"(budget {args.budget_ms:.0f} ms)")
+
+    failures = []
+    heavy = sorted({module for r in runs for module in r["heavy"]})
+    if heavy:
+        failures.append(f"heavy modules imported at start-up: {', '.join(heavy)}")
+    if import_ms > args.budget_ms:
+        failures.append(f"import time {import_ms:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 import os
 import sys
-import csv
+import json
+import atexit
+import tempfile
+import threading
+import uuid
+from functools import partial
 from pathlib import Path
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
@@ -8,39 +13,6 @@ from flask_cors import CORS
 # Store encoded codes for decoding (in production, use a database)
 code_storage = {}
 
-def load_allergens_from_csv(file_paths):
-    '''Load allergens from given CSV files and return a list of allergen dictionaries.'''
-    unique_allergens = set()
-    
-    for file_path in file_paths:
-        if not os.path.exists(file_path):
-            print(f"Warning: {file_path} not found.")
-            continue
-            
-        with open(file_path, mode='r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            next(reader)  # Skip the header row
-            for row in reader:
-                if len(row) >= 2:
-                    # row[1] is the 'allergen' column
-                    allergen_name = row[1].strip()
-                    if allergen_name:
-                        unique_allergens.add(allergen_name)
-    
-    return unique_allergens
-
-# Define paths to your files
-project_root = os.path.dirname(os.path.dirname(__file__))
-
-csv_paths = [
-    os.path.join(project_root, 'data', 'allergens', 'main_allergens.csv'),
-    os.path.join(project_root, 'data', 'allergens', 'secondary_allergens.csv')
-]
-
-# Load the dynamic list
-ALLERGENS = load_allergens_from_csv(csv_paths)
-
-
 def decode_code(code):
     """Decode a three-word code back to allergen IDs."""
     code = code.lower().strip()
@@ -76,6 +48,8 @@ def create_app(test_config=None):
     # Load default config
     app.config.from_mapping(
         SECRET_KEY='dev',
+        # Bounds menu photo uploads
+        MAX_CONTENT_LENGTH=20 * 1024 * 1024,
     )
     
     if test_config is None:
@@ -89,9 +63,104 @@ def create_app(test_config=None):
     src_path = Path(__file__).parent.parent / "src"
     sys.path.insert(0, str(src_path))
     
-    # Import after adding to path
-    from run_filter_meals import filter_meals, HARDCODED_MENU
+    # Import after adding to path. Heavy dependencies (numpy, PIL, pytesseract,
+    # psycopg2) stay out of start-up: OCR and stored-menu modules are imported
+    # by the routes that use them, see benchmarks/bench_startup.py
+    from run_filter_meals import (
+        HARDCODED_MENU,
+        analyse_compiled_menu,
+        analyse_hardcoded_menu,
+        analyse_menu_image,
+        decode_allergen_phrases
+    )
+    from allergen_catalog import load_catalog
+    from getter_service import GetterService
+    from static_payload import StaticPayload
     from allergies_getter import AllergiesGetter
+    from menu_jobs import JobQueue, QueueFullError
+
+    # Allergen CSVs compiled once per process; the encoder shares this catalog
+    allergen_catalog = load_catalog()
+    app.extensions['allergen_catalog'] = allergen_catalog
+
+    # Responses that only change on deploy: serialized, compressed and tagged once
+    cache_max_age = app.config.get('API_CACHE_MAX_AGE', 300)
+    allergens_payload = StaticPayload(
+        allergen_catalog.display_json,
+        version=allergen_catalog.digest,
+        max_age=cache_max_age
+    )
+    menu_payload = StaticPayload(
+        json.dumps({"success": True, "menu": HARDCODED_MENU}, separators=(',', ':')).encode('utf-8'),
+        max_age=cache_max_age
+    )
+
+    def payload_response(payload):
+        """Serve a StaticPayload, answering a matching If-None-Match with 304."""
+        headers = {'Cache-Control': payload.cache_control, 'Vary': 'Accept-Encoding'}
+        if any(request.if_none_match.contains_weak(etag) for etag in payload.etags):
+            response = app.response_class(status=304, headers=headers)
+            # The validator of the variant the client would get now
+            response.set_etag(payload.select(dict(request.accept_encodings))[1])
+            return response
+        encoding, etag, body = payload.select(dict(request.accept_encodings))
+        response = app.response_class(body, mimetype=payload.mimetype, headers=headers)
+        response.set_etag(etag)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+    # One getter per process: CSVs, DB connection and checks happen once
+    getter_service = GetterService(factory=partial(
+        AllergiesGetter,
+        cache_size=app.config.get('GETTER_CACHE_SIZE', 1024),
+        cache_ttl=app.config.get('GETTER_CACHE_TTL')
+    ))
+    app.extensions['allergies_getter'] = getter_service
+    atexit.register(getter_service.close)
+    if app.config.get('GETTER_WARMUP_ON_START'):
+        getter_service.warm_up_in_background()
+
+    # Uploaded menus are OCRed on background workers, never on request threads
+    menu_jobs = JobQueue(
+        workers=app.config.get('MENU_JOB_WORKERS', 2),
+        max_pending=app.config.get('MENU_JOB_MAX_PENDING', 100)
+    )
+    app.extensions['menu_jobs'] = menu_jobs
+    atexit.register(menu_jobs.shutdown, wait=False)
+    upload_dir = Path(app.config.get('MENU_UPLOAD_DIR') or Path(tempfile.gettempdir()) / 'menu_uploads')
+    upload_dir.mkdir(parents=True, exist_ok=True)
+
+    # Stored menus (restaurants, dishes and their precomputed encodings),
+    # opened on first use so start-up never waits on the database
+    menu_store_lock = threading.Lock()
+    menu_store_holder = []
+
+    def get_menu_store():
+        if not menu_store_holder:
+            with menu_store_lock:
+                if not menu_store_holder:
+                    from menu_store import open_menu_store
+                    store_path = app.config.get('MENU_STORE_PATH')
+                    if not store_path:
+                        os.makedirs(app.instance_path, exist_ok=True)
+                        store_path = os.path.join(app.instance_path, 'menus.sqlite3')
+                    menu_store_holder.append(open_menu_store(app.config.get('MENU_STORE', 'sqlite'), store_path))
+                    atexit.register(menu_store_holder[0].close)
+        return menu_store_holder[0]
+
+    def run_menu_job(image_path, allergen_phrases):
+        """Background job: OCR an uploaded menu and analyse it."""
+        try:
+            getter = getter_service.get() if allergen_phrases else None
+            return analyse_menu_image(
+                image_path,
+                allergen_phrases,
+                getter,
+                backend=app.config.get('MENU_OCR_BACKEND')
+            )
+        finally:
+            image_path.unlink(missing_ok=True)
     
     # Serve static files from frontend
     @app.route('/')
@@ -119,8 +188,7 @@ def create_app(test_config=None):
     @app.route('/api/allergens', methods=['GET'])
     def get_allergens():
         """Get list of all allergens."""
-        # Convert set to sorted list for JSON serialization
-        return jsonify({"allergens": sorted(list(ALLERGENS))})
+        return payload_response(allergens_payload)
 
     @app.route('/api/encode', methods=['POST'])
     def api_encode():
@@ -133,26 +201,26 @@ def create_app(test_config=None):
                 return jsonify({"error": "No allergens provided"}), 400
 
             # Use AllergiesGetter to encode allergens to words
-            with AllergiesGetter() as getter:
-                words = getter.allergies_to_words(allergens)
-                
-                # Check if any encoding failed
-                if any(w is None for w in words):
-                    return jsonify({
-                        "error": "Some allergens could not be encoded",
-                        "allergens": allergens,
-                        "words": words
-                    }), 400
-                
-                # Join words with spaces for the code
-                code = " ".join(words)
-                
+            getter = getter_service.get()
+            words = getter.allergies_to_words(allergens)
+            
+            # Check if any encoding failed
+            if any(w is None for w in words):
                 return jsonify({
-                    "success": True,
-                    "code": code,
-                    "words": words,
-                    "allergens": allergens
-                })
+                    "error": "Some allergens could not be encoded",
+                    "allergens": allergens,
+                    "words": words
+                }), 400
+            
+            # Join words with spaces for the code
+            code = " ".join(words)
+            
+            return jsonify({
+                "success": True,
+                "code": code,
+                "words": words,
+                "allergens": allergens
+            })
                 
         except ValueError as e:
             return jsonify({
@@ -180,32 +248,160 @@ def create_app(test_config=None):
                 return jsonify({"error": "Invalid code format"}), 400
 
             # Use AllergiesGetter to decode words to allergens
-            with AllergiesGetter() as getter:
-                allergens = getter.words_to_allergies(words)
-                
-                if allergens is None:
-                    return jsonify({
-                        "error": "Could not decode code. One or more words not found in database.",
-                        "code": code,
-                        "words": words
-                    }), 400
-                
+            getter = getter_service.get()
+            allergens = getter.words_to_allergies(words)
+            
+            if allergens is None:
                 return jsonify({
-                    "success": True,
+                    "error": "Could not decode code. One or more words not found in database.",
                     "code": code,
-                    "words": words,
-                    "allergens": allergens
-                })
+                    "words": words
+                }), 400
+            
+            return jsonify({
+                "success": True,
+                "code": code,
+                "words": words,
+                "allergens": allergens
+            })
                 
         except Exception as e:
             return jsonify({
                 "error": f"Server error: {str(e)}"
             }), 500
     
+    batch_max_items = app.config.get('BATCH_MAX_ITEMS', 10000)
+    batch_chunk_size = app.config.get('BATCH_CHUNK_SIZE', 1000)
+
+    def read_batch(key):
+        """Get the list under `key` in the JSON body, or an error response."""
+        data = request.get_json(silent=True)
+        items = data.get(key) if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            return None, (jsonify({"success": False, "error": f"Expected a non-empty '{key}' list"}), 400)
+        if len(items) > batch_max_items:
+            return None, (jsonify({
+                "success": False,
+                "error": f"Too many items ({len(items)}); the limit is {batch_max_items}"
+            }), 413)
+        return items, None
+
+    def batch_response(items, run_chunk):
+        """
+        Run run_chunk(items, offset) -> per-item result dicts over a batch.
+        
+        Clients accepting application/x-ndjson get one JSON line per item,
+        streamed chunk by chunk, then a {"done": true, ...} line; others get
+        a single JSON document.
+        """
+        best = request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson'])
+        if best == 'application/x-ndjson':
+            def generate():
+                failed = 0
+                try:
+                    for start in range(0, len(items), batch_chunk_size):
+                        for result in run_chunk(items[start:start + batch_chunk_size], start):
+                            failed += not result["success"]
+                            yield json.dumps(result) + '\n'
+                except Exception as e:
+                    yield json.dumps({"done": False, "error": f"Server error: {str(e)}"}) + '\n'
+                    return
+                yield json.dumps({"done": True, "count": len(items), "failed": failed}) + '\n'
+            return app.response_class(generate(), mimetype='application/x-ndjson')
+
+        try:
+            results = run_chunk(items, 0)
+        except Exception as e:
+            return jsonify({"success": False, "error": f"Server error: {str(e)}"}), 500
+        return jsonify({
+            "success": True,
+            "count": len(results),
+            "failed": sum(not result["success"] for result in results),
+            "results": results
+        })
+
+    @app.route('/api/encode/batch', methods=['POST'])
+    def api_encode_batch():
+        """
+        Encode many allergen lists at once; a bad item does not fail the batch.
+        
+        Expected JSON body:
+        {
+            "items": [["milk", "eggs"], ["peanuts"], ...]
+        }
+        """
+        items, error = read_batch('items')
+        if error:
+            return error
+        try:
+            getter = getter_service.get()
+        except Exception as e:
+            return jsonify({"success": False, "error": f"Server error: {str(e)}"}), 500
+
+        def run_chunk(chunk, offset):
+            valid = [
+                isinstance(item, list) and item and all(isinstance(a, str) for a in item)
+                for item in chunk
+            ]
+            encoded = iter(getter.allergies_to_words_batch([item for item, ok in zip(chunk, valid) if ok]))
+            results = []
+            for index, (item, ok) in enumerate(zip(chunk, valid), start=offset):
+                words, item_error = next(encoded) if ok else (None, "Item must be a non-empty list of allergen names")
+                if words is None:
+                    results.append({"index": index, "success": False, "allergens": item, "error": item_error})
+                else:
+                    results.append({
+                        "index": index,
+                        "success": True,
+                        "code": " ".join(words),
+                        "words": words,
+                        "allergens": item
+                    })
+            return results
+
+        return batch_response(items, run_chunk)
+
+    @app.route('/api/decode/batch', methods=['POST'])
+    def api_decode_batch():
+        """
+        Decode many codes at once; a bad code does not fail the batch.
+        
+        Expected JSON body:
+        {
+            "codes": ["word1 word2", "word3 word4", ...]
+        }
+        """
+        codes, error = read_batch('codes')
+        if error:
+            return error
+        try:
+            getter = getter_service.get()
+        except Exception as e:
+            return jsonify({"success": False, "error": f"Server error: {str(e)}"}), 500
+
+        def run_chunk(chunk, offset):
+            code_words = [code.strip().split() if isinstance(code, str) else [] for code in chunk]
+            decoded = iter(getter.words_to_allergies_batch([words for words in code_words if words]))
+            results = []
+            for index, (code, words) in enumerate(zip(chunk, code_words), start=offset):
+                allergens, item_error = next(decoded) if words else (None, "Invalid code format")
+                if allergens is None:
+                    results.append({"index": index, "success": False, "code": code, "error": item_error})
+                else:
+                    results.append({"index": index, "success": True, "code": code, "allergens": allergens})
+            return results
+
+        return batch_response(codes, run_chunk)
+
     @app.route('/health', methods=['GET'])
     def health_check():
         """Health check endpoint."""
-        return jsonify({"status": "healthy"})
+        return jsonify({
+            "status": "healthy",
+            "allergen_catalog": allergen_catalog.version,
+            "getter": getter_service.health(),
+            "menu_jobs": menu_jobs.stats()
+        })
     
     @app.route('/api/analyze-menu', methods=['POST'])
     def analyze_menu():
@@ -222,6 +418,7 @@ def create_app(test_config=None):
                 }), 400
             
             allergen_phrases = data['allergen_phrases']
+            menu_id = data.get('menu_id')
             
             if not isinstance(allergen_phrases, list) or len(allergen_phrases) == 0:
                 return jsonify({
@@ -229,15 +426,24 @@ def create_app(test_config=None):
                     "error": "allergen_phrases must be a non-empty list"
                 }), 400
             
-            # Filter meals using hardcoded menu
-            result = filter_meals(
-                allergen_phrases=allergen_phrases,
-                use_hardcoded_menu=True
-            )
+            # Decoding the user's phrases is served from the shared getter's cache
+            getter = getter_service.get()
+            decoded_allergens = decode_allergen_phrases(allergen_phrases, getter)
             
-            # Extract results
-            menu_results = result['all_results'][0]['results']
-            decoded_allergens = result.get('decoded_allergens', [])
+            if menu_id is None:
+                # The precompiled hardcoded menu
+                menu_results = analyse_hardcoded_menu(allergen_phrases, getter)
+            else:
+                # A stored menu, checked against its stored dish encodings
+                compiled = get_menu_store().load_compiled_menu(menu_id)
+                if compiled is None:
+                    return jsonify({
+                        "success": False,
+                        "error": f"Unknown menu id {menu_id}"
+                    }), 404
+                if not decoded_allergens:
+                    raise ValueError("Could not decode user's allergen phrases")
+                menu_results = analyse_compiled_menu(compiled, decoded_allergens)
             
             # Calculate stats
             total = len(menu_results)
@@ -246,6 +452,7 @@ def create_app(test_config=None):
             
             return jsonify({
                 "success": True,
+                "menu_id": menu_id,
                 "results": menu_results,
                 "user_allergen_phrases": allergen_phrases,
                 "user_allergens": decoded_allergens,
@@ -270,9 +477,231 @@ def create_app(test_config=None):
     @app.route('/api/menu', methods=['GET'])
     def get_menu():
         """Get the hardcoded menu structure."""
+        return payload_response(menu_payload)
+    
+    @app.route('/api/stored-menus', methods=['GET'])
+    def list_stored_menus():
+        """List the menus in the menu store."""
+        return jsonify({
+            "success": True,
+            "menus": get_menu_store().list_menus()
+        })
+    
+    @app.route('/api/stored-menus', methods=['POST'])
+    def add_stored_menu():
+        """
+        Store a restaurant menu; each dish's allergen encoding is computed once.
+        
+        Expected JSON body:
+        {
+            "restaurant": "ThaiAngle",
+            "name": "Dinner",
+            "items": [
+                {"meal": "Green Curry", "allergens": ["fish", "soybeans"]},
+                {"meal": "Pad Thai", "allergen_phrases": ["too", "harry"]},
+                ...
+            ]
+        }
+        """
+        try:
+            data = request.get_json()
+            
+            if not data or not data.get('restaurant') or not isinstance(data.get('items'), list):
+                return jsonify({
+                    "success": False,
+                    "error": "Expected restaurant and a list of items"
+                }), 400
+            
+            items = data['items']
+            if any(not isinstance(item, dict) or not item.get('meal') for item in items):
+                return jsonify({
+                    "success": False,
+                    "error": "Every item needs a meal name"
+                }), 400
+            
+            # Items given as encoded phrases are decoded once, here. A dish whose
+            # phrases don't decode is rejected: stored with no allergens it
+            # would be reported SAFE for everyone
+            if any('allergen_phrases' in item for item in items):
+                getter = getter_service.get()
+                decoded_items = []
+                for item in items:
+                    if 'allergen_phrases' not in item:
+                        decoded_items.append(item)
+                        continue
+                    phrases = item['allergen_phrases']
+                    allergens = None
+                    if isinstance(phrases, list) and all(isinstance(p, str) for p in phrases):
+                        try:
+                            allergens = getter.words_to_allergies(phrases) if phrases else []
+                        except Exception as e:
+                            app.logger.warning(f"Error decoding phrases {phrases} for '{item['meal']}': {e}")
+                    if allergens is None:
+                        return jsonify({
+                            "success": False,
+                            "error": f"Could not decode allergen phrases for '{item['meal']}'"
+                        }), 400
+                    decoded_items.append({"meal": item['meal'], "allergens": allergens})
+                items = decoded_items
+            
+            menu_id = get_menu_store().add_menu(
+                data['restaurant'],
+                items,
+                name=data.get('name'),
+                source=data.get('source')
+            )
+            return jsonify({
+                "success": True,
+                "menu_id": menu_id
+            }), 201
+        
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": f"Server error: {str(e)}"
+            }), 500
+    
+    @app.route('/api/stored-menus/<int:menu_id>', methods=['GET'])
+    def get_stored_menu(menu_id):
+        """Get a stored menu with its dishes."""
+        menu = get_menu_store().get_menu(menu_id)
+        if menu is None:
+            return jsonify({
+                "success": False,
+                "error": f"Unknown menu id {menu_id}"
+            }), 404
+        
+        return jsonify({
+            "success": True,
+            "menu": menu
+        })
+    
+    @app.route('/api/safe-dishes', methods=['GET'])
+    def find_safe_dishes():
+        """
+        Find stored dishes that are safe (or to avoid) for an allergen code.
+        
+        Query parameters: code (space-separated words), and optionally
+        restaurant, menu_id and avoid=true. Filtering runs in the database
+        on the stored dish encodings.
+        """
+        code = request.args.get('code', '')
+        words = code.strip().split()
+        if not words:
+            return jsonify({
+                "success": False,
+                "error": "No code provided"
+            }), 400
+        
+        menu_id = request.args.get('menu_id', type=int)
+        restaurant = request.args.get('restaurant')
+        avoid = request.args.get('avoid', '').lower() in ('1', 'true', 'yes')
+        
+        try:
+            # The code's words are the user's encoding; no decoding to names needed
+            encoding = getter_service.get().get_numbers_by_words(words)
+            if any(n is None for n in encoding):
+                return jsonify({
+                    "success": False,
+                    "error": f"Could not decode code: '{code}'. Invalid or unrecognized words."
+                }), 400
+            
+            dishes = get_menu_store().find_dishes(
+                encoding,
+                safe=not avoid,
+                restaurant=restaurant,
+                menu_id=menu_id
+            )
+            return jsonify({
+                "success": True,
+                "code": code,
+                "status": "AVOID" if avoid else "SAFE",
+                "dishes": dishes
+            })
+        
+        except (ValueError, IndexError) as e:
+            return jsonify({
+                "success": False,
+                "error": f"Invalid code '{code}': {e}"
+            }), 400
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": f"Server error: {str(e)}"
+            }), 500
+    
+    @app.route('/api/menus', methods=['POST'])
+    def upload_menu():
+        """
+        Upload a menu photo for OCR and allergen analysis.
+        
+        Expects multipart form data with an "image" file and, optionally,
+        "allergen_phrases" (repeated fields or one space/comma-separated value).
+        The work is queued; poll the returned status_url for the result.
+        """
+        image = request.files.get('image')
+        if image is None or not image.filename:
+            return jsonify({
+                "success": False,
+                "error": "Missing image file in form field 'image'"
+            }), 400
+        
+        from menu_ocr import IMAGE_EXTS
+        suffix = Path(image.filename).suffix.lower()
+        if suffix not in IMAGE_EXTS:
+            return jsonify({
+                "success": False,
+                "error": f"Unsupported image type '{suffix}'. Use one of: {', '.join(sorted(IMAGE_EXTS))}"
+            }), 400
+        
+        allergen_phrases = [
+            phrase
+            for value in request.form.getlist('allergen_phrases')
+            for phrase in value.replace(',', ' ').split()
+        ]
+        
+        image_path = upload_dir / f"{uuid.uuid4().hex}{suffix}"
+        image.save(image_path)
+        try:
+            job = menu_jobs.submit(
+                run_menu_job,
+                image_path,
+                allergen_phrases,
+                meta={"source_file": image.filename}
+            )
+        except (QueueFullError, RuntimeError) as e:
+            # Full, or shutting down
+            image_path.unlink(missing_ok=True)
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 503
+        
+        return jsonify({
+            "success": True,
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": f"/api/menus/{job.id}"
+        }), 202
+    
+    @app.route('/api/menus/<job_id>', methods=['GET'])
+    def get_menu_job(job_id):
+        """Get the status of an uploaded menu job, with its result once done."""
+        job = menu_jobs.get(job_id)
+        if job is None:
+            return jsonify({
+                "success": False,
+                "error": f"Unknown job id '{job_id}'"
+            }), 404
+        
         return jsonify({
             "success": True,
-            "menu": HARDCODED_MENU
+            **job.to_dict()
         })
     
     @app.route('/api/combine-codes', methods=['POST'])
@@ -282,7 +711,8 @@ def create_app(test_config=None):
         
         Expected JSON body:
         {
-            "codes": ["word1 word2", "word3 word4", ...]
+            "codes": ["word1 word2", "word3 word4", ...],
+            "method": "union"       (optional; "intersection" keeps shared allergens)
         }
         
         Returns:
@@ -299,59 +729,66 @@ def create_app(test_config=None):
         try:
             data = request.get_json()
             codes = data.get('codes', [])
+            method = data.get('method', 'union')
 
             if not codes or not isinstance(codes, list):
                 return jsonify({"error": "No codes provided or invalid format"}), 400
+            if method not in ('union', 'intersection'):
+                return jsonify({"error": f"Unknown method '{method}'; use 'union' or 'intersection'"}), 400
 
-            with AllergiesGetter() as getter:
-                all_allergens_set = set()
-                individual_results = []
-                
-                # Decode each code and collect all allergens
-                for code in codes:
-                    words = code.strip().split()
-                    
-                    if not words:
-                        return jsonify({
-                            "error": f"Invalid code format: '{code}'"
-                        }), 400
-                    
-                    # Decode this code
-                    allergens = getter.words_to_allergies(words)
-                    
-                    if allergens is None:
-                        return jsonify({
-                            "error": f"Could not decode code: '{code}'. Invalid or unrecognized words."
-                        }), 400
-                    
-                    # Add to combined set
-                    all_allergens_set.update(allergens)
-                    
-                    individual_results.append({
-                        "code": code,
-                        "allergens": allergens
-                    })
-                
-                # Convert set to sorted list for consistent encoding
-                combined_allergens_list = sorted(list(all_allergens_set))
-                
-                # Encode the combined allergens
-                combined_words = getter.allergies_to_words(combined_allergens_list)
-                
-                if any(w is None for w in combined_words):
+            getter = getter_service.get()
+            encoder = getter.encoder
+            
+            code_words = [code.strip().split() if isinstance(code, str) else [] for code in codes]
+            for code, words in zip(codes, code_words):
+                if not words:
                     return jsonify({
-                        "error": "Failed to encode combined allergens"
-                    }), 500
+                        "error": f"Invalid code format: '{code}'"
+                    }), 400
+            
+            # Resolve the words of every code in a single lookup
+            all_numbers = getter.get_numbers_by_words([w for words in code_words for w in words])
+            
+            encodings = []
+            offset = 0
+            for code, words in zip(codes, code_words):
+                numbers = all_numbers[offset:offset + len(words)]
+                offset += len(words)
                 
-                combined_code = " ".join(combined_words)
+                if any(n is None for n in numbers):
+                    return jsonify({
+                        "error": f"Could not decode code: '{code}'. Invalid or unrecognized words."
+                    }), 400
                 
+                encodings.append(numbers)
+            
+            # Merge the encodings bit by bit; no allergen names involved
+            try:
+                combined_encoding = encoder.combine_lists_of_encodings(encodings, method=method)
+            except ValueError as e:
+                return jsonify({"error": f"Could not combine codes: {str(e)}"}), 400
+            
+            individual_results = [
+                {"code": code, "allergens": encoder.decode_all(numbers)}
+                for code, numbers in zip(codes, encodings)
+            ]
+            
+            combined_words = getter.get_words_by_numbers(combined_encoding)
+            if any(w is None for w in combined_words):
                 return jsonify({
-                    "success": True,
-                    "combined_code": combined_code,
-                    "combined_words": combined_words,
-                    "combined_allergens": combined_allergens_list,
-                    "individual_allergens": individual_results
-                })
+                    "error": "Failed to encode combined allergens"
+                }), 500
+            
+            combined_code = " ".join(combined_words)
+            
+            return jsonify({
+                "success": True,
+                "method": method,
+                "combined_code": combined_code,
+                "combined_words": combined_words,
+                "combined_allergens": sorted(encoder.decode_all(combined_encoding)),
+                "individual_allergens": individual_results
+            })
                 
         except Exception as e:
             return jsonify({
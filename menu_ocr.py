@@ -1,26 +1,464 @@
+from abc import ABC, abstractmethod
+import importlib.util
+import math
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
 from pathlib import Path
-from PIL import Image, ImageOps
+from typing import Callable, Dict, Iterable, Iterator, Optional, Union
+import numpy
+from PIL import Image, ImageOps, ImageStat
 import pytesseract
+from pytesseract import TesseractNotFoundError
+
+from ocr_cache import OCRCache
 
 IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
 
-def ocr_single_image(image_path: Path, psm: int = 6) -> str:
-    img = Image.open(image_path)
-    img = ImageOps.exif_transpose(img)   # fixes phone rotation
-    img = img.convert("L")               # greyscale
+# Preprocessing targets: tesseract reads best with text lines roughly this tall
+TARGET_TEXT_HEIGHT = 40
+MIN_SCALE = 0.25
+MAX_SCALE = 4.0
+# Scale used when no text lines could be measured (the old fixed behaviour)
+DEFAULT_SCALE = 2.0
+# Cap on the pixels handed to tesseract, bounding memory per image
+MAX_OUTPUT_PIXELS = 16_000_000
+# Longest side of the low-resolution preview used to measure text height
+PREVIEW_SIDE = 1200
+
+
+def _open_reduced(image_path: Union[str, Path], factor: float) -> tuple[Image.Image, float]:
+    """
+    Decode an image as greyscale at (at least) `factor` of its full size.
+
+    JPEGs are decoded directly at 1/2, 1/4 or 1/8 resolution via draft mode,
+    other formats are box-reduced right after loading, so a large photo is
+    never held at full resolution when a smaller one will do.
+
+    Returns:
+        (EXIF-upright greyscale image, decoded width / original width)
+    """
+    with Image.open(image_path) as img:
+        width, height = img.size
+        if factor < 1:
+            img.draft("L", (math.ceil(width * factor), math.ceil(height * factor)))
+        img.load()
+        decoded_width = img.width
+        out = img.convert("L")
+    reduce_by = int(decoded_width / (width * factor))
+    if reduce_by >= 2:
+        out = out.reduce(reduce_by)
+    achieved = out.width / width
+    return ImageOps.exif_transpose(out), achieved
+
+
+def estimate_text_height(img: Image.Image, strips: int = 4) -> Optional[float]:
+    """
+    Estimate the typical text-line height of a greyscale image, in pixels.
+
+    Dark pixels are projected onto rows within a few vertical strips (so
+    columns of text with different baselines stay apart); runs of inked
+    rows are taken as text lines and their median height is returned.
+
+    Returns:
+        Median line height, or None if no text-like lines were found
+    """
+    if img.width == 0 or img.height == 0:
+        return None
+    stat = ImageStat.Stat(img)
+    # Compare on the uint8 pixels directly; no float copy of the image
+    dark = numpy.asarray(img) < stat.mean[0] - stat.stddev[0]
+    heights = []
+    for strip in numpy.array_split(dark, strips, axis=1):
+        if strip.shape[1] == 0:
+            continue
+        inked = numpy.concatenate(([False], strip.mean(axis=1) > 0.01, [False]))
+        edges = numpy.flatnonzero(numpy.diff(inked.astype(numpy.int8)))
+        runs = edges[1::2] - edges[::2]
+        # Ignore specks and blocks taller than a tenth of the page (pictures, borders)
+        heights.extend(runs[(runs >= 3) & (runs <= img.height / 10)].tolist())
+    if not heights:
+        return None
+    return float(numpy.median(heights))
+
+
+def choose_scale(
+    image_path: Union[str, Path],
+    target_text_height: float = TARGET_TEXT_HEIGHT,
+    max_pixels: int = MAX_OUTPUT_PIXELS
+) -> float:
+    """
+    Pick the resize factor for OCR from text height measured on a small preview.
+
+    Small text is upscaled, huge photos are downscaled, and the result never
+    exceeds `max_pixels`.
+    """
+    with Image.open(image_path) as img:
+        width, height = img.size
+    preview, achieved = _open_reduced(image_path, min(1.0, PREVIEW_SIDE / max(width, height)))
+    text_height = estimate_text_height(preview)
+    if text_height is None:
+        scale = DEFAULT_SCALE
+    else:
+        scale = min(max(target_text_height * achieved / text_height, MIN_SCALE), MAX_SCALE)
+    return min(scale, math.sqrt(max_pixels / (width * height)))
+
+
+def preprocess_image(
+    image_path: Union[str, Path],
+    scale: Optional[float] = None,
+    target_text_height: float = TARGET_TEXT_HEIGHT,
+    max_pixels: int = MAX_OUTPUT_PIXELS
+) -> Image.Image:
+    """
+    Load an image ready for OCR: upright, greyscale, autocontrasted and resized.
+
+    Args:
+        image_path: Image file
+        scale: Fixed resize factor, or None to choose one from the text height
+        target_text_height: Line height in pixels aimed for when scale is None
+        max_pixels: Upper bound on the output size
+    """
+    if scale is None:
+        scale = choose_scale(image_path, target_text_height, max_pixels)
+    img, achieved = _open_reduced(image_path, scale)  # fixes phone rotation, greyscale
     img = ImageOps.autocontrast(img)     # improve contrast
-    img = img.resize((img.width * 2, img.height * 2))  # enlarge
+    size = (max(round(img.width * scale / achieved), 1), max(round(img.height * scale / achieved), 1))
+    if size != img.size:
+        img = img.resize(size, Image.Resampling.LANCZOS if scale < achieved else Image.Resampling.BICUBIC)
+    return img
+
+
+TESSERACT_INSTALL_HELP = """
+❌ ERROR: Tesseract OCR is not installed!
+
+Please install Tesseract:
+  Ubuntu/Debian: sudo apt-get install tesseract-ocr
+  macOS:         brew install tesseract
+  Fedora/RHEL:   sudo dnf install tesseract
+
+Then verify with: tesseract --version"""
+
+
+class OCRBackend(ABC):
+    """Engine that turns a preprocessed image into text."""
+
+    name = "base"
+
+    @classmethod
+    def available(cls) -> bool:
+        """Whether the engine can run in this environment."""
+        return True
+
+    @abstractmethod
+    def image_to_string(self, img: Image.Image, psm: int = 6, lang: str = "eng") -> str:
+        """Recognise the text in an image using tesseract page segmentation mode psm."""
+
+    def close(self):
+        """Release engine resources."""
+
+
+class TesseractCLIBackend(OCRBackend):
+    """pytesseract: spawns one tesseract process per image."""
+
+    name = "tesseract"
+
+    @classmethod
+    def available(cls) -> bool:
+        return shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None
+
+    def image_to_string(self, img: Image.Image, psm: int = 6, lang: str = "eng") -> str:
+        return pytesseract.image_to_string(img, lang=lang, config=f"--psm {psm}")
+
+
+class TesserocrBackend(OCRBackend):
+    """
+    tesserocr: keeps tesseract loaded in-process, so there is no process spawn
+    or model load per image. One API handle is kept per (lang, psm).
+    """
+
+    name = "tesserocr"
+
+    def __init__(self):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self._apis: Dict[tuple, object] = {}
+        # A tesseract API handle must not be used from two threads at once
+        self._lock = threading.Lock()
+
+    @classmethod
+    def available(cls) -> bool:
+        return importlib.util.find_spec("tesserocr") is not None
+
+    def image_to_string(self, img: Image.Image, psm: int = 6, lang: str = "eng") -> str:
+        with self._lock:
+            api = self._apis.get((lang, psm))
+            if api is None:
+                # tesserocr takes psm as an int; its PSM class only names the values and cannot be instantiated
+                api = self._tesserocr.PyTessBaseAPI(lang=lang, psm=psm)
+                self._apis[(lang, psm)] = api
+            api.SetImage(img)
+            return api.GetUTF8Text()
+
+    def close(self):
+        with self._lock:
+            for api in self._apis.values():
+                api.End()
+            self._apis.clear()
+
+
+class FakeBackend(OCRBackend):
+    """Deterministic stand-in for tests: reports the image it was given."""
+
+    name = "fake"
+
+    def __init__(self, text: Optional[str] = None):
+        self.text = text
+        self.calls = 0
+
+    def image_to_string(self, img: Image.Image, psm: int = 6, lang: str = "eng") -> str:
+        self.calls += 1
+        if self.text is not None:
+            return self.text
+        return f"fake OCR {img.width}x{img.height} psm={psm} lang={lang}"
+
+
+BACKENDS: Dict[str, type] = {
+    TesserocrBackend.name: TesserocrBackend,
+    TesseractCLIBackend.name: TesseractCLIBackend,
+    FakeBackend.name: FakeBackend,
+}
+# "auto" picks the first available engine, lowest latency first
+AUTO_ORDER = [TesserocrBackend.name, TesseractCLIBackend.name]
+
+# One backend instance per name per process (each pool worker gets its own)
+_backends: Dict[str, OCRBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def resolve_backend_name(name: Optional[str] = None) -> str:
+    """Turn None/"auto" (or the OCR_BACKEND environment variable) into a backend name."""
+    name = name or os.getenv("OCR_BACKEND", "auto")
+    if name == "auto":
+        for candidate in AUTO_ORDER:
+            if BACKENDS[candidate].available():
+                return candidate
+        # Fall through to the CLI so a missing install still raises TesseractNotFoundError
+        return TesseractCLIBackend.name
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown OCR backend '{name}'. Choose from: auto, {', '.join(BACKENDS)}")
+    return name
+
+
+def get_backend(name: Optional[str] = None) -> OCRBackend:
+    """Get this process's shared instance of an OCR backend."""
+    name = resolve_backend_name(name)
+    with _backends_lock:
+        backend = _backends.get(name)
+        if backend is None:
+            backend = BACKENDS[name]()
+            _backends[name] = backend
+        return backend
+
+
+def close_backends():
+    """Close every backend created in this process."""
+    with _backends_lock:
+        for backend in _backends.values():
+            backend.close()
+        _backends.clear()
+
+
+def ocr_single_image(
+    image_path: Path,
+    psm: int = 6,
+    scale: Optional[float] = None,
+    lang: str = "eng",
+    backend: Optional[str] = None
+) -> str:
+    """
+    Preprocess and OCR one image.
+
+    Args:
+        image_path: Image file
+        psm: Tesseract page segmentation mode
+        scale: Resize factor (None = chosen from the text height)
+        lang: Tesseract language
+        backend: OCR backend name (None = OCR_BACKEND env var, else "auto")
+    """
+    img = preprocess_image(image_path, scale)
+    return get_backend(backend).image_to_string(img, psm=psm, lang=lang)
 
-    return pytesseract.image_to_string(
-        img,
-        lang="eng",
-        config=f"--psm {psm}"
-    )
 
 def list_images(folder: Path) -> list[Path]:
     return sorted([p for p in folder.iterdir() if p.is_file() and p.suffix.lower() in IMAGE_EXTS])
 
-def ocr_folder(folder_path: str, psm: int = 6) -> dict[str, str]:
+@dataclass
+class OCRResult:
+    """Outcome of OCR on one image; exactly one of `text` / `error` is set."""
+    index: int
+    path: Path
+    text: Optional[str]
+    error: Optional[str]
+    seconds: float
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _timed_ocr(ocr_fn: Callable[..., str], path: Path, params: dict) -> tuple[Optional[str], Optional[str], float]:
+    # Runs inside the worker: a bad image becomes an error result instead of
+    # an exception that would abort the whole batch
+    start = time.perf_counter()
+    try:
+        text = ocr_fn(path, **params)
+    except TesseractNotFoundError:
+        # Not the image's fault; every other image would fail the same way
+        raise
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+    return text, None, time.perf_counter() - start
+
+
+# TesseractNotFoundError cannot be unpickled, so pool workers report it with this marker
+_TESSERACT_MISSING = "TesseractNotFoundError"
+
+
+def _pool_ocr(ocr_fn: Callable[..., str], path: Path, params: dict) -> tuple[Optional[str], Optional[str], float]:
+    try:
+        return _timed_ocr(ocr_fn, path, params)
+    except TesseractNotFoundError:
+        return None, _TESSERACT_MISSING, 0.0
+
+
+def ocr_images(
+    paths: Iterable[Path],
+    psm: int = 6,
+    workers: Optional[int] = 1,
+    max_in_flight: Optional[int] = None,
+    ordered: bool = True,
+    ocr_fn: Callable[..., str] = ocr_single_image,
+    scale: Optional[float] = None,
+    lang: str = "eng",
+    cache: Optional[OCRCache] = None,
+    backend: Optional[str] = None
+) -> Iterator[OCRResult]:
+    """
+    OCR many images, optionally across a pool of worker processes.
+
+    Args:
+        paths: Image files to OCR
+        psm: Tesseract page segmentation mode
+        workers: Worker processes (1 = run in this process, None = one per CPU)
+        max_in_flight: Images submitted but not yet collected; caps memory on
+            large batches (default: twice the worker count)
+        ordered: Yield results in input order; otherwise as they complete
+        ocr_fn: Picklable function(path, psm=..., scale=..., lang=..., backend=...)
+            -> text, run in the workers
+        scale: Resize factor applied before OCR (None = chosen per image
+            from its text height)
+        lang: Tesseract language
+        cache: Skip OCR for images already in this cache and store new results
+        backend: OCR backend name (see get_backend); resolved once here so
+            every worker uses the same engine
+
+    Yields:
+        One OCRResult per image. Failures are reported on the result; only a
+        missing tesseract install is raised.
+    """
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+    params = {"psm": psm, "scale": scale, "lang": lang, "backend": resolve_backend_name(backend)}
+    keys: dict[int, str] = {}
+
+    def lookup(index: int, path: Path) -> Optional[OCRResult]:
+        if cache is None:
+            return None
+        try:
+            keys[index] = cache.key(path, **params)
+        except OSError as e:
+            return OCRResult(index, path, None, f"{type(e).__name__}: {e}", 0.0)
+        entry = cache.get(keys[index])
+        if entry is None:
+            return None
+        return OCRResult(index, path, entry["text"], None, 0.0, cached=True)
+
+    def store(result: OCRResult):
+        if cache is not None and result.ok and not result.cached:
+            cache.put(keys.pop(result.index), result.text, {
+                "source_file": result.path.name,
+                "seconds": result.seconds,
+                **params
+            })
+
+    if workers == 1:
+        for index, path in enumerate(paths):
+            result = lookup(index, path) or OCRResult(index, path, *_timed_ocr(ocr_fn, path, params))
+            store(result)
+            yield result
+        return
+
+    max_in_flight = max(max_in_flight or 2 * workers, 1)
+    pending: dict[Future, int] = {}
+    finished: dict[int, OCRResult] = {}
+    next_to_yield = 0
+    queue = iter(enumerate(paths))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            while True:
+                while len(pending) + len(finished) < max_in_flight:
+                    item = next(queue, None)
+                    if item is None:
+                        break
+                    index, path = item
+                    hit = lookup(index, path)
+                    if hit is None:
+                        pending[pool.submit(_pool_ocr, ocr_fn, path, params)] = index
+                    elif ordered:
+                        finished[index] = hit
+                    else:
+                        yield hit
+                if not pending and not finished:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED) if pending else ((), ())
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        result = OCRResult(index, paths[index], *future.result())
+                    except Exception as e:
+                        # e.g. a worker killed while reading a corrupt image
+                        result = OCRResult(index, paths[index], None, f"{type(e).__name__}: {e}", 0.0)
+                    if result.error == _TESSERACT_MISSING:
+                        raise TesseractNotFoundError()
+                    store(result)
+                    if ordered:
+                        finished[index] = result
+                    else:
+                        yield result
+
+                while next_to_yield in finished:
+                    yield finished.pop(next_to_yield)
+                    next_to_yield += 1
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def ocr_folder(
+    folder_path: str,
+    psm: int = 6,
+    workers: Optional[int] = 1,
+    max_in_flight: Optional[int] = None,
+    cache: Optional[OCRCache] = None,
+    backend: Optional[str] = None
+) -> dict[str, str]:
     folder = Path(folder_path)
     if not folder.exists() or not folder.is_dir():
         raise ValueError(f"Not a folder: {folder}")
@@ -30,8 +468,22 @@ def ocr_folder(folder_path: str, psm: int = 6) -> dict[str, str]:
         raise ValueError(f"No images found in: {folder}")
 
     results: dict[str, str] = {}
-    for img in images:
-        print(f"OCRing: {img.name}")
-        results[img.name] = ocr_single_image(img, psm=psm)
+    results_iter = ocr_images(
+        images,
+        psm=psm,
+        workers=workers,
+        max_in_flight=max_in_flight,
+        cache=cache,
+        backend=backend
+    )
+    for result in results_iter:
+        if result.cached:
+            print(f"Cached: {result.path.name}")
+            results[result.path.name] = result.text
+        elif result.ok:
+            print(f"OCRed: {result.path.name} ({result.seconds:.2f}s)")
+            results[result.path.name] = result.text
+        else:
+            print(f"Failed: {result.path.name}: {result.error}")
 
     return results
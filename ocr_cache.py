@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+CACHE_FORMAT = 1
+
+
+def file_digest(path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class OCRCache:
+    """
+    On-disk OCR result cache keyed by image content and OCR parameters.
+
+    Renamed or duplicated images share an entry, and changing psm, scale,
+    lang or the OCR backend gives a new one. Entries are small JSON files;
+    once the directory grows past `max_bytes` the least recently used
+    entries are removed.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Open (and create if needed) a cache directory.
+
+        Args:
+            cache_dir: Directory holding the cache entries
+            max_bytes: Total size of entries kept before evicting
+        """
+        if max_bytes < 1:
+            raise ValueError(f"max_bytes must be at least 1, got {max_bytes}")
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._size = sum(p.stat().st_size for p in self.cache_dir.glob("*.json"))
+
+    @staticmethod
+    def key(
+        image_path: Union[str, Path],
+        psm: int,
+        scale: Optional[float],
+        lang: str,
+        backend: str = "tesseract"
+    ) -> str:
+        """Cache key for an image file OCRed with the given parameters and engine."""
+        params = json.dumps(
+            {"psm": psm, "scale": scale, "lang": lang, "backend": backend, "format": CACHE_FORMAT},
+            sort_keys=True
+        )
+        return hashlib.sha256(f"{file_digest(image_path)}:{params}".encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an entry.
+
+        Returns:
+            {"text": ..., "metadata": {...}} or None on a miss
+        """
+        path = self._entry_path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            # Mark recently used for eviction
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self._misses += 1
+            return None
+        with self._lock:
+            self._hits += 1
+        return entry
+
+    def put(self, key: str, text: str, metadata: Optional[Dict[str, Any]] = None):
+        """Store OCR text with metadata, then evict old entries if over budget."""
+        entry = {"text": text, "metadata": {**(metadata or {}), "stored_at": time.time()}}
+        data = json.dumps(entry).encode("utf-8")
+        path = self._entry_path(key)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with self._lock:
+            old_size = path.stat().st_size if path.exists() else 0
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            self._size += len(data) - old_size
+            if self._size > self.max_bytes:
+                self._evict(keep=path)
+
+    def _evict(self, keep: Path):
+        entries = []
+        for p in self.cache_dir.glob("*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, p in entries:
+            if self._size <= self.max_bytes:
+                break
+            if p == keep:
+                continue
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            self._size -= size
+            self._evictions += 1
+
+    def clear(self):
+        """Remove every entry; counters are kept."""
+        with self._lock:
+            for p in self.cache_dir.glob("*.json"):
+                p.unlink(missing_ok=True)
+            self._size = 0
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.cache_dir.glob("*.json"))
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of cache counters for the current run."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
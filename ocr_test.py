@@ -1,27 +1,18 @@
-from PIL import Image, ImageOps
-import pytesseract
 import sys
+from pathlib import Path
 
-def ocr(image_path: str) -> str:
-    img = Image.open(image_path)
-    img = ImageOps.exif_transpose(img)
-    img = img.convert("L")
-    img = ImageOps.autocontrast(img)
-    img = img.resize((img.width * 2, img.height * 2))
+from menu_ocr import ocr_single_image
 
-    return pytesseract.image_to_string(
-        img,
-        lang="eng",
-        config="--psm 6"
-    )
+def ocr(image_path: str, backend: str = None) -> str:
+    return ocr_single_image(Path(image_path), psm=6, backend=backend)
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: uv run python ocr_test.py path\\to\\menu.jpg")
+        print("Usage: uv run python ocr_test.py path\\to\\menu.jpg [backend]")
         raise SystemExit(1)
 
     path = sys.argv[1]
-    text = ocr(path)
+    text = ocr(path, sys.argv[2] if len(sys.argv) > 2 else None)
 
     print("----- OCR OUTPUT START -----")
     print(text)
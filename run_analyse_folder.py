@@ -1,58 +1,58 @@
 import json
-import re
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+from keyword_matcher import KeywordMatcher
+
 # UK top 14 allergen keywords (very lightweight; safe because it only matches explicit text)
+# Terms are literal and matched case-insensitively as whole words
 ALLERGEN_KEYWORDS = {
-    "celery": [r"\bcelery\b"],
-    "cereals_containing_gluten": [r"\bgluten\b", r"\bwheat\b", r"\bbarley\b", r"\brye\b", r"\boats\b"],
-    "crustaceans": [r"\bcrustacean(s)?\b", r"\bprawn(s)?\b", r"\bshrimp\b", r"\bcrab\b", r"\blobster\b"],
-    "eggs": [r"\begg(s)?\b"],
-    "fish": [r"\bfish\b"],
-    "lupin": [r"\blupin\b"],
-    "milk": [r"\bmilk\b", r"\bdairy\b", r"\bcheese\b", r"\bbutter\b", r"\bcream\b", r"\byoghurt\b", r"\byogurt\b"],
-    "molluscs": [r"\bmollusc(s)?\b", r"\bmussel(s)?\b", r"\boyster(s)?\b", r"\bsquid\b", r"\boctopus\b"],
-    "mustard": [r"\bmustard\b"],
-    "nuts": [r"\bnut(s)?\b", r"\balmond(s)?\b", r"\bhazelnut(s)?\b", r"\bwalnut(s)?\b", r"\bcashew(s)?\b", r"\bpecan(s)?\b"],
-    "peanuts": [r"\bpeanut(s)?\b"],
-    "sesame": [r"\bsesame\b"],
-    "soybeans": [r"\bsoy\b", r"\bsoya\b"],
-    "sulphur_dioxide_sulphites": [r"\bsulphite(s)?\b", r"\bsulfite(s)?\b", r"\bsulphur dioxide\b", r"\bsulfur dioxide\b"],
+    "celery": ["celery"],
+    "cereals_containing_gluten": ["gluten", "wheat", "barley", "rye", "oats"],
+    "crustaceans": ["crustacean", "crustaceans", "prawn", "prawns", "shrimp", "crab", "lobster"],
+    "eggs": ["egg", "eggs"],
+    "fish": ["fish"],
+    "lupin": ["lupin"],
+    "milk": ["milk", "dairy", "cheese", "butter", "cream", "yoghurt", "yogurt"],
+    "molluscs": ["mollusc", "molluscs", "mussel", "mussels", "oyster", "oysters", "squid", "octopus"],
+    "mustard": ["mustard"],
+    "nuts": ["nut", "nuts", "almond", "almonds", "hazelnut", "hazelnuts", "walnut", "walnuts",
+             "cashew", "cashews", "pecan", "pecans"],
+    "peanuts": ["peanut", "peanuts"],
+    "sesame": ["sesame"],
+    "soybeans": ["soy", "soya"],
+    "sulphur_dioxide_sulphites": ["sulphite", "sulphites", "sulfite", "sulfites", "sulphur dioxide", "sulfur dioxide"],
 }
 
 DIETARY_KEYWORDS = {
-    "vegan": [r"\bvegan\b", r"\bvg\b"],
-    "vegetarian": [r"\bvegetarian\b", r"\bveg\b", r"\bv\b"],
-    "gluten-free": [r"\bgluten[- ]?free\b", r"\bgf\b"],
-    "dairy-free": [r"\bdairy[- ]?free\b"],
-    "nut-free": [r"\bnut[- ]?free\b"],
-    "halal": [r"\bhalal\b"],
-    "kosher": [r"\bkosher\b"],
+    "vegan": ["vegan", "vg"],
+    "vegetarian": ["vegetarian", "veg", "v"],
+    "gluten-free": ["gluten-free", "gluten free", "glutenfree", "gf"],
+    "dairy-free": ["dairy-free", "dairy free", "dairyfree"],
+    "nut-free": ["nut-free", "nut free", "nutfree"],
+    "halal": ["halal"],
+    "kosher": ["kosher"],
 }
 
-def find_matches(text: str, patterns: list[str]) -> list[str]:
-    hits = []
-    for pat in patterns:
-        m = re.search(pat, text, flags=re.IGNORECASE)
-        if m:
-            # evidence = matched text
-            hits.append(m.group(0))
-    return hits
+# Built once; each text is scanned in a single pass per keyword set
+ALLERGEN_MATCHER = KeywordMatcher(ALLERGEN_KEYWORDS)
+DIETARY_MATCHER = KeywordMatcher(DIETARY_KEYWORDS)
 
 def analyse_ocr_text(raw: str) -> dict:
     # very simple "itemisation": keep as one block for now + extract global info
     # (we can improve splitting after we see your OCR style)
-    allergens = []
-    for allergen, pats in ALLERGEN_KEYWORDS.items():
-        ev = find_matches(raw, pats)
-        if ev:
-            allergens.append({"allergen": allergen, "evidence": ev[0]})
+    found = ALLERGEN_MATCHER.first_matches(raw)
+    allergens = [
+        {"allergen": allergen, "evidence": found[allergen].text, "span": [found[allergen].start, found[allergen].end]}
+        for allergen in ALLERGEN_KEYWORDS if allergen in found
+    ]
 
-    dietary = []
-    for tag, pats in DIETARY_KEYWORDS.items():
-        ev = find_matches(raw, pats)
-        if ev:
-            dietary.append({"tag": tag, "evidence": ev[0]})
+    found = DIETARY_MATCHER.first_matches(raw)
+    dietary = [
+        {"tag": tag, "evidence": found[tag].text, "span": [found[tag].start, found[tag].end]}
+        for tag in DIETARY_KEYWORDS if tag in found
+    ]
 
     return {
         "allergens_found": allergens,
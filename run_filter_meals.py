@@ -1,12 +1,21 @@
+from __future__ import annotations
+
 import json
 import re
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
 
 # Add src to path to import AllergiesGetter
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 from allergies_getter import AllergiesGetter
+from keyword_matcher import KeywordMatcher
+
+if TYPE_CHECKING:
+    # numpy-backed; imported where a menu is first compiled
+    from menu_safety import CompiledMenu
 
 
 # Hardcoded menu with allergen phrases for each item
@@ -58,41 +67,73 @@ def normalise_words(csv: str) -> List[str]:
     return [w.strip().lower() for w in csv.split(",") if w.strip()]
 
 
-def decode_allergen_phrases(phrases: List[str]) -> List[str]:
+# HARDCODED_MENU compiled to allergen bitmasks on first use
+_compiled_menu: Optional[CompiledMenu] = None
+_compiled_menu_lock = threading.Lock()
+
+
+def decode_allergen_phrases(phrases: List[str], getter: Optional[AllergiesGetter] = None) -> List[str]:
     """
     Decode allergen phrases into actual allergen names.
 
     Args:
         phrases: List of encoded allergen phrases/words
+        getter: Shared AllergiesGetter to use (a temporary one is created if None)
 
     Returns:
         List of decoded allergen names (lowercased for matching)
     """
     try:
-        with AllergiesGetter() as getter:
-            # Use words_to_allergies to decode the database words into allergen names
-            allergens = getter.words_to_allergies(phrases)
-            if allergens is None:
-                print(f"Warning: Could not decode phrases: {phrases}")
-                return []
-            
-            # Print the decoded allergens
-            print(f"Decoded allergens: {allergens}")
-            
-            # Return lowercased allergen names for matching
-            return [a.lower() for a in allergens]
+        if getter is None:
+            with AllergiesGetter() as own_getter:
+                return decode_allergen_phrases(phrases, own_getter)
+        
+        # Use words_to_allergies to decode the database words into allergen names
+        allergens = getter.words_to_allergies(phrases)
+        if allergens is None:
+            print(f"Warning: Could not decode phrases: {phrases}")
+            return []
+        
+        # Print the decoded allergens
+        print(f"Decoded allergens: {allergens}")
+        
+        # Return lowercased allergen names for matching
+        return [a.lower() for a in allergens]
     except Exception as e:
         print(f"Error decoding allergen phrases: {e}")
         return []
 
 
-def check_menu_item_allergens(item_allergen_phrases: List[str], user_allergens: List[str]) -> Dict[str, Any]:
+def get_compiled_menu(getter: AllergiesGetter) -> CompiledMenu:
+    """
+    Get HARDCODED_MENU with every item's allergen phrases decoded once.
+    Items whose phrases cannot be decoded are kept and flagged unknown
+    (see CompiledMenu.from_phrases).
+
+    Args:
+        getter: AllergiesGetter used for the one-off compilation
+    """
+    global _compiled_menu
+    if _compiled_menu is None:
+        with _compiled_menu_lock:
+            if _compiled_menu is None:
+                from menu_safety import CompiledMenu
+                _compiled_menu = CompiledMenu.from_phrases(HARDCODED_MENU, getter)
+    return _compiled_menu
+
+
+def check_menu_item_allergens(
+    item_allergen_phrases: List[str],
+    user_allergens: List[str],
+    getter: Optional[AllergiesGetter] = None
+) -> Dict[str, Any]:
     """
     Check if a menu item's allergen phrases match any of the user's allergens.
     
     Args:
         item_allergen_phrases: Database words representing the item's allergens
         user_allergens: User's decoded allergen names (lowercased)
+        getter: Shared AllergiesGetter to use (a temporary one is created if None)
         
     Returns:
         Dictionary with match information
@@ -105,7 +146,7 @@ def check_menu_item_allergens(item_allergen_phrases: List[str], user_allergens:
         }
     
     # Decode the menu item's allergen phrases
-    item_allergens = decode_allergen_phrases(item_allergen_phrases)
+    item_allergens = decode_allergen_phrases(item_allergen_phrases, getter)
     
     # Find matches (case-insensitive)
     matched = [allergen for allergen in item_allergens if allergen in user_allergens]
@@ -117,37 +158,63 @@ def check_menu_item_allergens(item_allergen_phrases: List[str], user_allergens:
     }
 
 
-def analyse_hardcoded_menu(user_allergen_phrases: List[str]) -> List[Dict[str, Any]]:
+def analyse_hardcoded_menu(
+    user_allergen_phrases: List[str],
+    getter: Optional[AllergiesGetter] = None
+) -> List[Dict[str, Any]]:
     """
     Analyse hardcoded menu against user's allergen phrases.
+    Menu items are compiled to bitmasks once per process, so each check is a
+    bitwise AND per item.
     
     Args:
         user_allergen_phrases: List of encoded allergen phrases from user
+        getter: Shared AllergiesGetter to use (a temporary one is created if None)
         
     Returns:
         List of analysis results for each menu item
     """
+    if getter is None:
+        with AllergiesGetter() as own_getter:
+            return analyse_hardcoded_menu(user_allergen_phrases, own_getter)
+    
     # Decode user's allergen phrases
     print(f"\n=== Decoding User's Allergen Phrases ===")
-    user_allergens = decode_allergen_phrases(user_allergen_phrases)
+    user_allergens = decode_allergen_phrases(user_allergen_phrases, getter)
     
     if not user_allergens:
         raise ValueError("Could not decode user's allergen phrases")
     
     print(f"User's allergens to avoid: {user_allergens}")
     
+    return analyse_compiled_menu(get_compiled_menu(getter), user_allergens)
+
+
+def analyse_compiled_menu(menu: CompiledMenu, user_allergens: List[str]) -> List[Dict[str, Any]]:
+    """
+    Check a compiled menu (hardcoded or loaded from a menu store) against decoded allergens.
+    
+    Args:
+        menu: Menu with precomputed item bitmasks
+        user_allergens: User's decoded allergen names
+        
+    Returns:
+        List of analysis results for each menu item
+    """
     results = []
     
     print(f"\n=== Analyzing Menu Items ===")
-    for item in HARDCODED_MENU:
-        print(f"\nChecking: {item['meal']}")
-        
-        match_info = check_menu_item_allergens(item['allergen_phrases'], user_allergens)
+    for match_info in menu.check(user_allergens):
+        print(f"\nChecking: {match_info['meal']}")
         
         if match_info['has_match']:
             status = "NOT ALLOWED"
             allowed = False
             reason = f"Contains allergens: {', '.join(match_info['matched_allergens'])}"
+        elif match_info['unknown']:
+            status = "NOT ALLOWED"
+            allowed = False
+            reason = "Allergen information could not be decoded"
         else:
             status = "SAFE"
             allowed = True
@@ -157,7 +224,7 @@ def analyse_hardcoded_menu(user_allergen_phrases: List[str]) -> List[Dict[str, A
                 reason = "No allergens detected"
         
         result = {
-            "meal": item['meal'],
+            "meal": match_info['meal'],
             "allowed": allowed,
             "status": status,
             "item_allergens": match_info['item_allergens'],
@@ -202,10 +269,12 @@ def split_into_meals(ocr_text: str) -> List[str]:
 
 
 def analyse_meals(meals: List[str], blocked_words: List[str]) -> List[Dict[str, Any]]:
+    # Substring matching (not whole words) so "milk" still blocks "milkshake"
+    matcher = KeywordMatcher([w for w in set(blocked_words) if w], whole_words=False)
     results = []
     for meal in meals:
-        meal_lc = meal.lower()
-        found = [w for w in blocked_words if w in meal_lc]
+        hits = matcher.matched_keys(meal)
+        found = [w for w in blocked_words if w in hits]
 
         if found:
             results.append({
@@ -226,7 +295,91 @@ def analyse_meals(meals: List[str], blocked_words: List[str]) -> List[Dict[str,
     return results
 
 
-def filter_meals(allergen_phrases: Optional[List[str]] = None, outputs_dir: str = "outputs", use_hardcoded_menu: bool = False) -> Dict[str, Any]:
+def analyse_menu_text(ocr_text: str, blocked_words: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Split OCR text into meals and detect the allergens each one mentions.
+
+    Args:
+        ocr_text: Raw OCR output for one menu
+        blocked_words: Decoded user allergens; when given, every meal is also
+            marked allowed / not allowed as in analyse_meals
+
+    Returns:
+        Dictionary with "meals" (meal text plus the allergen keywords found in
+        it) and, if blocked_words were given, "results"
+    """
+    from run_analyse_folder import ALLERGEN_MATCHER
+
+    meals = split_into_meals(ocr_text)
+    detected = []
+    for meal in meals:
+        found = ALLERGEN_MATCHER.first_matches(meal)
+        detected.append({
+            "meal": meal,
+            "allergens_found": [
+                {"allergen": allergen, "evidence": m.text, "span": [m.start, m.end]}
+                for allergen, m in found.items()
+            ]
+        })
+
+    analysis = {"meals": detected}
+    if blocked_words is not None:
+        analysis["results"] = analyse_meals(meals, blocked_words)
+    return analysis
+
+
+def analyse_menu_image(
+    image_path: Path,
+    allergen_phrases: Optional[List[str]] = None,
+    getter: Optional[AllergiesGetter] = None,
+    backend: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Full pipeline for one uploaded menu photo: OCR, split into meals, detect allergens.
+
+    Args:
+        image_path: Menu image file
+        allergen_phrases: Optional user code words; meals are then checked against
+            the decoded allergens
+        getter: AllergiesGetter used to decode allergen_phrases
+        backend: OCR backend name (see menu_ocr.get_backend)
+
+    Returns:
+        The analyse_menu_text result plus "ocr_text", "decoded_allergens" and "timings"
+
+    Raises:
+        ValueError: If allergen_phrases are given but decode to no allergens
+    """
+    from menu_ocr import ocr_single_image
+
+    blocked_words = None
+    if allergen_phrases:
+        blocked_words = decode_allergen_phrases(allergen_phrases, getter)
+        if not blocked_words:
+            raise ValueError("Could not decode any allergens from provided phrases.")
+
+    started = time.perf_counter()
+    ocr_text = ocr_single_image(Path(image_path), psm=6, backend=backend)
+    ocr_seconds = time.perf_counter() - started
+
+    analysis = analyse_menu_text(ocr_text, blocked_words)
+    return {
+        "ocr_text": ocr_text,
+        "decoded_allergens": blocked_words,
+        **analysis,
+        "timings": {
+            "ocr_seconds": ocr_seconds,
+            "analysis_seconds": time.perf_counter() - started - ocr_seconds
+        }
+    }
+
+
+def filter_meals(
+    allergen_phrases: Optional[List[str]] = None,
+    outputs_dir: str = "outputs",
+    use_hardcoded_menu: bool = False,
+    getter: Optional[AllergiesGetter] = None
+) -> Dict[str, Any]:
     """
     Filter meals from OCR text files or hardcoded menu based on allergen phrases.
     
@@ -235,6 +388,7 @@ def filter_meals(allergen_phrases: Optional[List[str]] = None, outputs_dir: str
                          If None, will use interactive mode.
         outputs_dir: Directory containing OCR output text files (default: "outputs")
         use_hardcoded_menu: If True, use hardcoded menu instead of OCR files
+        getter: Shared AllergiesGetter to use (one is created for the call if None)
     
     Returns:
         Dictionary containing:
@@ -243,6 +397,10 @@ def filter_meals(allergen_phrases: Optional[List[str]] = None, outputs_dir: str
             - "user_allergen_phrases": List of user's encoded phrases
             - "decoded_allergens": List of decoded allergen names
     """
+    if getter is None:
+        with AllergiesGetter() as own_getter:
+            return filter_meals(allergen_phrases, outputs_dir, use_hardcoded_menu, own_getter)
+
     # Get allergen phrases
     if allergen_phrases:
         print(f"\nUser provided allergen phrases: {allergen_phrases}")
@@ -262,9 +420,9 @@ def filter_meals(allergen_phrases: Optional[List[str]] = None, outputs_dir: str
         print("=" * 60)
         
         # Decode user's allergens first to get the decoded names
-        user_allergens = decode_allergen_phrases(allergen_phrases)
+        user_allergens = decode_allergen_phrases(allergen_phrases, getter)
         
-        analysed = analyse_hardcoded_menu(allergen_phrases)
+        analysed = analyse_hardcoded_menu(allergen_phrases, getter)
         
         # Summary
         not_allowed = sum(1 for r in analysed if not r["allowed"])
@@ -300,7 +458,7 @@ def filter_meals(allergen_phrases: Optional[List[str]] = None, outputs_dir: str
     else:
         # Decode allergen phrases
         print(f"\nDecoding allergen phrases: {allergen_phrases}")
-        blocked_words = decode_allergen_phrases(allergen_phrases)
+        blocked_words = decode_allergen_phrases(allergen_phrases, getter)
         
         if not blocked_words:
             raise ValueError("Could not decode any allergens from provided phrases.")
@@ -1,43 +1,48 @@
-import sys
+import argparse
+import time
 from pathlib import Path
-from typing import List, Dict
-from PIL import Image, ImageOps
-import pytesseract
+from typing import List, Dict, Optional
 from pytesseract import TesseractNotFoundError
 
-IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+from menu_ocr import BACKENDS, TESSERACT_INSTALL_HELP, ocr_images, resolve_backend_name
+from ocr_cache import DEFAULT_MAX_BYTES, OCRCache
 
-def ocr_single_image(image_path: Path, psm: int = 6) -> str:
-    img = Image.open(image_path)
-    img = ImageOps.exif_transpose(img)
-    img = img.convert("L")
-    img = ImageOps.autocontrast(img)
-    img = img.resize((img.width * 2, img.height * 2))
-    
-    try:
-        return pytesseract.image_to_string(img, lang="eng", config=f"--psm {psm}")
-    except TesseractNotFoundError:
-        print("\n❌ ERROR: Tesseract OCR is not installed!")
-        print("\nPlease install Tesseract:")
-        print("  Ubuntu/Debian: sudo apt-get install tesseract-ocr")
-        print("  macOS:         brew install tesseract")
-        print("  Fedora/RHEL:   sudo dnf install tesseract")
-        print("\nThen verify with: tesseract --version")
-        raise
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
 
-def process_menu_images(folder_path: str = "menu.jpg", output_dir: str = "outputs") -> Dict[str, any]:
+def process_menu_images(
+    folder_path: str = "menu.jpg",
+    output_dir: str = "outputs",
+    workers: Optional[int] = 1,
+    max_in_flight: Optional[int] = None,
+    ordered: bool = True,
+    use_cache: bool = True,
+    cache_dir: Optional[str] = None,
+    cache_max_bytes: int = DEFAULT_MAX_BYTES,
+    backend: Optional[str] = None
+) -> Dict[str, any]:
     """
     Process all images in a folder using OCR.
     
     Args:
         folder_path: Path to folder containing menu images (default: "menu.jpg")
         output_dir: Directory to save OCR output text files (default: "outputs")
+        workers: OCR worker processes (1 = sequential, None = one per CPU)
+        max_in_flight: Images queued on the pool at once (default: 2 x workers)
+        ordered: Write results in file order; otherwise as each image finishes
+        use_cache: Reuse OCR text for images already processed with the same settings
+        cache_dir: OCR cache location (default: <output_dir>/.ocr_cache)
+        cache_max_bytes: Size the OCR cache is trimmed to
+        backend: OCR engine (None = OCR_BACKEND env var, else the fastest available)
     
     Returns:
         Dictionary containing:
             - "processed_files": List of processed image filenames
             - "output_files": List of output text file paths
             - "output_dir": Path to output directory
+            - "failed_files": List of {"file", "error"} for images that failed
+            - "timings": Seconds spent on OCR per image filename
+            - "total_seconds": Wall-clock time for the whole batch
+            - "cache": OCR cache statistics (None when the cache is off)
     """
     folder = Path(folder_path)
 
@@ -55,38 +60,95 @@ def process_menu_images(folder_path: str = "menu.jpg", output_dir: str = "output
 
     out_dir = Path(output_dir)
     out_dir.mkdir(exist_ok=True)
+    print("OCR backend:", resolve_backend_name(backend))
+    cache = OCRCache(cache_dir or out_dir / ".ocr_cache", cache_max_bytes) if use_cache else None
 
     processed_files = []
     output_files = []
+    failed_files = []
+    timings = {}
+    started = time.perf_counter()
 
-    for img_path in sorted(images):
-        print(f"\nOCRing: {img_path.name}")
-        text = ocr_single_image(img_path, psm=6)
+    results = ocr_images(
+        sorted(images),
+        psm=6,
+        workers=workers,
+        max_in_flight=max_in_flight,
+        ordered=ordered,
+        cache=cache,
+        backend=backend
+    )
+    for result in results:
+        img_path = result.path
+        timings[img_path.name] = result.seconds
+        if not result.ok:
+            print(f"\n❌ Failed: {img_path.name}: {result.error}")
+            failed_files.append({"file": img_path.name, "error": result.error})
+            continue
+
+        if result.cached:
+            print(f"\nCached: {img_path.name}")
+        else:
+            print(f"\nOCRed: {img_path.name} ({result.seconds:.2f}s)")
         out_path = out_dir / f"{img_path.stem}.txt"
-        out_path.write_text(text, encoding="utf-8")
+        out_path.write_text(result.text, encoding="utf-8")
         print(f"Wrote: {out_path.resolve()}")
         
         processed_files.append(img_path.name)
         output_files.append(str(out_path.resolve()))
 
-    print("\n✅ Done.")
+    total_seconds = time.perf_counter() - started
+    print(f"\n✅ Done. {len(processed_files)} OCRed, {len(failed_files)} failed in {total_seconds:.2f}s.")
+    cache_stats = cache.stats() if cache else None
+    if cache_stats:
+        print(f"OCR cache: {cache_stats['hits']} hit(s), {cache_stats['misses']} miss(es), "
+              f"hit rate {cache_stats['hit_rate']:.0%}")
     
     return {
         "processed_files": processed_files,
         "output_files": output_files,
-        "output_dir": str(out_dir.resolve())
+        "output_dir": str(out_dir.resolve()),
+        "failed_files": failed_files,
+        "timings": timings,
+        "total_seconds": total_seconds,
+        "cache": cache_stats
     }
 
 
 def main():
     """Command-line entry point."""
-    # Accept optional folder path as first argument
-    if len(sys.argv) > 1 and not sys.argv[1].startswith("-"):
-        folder = sys.argv[1]
-    else:
-        folder = "menu.jpg"
-    
-    process_menu_images(folder)
+    parser = argparse.ArgumentParser(description="OCR every menu image in a folder.")
+    parser.add_argument("folder", nargs="?", default="menu.jpg", help="Folder of menu images")
+    parser.add_argument("--output-dir", default="outputs", help="Where to write .txt results")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="OCR worker processes (0 = one per CPU, default: 1)")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Images queued on the pool at once (default: 2 x workers)")
+    parser.add_argument("--unordered", action="store_true",
+                        help="Write results as images finish instead of in file order")
+    parser.add_argument("--no-cache", action="store_true", help="OCR every image even if cached")
+    parser.add_argument("--cache-dir", default=None, help="OCR cache location (default: <output-dir>/.ocr_cache)")
+    parser.add_argument("--cache-max-mb", type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help="Size the OCR cache is trimmed to, in MB")
+    parser.add_argument("--backend", choices=["auto", *BACKENDS], default=None,
+                        help="OCR engine (default: $OCR_BACKEND or auto)")
+    args = parser.parse_args()
+
+    try:
+        process_menu_images(
+            args.folder,
+            args.output_dir,
+            workers=args.workers or None,
+            max_in_flight=args.max_in_flight,
+            ordered=not args.unordered,
+            use_cache=not args.no_cache,
+            cache_dir=args.cache_dir,
+            cache_max_bytes=int(args.cache_max_mb * 1024 * 1024),
+            backend=args.backend
+        )
+    except TesseractNotFoundError:
+        print(TESSERACT_INSTALL_HELP)
+        raise
 
 
 if __name__ == "__main__":
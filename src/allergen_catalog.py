@@ -0,0 +1,122 @@
+"""
+Allergen catalog compiled from data/allergens/*.csv.
+
+Both the encoder and the API read allergen names from here, so the CSVs are
+parsed once per process and always the same way. The catalog is versioned
+by a hash of the CSV contents: a code generated against one version of the
+CSVs is only meaningful against the same version.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+import csv
+import hashlib
+import io
+import json
+import threading
+
+CATALOG_FORMAT = 1
+ALLERGENS_DIR = Path(__file__).parent.parent / "data" / "allergens"
+MAIN_FILE = "main_allergens.csv"
+SECONDARY_FILE = "secondary_allergens.csv"
+
+
+@dataclass(frozen=True)
+class AllergenCatalog:
+    """Immutable, precompiled view of the allergen CSVs."""
+    # Format version and sha256 of the CSV bytes; changes whenever the encoding can
+    digest: str
+    # Main allergens in bit order
+    main: Tuple[str, ...]
+    # Secondary group id -> allergens in bit order, groups in ascending id order
+    groups: Dict[int, Tuple[str, ...]]
+    # Allergen -> bit in the main encoding
+    main_bits: Dict[str, int]
+    # Allergen -> ((group, bit), ...); an allergen may sit in several groups
+    secondary_bits: Dict[str, Tuple[Tuple[int, int], ...]]
+    # Distinct allergen names, sorted, for display
+    display: Tuple[str, ...]
+    # {"allergens": display} serialized once for the API
+    display_json: bytes
+
+    @property
+    def version(self) -> str:
+        """Short catalog version, e.g. for logs and cache validators."""
+        return f"{CATALOG_FORMAT}-{self.digest[:12]}"
+
+    @property
+    def all_names(self) -> Tuple[str, ...]:
+        """Every allergen, main first then each group, duplicates included."""
+        return self.main + tuple(name for names in self.groups.values() for name in names)
+
+    def __contains__(self, name: str) -> bool:
+        name = name.lower()
+        return name in self.main_bits or name in self.secondary_bits
+
+
+def _read_rows(data: bytes) -> list:
+    """Parse CSV bytes into dict rows sorted by integer id (blank lines skipped)."""
+    reader = csv.DictReader(io.StringIO(data.decode("utf-8")))
+    return sorted(reader, key=lambda row: int(row["id"]))
+
+
+def compile_catalog(main_csv: bytes, secondary_csv: bytes) -> AllergenCatalog:
+    """
+    Build a catalog from the contents of the two allergen CSVs.
+
+    Args:
+        main_csv: Bytes of main_allergens.csv (columns id, allergen)
+        secondary_csv: Bytes of secondary_allergens.csv (columns id, allergen, group_id)
+    """
+    main_rows = _read_rows(main_csv)
+    secondary_rows = _read_rows(secondary_csv)
+
+    main = tuple(row["allergen"].strip().lower() for row in main_rows)
+    groups: Dict[int, list] = {}
+    for row in secondary_rows:
+        groups.setdefault(int(row["group_id"]), []).append(row["allergen"].strip().lower())
+
+    secondary_bits: Dict[str, list] = {}
+    for group, names in groups.items():
+        for bit, name in enumerate(names):
+            secondary_bits.setdefault(name, []).append((group, bit))
+
+    display = tuple(sorted(set(row["allergen"].strip() for row in main_rows + secondary_rows) - {""}))
+    digest = hashlib.sha256(
+        b"%d\0%s\0%s" % (CATALOG_FORMAT, main_csv, secondary_csv)
+    ).hexdigest()
+    return AllergenCatalog(
+        digest=digest,
+        main=main,
+        groups={group: tuple(names) for group, names in sorted(groups.items())},
+        main_bits={name: bit for bit, name in enumerate(main)},
+        secondary_bits={name: tuple(bits) for name, bits in secondary_bits.items()},
+        display=display,
+        display_json=json.dumps({"allergens": list(display)}, separators=(",", ":")).encode("utf-8"),
+    )
+
+
+_catalogs: Dict[Path, AllergenCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def load_catalog(directory: Optional[Union[str, Path]] = None) -> AllergenCatalog:
+    """
+    Get the catalog for an allergen directory, compiling it on first use.
+
+    Args:
+        directory: Folder holding the two CSVs (default data/allergens)
+    """
+    directory = Path(directory or ALLERGENS_DIR).resolve()
+    catalog = _catalogs.get(directory)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.get(directory)
+            if catalog is None:
+                catalog = compile_catalog(
+                    (directory / MAIN_FILE).read_bytes(),
+                    (directory / SECONDARY_FILE).read_bytes()
+                )
+                _catalogs[directory] = catalog
+    return catalog
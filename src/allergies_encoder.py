@@ -1,114 +1,210 @@
-import numpy
-import pandas as pd
-from typing import Literal
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Literal, Optional
+
+from allergen_catalog import AllergenCatalog, load_catalog
+
+if TYPE_CHECKING:
+    import numpy
+
 
 class AllergiesEncoder:
-    def __init__(self) -> None:
-        main_path= 'data/allergens/main_allergens.csv'
-        secondary_path = 'data/allergens/secondary_allergens.csv'
-        main_df = pd.read_csv(main_path).sort_values('id')
-        secondary_df = pd.read_csv(secondary_path).sort_values('id')
+    # Secondary groups that get a bit in the group map, in bit order
+    GROUP_MAP_ORDER = [0, 1, 2, 3, 4, 5]
+    # Group whose allergen bits are packed above the group map instead of
+    # taking a separate integer
+    PACKED_GROUP = 5
+    PACKED_SHIFT = 6
+
+    def __init__(self, catalog: Optional[AllergenCatalog] = None) -> None:
+        """
+        Args:
+            catalog: Allergen catalog to encode against (default: the shared
+                catalog compiled from data/allergens)
+        """
+        self.catalog = catalog or load_catalog()
+
+        self.lists = {'main': list(self.catalog.main)}
+        for group, names in self.catalog.groups.items():
+            self.lists[group] = list(names)
+
+        self.all_list = list(self.catalog.all_names)
+        self._build_tables()
 
-        main_list = self.lowercase_list(main_df['allergen'].tolist())
+    def _build_tables(self) -> None:
+        """Precompute hash tables so encoding is one dict lookup per allergen."""
+        self._all_set = frozenset(self.all_list)
+        self._main_bits = self.catalog.main_bits
+        self._secondary_bits = self.catalog.secondary_bits
 
-        self.lists = {'main': main_list}
-        for group in secondary_df['group_id'].unique():
-            group_df = secondary_df[secondary_df['group_id'] == group]
-            group_list = self.lowercase_list(group_df['allergen'].tolist())
-            self.lists[group] = group_list
+        self._secondary_groups = [group for group in self.lists if group != 'main']
+        self._group_map_bits = {group: bit for bit, group in enumerate(self.GROUP_MAP_ORDER)}
+        # Groups whose integers follow the group map, in decode order
+        self._unpacked_groups = [
+            group for group in self.GROUP_MAP_ORDER if group != self.PACKED_GROUP
+        ]
+        # Valid bits per group, and secondary bits naming a main allergen (which
+        # encode_all always sets in main instead); used to canonicalize codes
+        self._group_masks = {group: (1 << len(names)) - 1 for group, names in self.lists.items()}
+        self._main_aliases = {
+            group: [(bit, self._main_bits[name]) for bit, name in enumerate(names) if name in self._main_bits]
+            for group, names in self.lists.items() if group != 'main'
+        }
+        self._main_alias_masks = {
+            group: sum(1 << bit for bit, _ in aliases) for group, aliases in self._main_aliases.items()
+        }
+        # Where _unpack_encoding puts each group: (group map bit, slot after main);
+        # None for groups this catalog does not have
+        slots = {group: 1 + i for i, group in enumerate(self._secondary_groups)}
+        self._packed_slot = slots.get(self.PACKED_GROUP)
+        self._unpack_slots = [
+            (1 << self._group_map_bits[group], slots.get(group)) for group in self._unpacked_groups
+        ]
+        # Profile matrix columns: each distinct allergen once, in all_list order
+        self.allergen_columns = list(dict.fromkeys(self.all_list))
+        self._column_index = {a: i for i, a in enumerate(self.allergen_columns)}
+        # Fixed-width array layout: main, group map, then one integer per unpacked group
+        self.array_columns = ['main', 'group_map', *self._unpacked_groups]
+        # numpy tables for the array API, built on first use so that callers
+        # needing only encode_all/decode_all never import numpy
+        self._array_tables_built = False
 
-        self.all_list = self.lowercase_list(list(numpy.concatenate(list(self.lists.values()))))
+    @property
+    def array_allergen_mask(self) -> numpy.ndarray:
+        """
+        AND-ing two array rows with this mask keeps only shared allergen bits;
+        the group-presence bits of the group map say nothing about overlap.
+        """
+        self._build_array_tables()
+        return self._array_allergen_mask
+
+    def _build_array_tables(self) -> None:
+        """Precompute the weight matrices used by encode_many/decode_many (once)."""
+        if self._array_tables_built:
+            return
+        import numpy
+
+        self._array_allergen_mask = numpy.full(len(self.array_columns), -1, dtype=numpy.int64)
+        self._array_allergen_mask[1] = ~((1 << self.PACKED_SHIFT) - 1)
+        n_columns = len(self.allergen_columns)
+
+        # Same split as encode_all: allergens in main are never encoded as secondary
+        self._main_weights = numpy.zeros(n_columns, dtype=numpy.float64)
+        self._group_weights = numpy.zeros((n_columns, len(self._secondary_groups)), dtype=numpy.float64)
+        for allergen, column in self._column_index.items():
+            if allergen in self._main_bits:
+                self._main_weights[column] = 1 << self._main_bits[allergen]
+                continue
+            for group, bit in self._secondary_bits.get(allergen, ()):
+                self._group_weights[column, self._secondary_groups.index(group)] += 1 << bit
+
+        # Every (array column, shift) position an allergen can decode from
+        positions = [(0, bit, self._column_index[a]) for a, bit in self._main_bits.items()]
+        for allergen, bits in self._secondary_bits.items():
+            for group, bit in bits:
+                if group == self.PACKED_GROUP:
+                    positions.append((1, self.PACKED_SHIFT + bit, self._column_index[allergen]))
+                elif group in self._unpacked_groups:
+                    array_column = self.array_columns.index(group)
+                    positions.append((array_column, bit, self._column_index[allergen]))
+        self._position_columns = numpy.array([p[0] for p in positions], dtype=numpy.intp)
+        self._position_shifts = numpy.array([p[1] for p in positions], dtype=numpy.int64)
+        # Split positions into passes that each touch an allergen column at most once
+        passes: list[list[tuple[int, int]]] = []
+        for i, (_, _, column) in enumerate(positions):
+            for decode_pass in passes:
+                if all(column != c for _, c in decode_pass):
+                    decode_pass.append((i, column))
+                    break
+            else:
+                passes.append([(i, column)])
+        self._decode_passes = [
+            (numpy.array([i for i, _ in p], dtype=numpy.intp), numpy.array([c for _, c in p], dtype=numpy.intp))
+            for p in passes
+        ]
+        self._array_tables_built = True
         
     @staticmethod
     def lowercase_list(items:list[str])->list[str]:
         return [item.lower() for item in items]
     
+    @staticmethod
+    def _bits_to_names(encoding: int, names: list[str]) -> list[str]:
+        """Decode by visiting only the set bits, lowest first."""
+        output_list = []
+        while encoding:
+            lowest = encoding & -encoding
+            index = lowest.bit_length() - 1
+            if index < len(names):
+                output_list.append(names[index])
+            encoding ^= lowest
+        return output_list
 
-    def __encode(self, active_list, ref_list)->int:
+    def _encode_main(self, allergens:list[str])->int:
         encoding = 0
-        for allergen in active_list:
-            if allergen not in ref_list:
-                continue
-
-            index = ref_list.index(allergen)
-            encoding |= (1 << index)
+        for allergen in self.lowercase_list(allergens):
+            bit = self._main_bits.get(allergen)
+            if bit is not None:
+                encoding |= (1 << bit)
+            elif allergen not in self._all_set:
+                raise ValueError(f"Allergen '{allergen}' not recognized.")
         return encoding
-
-    def _encode_main(self, allergens:list[str])->int:
-        allergens = self.lowercase_list(allergens)
-        return self.__encode(allergens, self.lists['main'])
-
-    def __decode_main(self, encoding:int, ref_list):
-        output_list = []
-        for index, allergen in enumerate(ref_list):
-            if encoding & (1 << index):
-                output_list.append(allergen)
-        return output_list
     
     def _decode_main(self, encoding:int)->list[str]:
-        return self.__decode_main(encoding, self.lists['main'])
+        return self._bits_to_names(encoding, self.lists['main'])
     
 
     def _encode_secondary_group(self, allergens:list[str])->list[int]:
-        allergens = self.lowercase_list(allergens)
-        allergen_subgroups = {}
-        for group, allergen_list in self.lists.items():
-            if group == 'main':
+        group_encodings: dict[int, int] = {}
+        for allergen in self.lowercase_list(allergens):
+            for group, bit in self._secondary_bits.get(allergen, ()):
+                group_encodings[group] = group_encodings.get(group, 0) | (1 << bit)
+
+        map_encode = 0
+        subgroup_encodes = []
+        for group in self._secondary_groups:
+            encoding = group_encodings.get(group)
+            if encoding is None:
                 continue
-            for allergen in allergens:
-                if allergen in allergen_list:
-                    allergen_subgroups[group] = allergen_subgroups.get(group,set())| {allergen}
-  
-
-        ref_list =[0,1,2,3,4,5]
-        map_encode = self.__encode(list(allergen_subgroups.keys()), ref_list)
-        group_5 = allergen_subgroups.pop(5, None)
-        if group_5:
-            map_encode |= (self.__encode(list(group_5), self.lists[5]) << 6)
-        subgroup_encodes = [self.__encode(list(allergen_subgroups[group]), self.lists[group]) for group in allergen_subgroups]
+            if group in self._group_map_bits:
+                map_encode |= 1 << self._group_map_bits[group]
+            if group == self.PACKED_GROUP:
+                map_encode |= encoding << self.PACKED_SHIFT
+            else:
+                subgroup_encodes.append(encoding)
         return [map_encode, *subgroup_encodes]
     
 
     def _decode_secondary_group(self, encodings:list[int])->list[str]:
-        ref_list = [0, 1, 2, 3, 4, 5]
-
         map_encode = encodings[0]
-        group_5_encoding = map_encode >> 6
-        map_encode_lower = map_encode & 0b11111  # Keep only lower 5 bits
+        group_5_encoding = map_encode >> self.PACKED_SHIFT
 
-        group_map = self.__decode_main(map_encode_lower, ref_list)
         decoded_allergens = []
-        
-        for i, group in enumerate(group_map):
-            subgroup_encoding = encodings[i + 1]
-            decoded_allergens.extend(self.__decode_main(subgroup_encoding, self.lists[group]))
+        i = 1
+        for group in self._unpacked_groups:
+            if map_encode & (1 << self._group_map_bits[group]):
+                decoded_allergens.extend(self._bits_to_names(encodings[i], self.lists[group]))
+                i += 1
         
         # Decode group 5 from upper bits if present
         if group_5_encoding:
-            decoded_allergens.extend(self.__decode_main(group_5_encoding, self.lists[5]))
+            decoded_allergens.extend(self._bits_to_names(group_5_encoding, self.lists[self.PACKED_GROUP]))
         
         return decoded_allergens
     
 
     def encode_all(self, allergens:list[str])->list[int]:
-        allergens = self.lowercase_list(allergens)
-        
         # Remove duplicates while preserving order
-        seen = set()
-        unique_allergens = []
-        for allergen in allergens:
-            if allergen not in seen:
-                seen.add(allergen)
-                unique_allergens.append(allergen)
+        unique_allergens = list(dict.fromkeys(self.lowercase_list(allergens)))
         
         # Validate all allergens exist
         for allergen in unique_allergens:
-            if allergen not in self.all_list:
+            if allergen not in self._all_set:
                 raise ValueError(f"Allergen '{allergen}' not recognized.")
         
         # Separate main and secondary allergens to avoid double-encoding
-        main_allergens = [a for a in unique_allergens if a in self.lists['main']]
-        secondary_allergens = [a for a in unique_allergens if a not in self.lists['main']]
+        main_allergens = [a for a in unique_allergens if a in self._main_bits]
+        secondary_allergens = [a for a in unique_allergens if a not in self._main_bits]
 
         main = self._encode_main(main_allergens)
         secondary = self._encode_secondary_group(secondary_allergens)
@@ -119,16 +215,216 @@ class AllergiesEncoder:
         secondary = self._decode_secondary_group(encodings[1:])
         
         # Remove duplicates from decoded result while preserving order
-        seen = set()
-        result = []
-        for allergen in [*main, *secondary]:
-            if allergen not in seen:
-                seen.add(allergen)
-                result.append(allergen)
-        
-        return result
+        return list(dict.fromkeys([*main, *secondary]))
+    
+    def _unpack_encoding(self, encoding:list[int])->list[int]:
+        """
+        Fixed-width form of an encode_all output: [main, *one value per secondary
+        group in _secondary_groups order]. Bits are left as found; see _canonical.
+
+        Raises:
+            ValueError: If the encoding has no group map, or fewer integers than
+                its group map names
+        """
+        if len(encoding) < 2:
+            raise ValueError(f"Encoding {encoding} has no group map.")
+        unpacked = [encoding[0]] + [0] * len(self._secondary_groups)
+        group_map = encoding[1]
+        if self._packed_slot is not None:
+            unpacked[self._packed_slot] = group_map >> self.PACKED_SHIFT
+        i = 2
+        for presence, slot in self._unpack_slots:
+            if group_map & presence:
+                if i >= len(encoding):
+                    raise ValueError(f"Encoding {encoding} has fewer integers than its group map names.")
+                if slot is not None:
+                    unpacked[slot] = encoding[i]
+                i += 1
+        return unpacked
+
+    def _canonical(self, unpacked:list[int])->list[int]:
+        """
+        Keep only bits that name an allergen, and move secondary bits of main
+        allergens to main, as encode_all would have set them.
+        """
+        main = unpacked[0] & self._group_masks['main']
+        groups = []
+        for group, value in zip(self._secondary_groups, unpacked[1:]):
+            value &= self._group_masks[group]
+            if value & self._main_alias_masks[group]:
+                for bit, main_bit in self._main_aliases[group]:
+                    if value & (1 << bit):
+                        value &= ~(1 << bit)
+                        main |= 1 << main_bit
+            groups.append(value)
+        return [main, *groups]
+
+    def _pack_encoding(self, unpacked:list[int])->list[int]:
+        """Inverse of _unpack_encoding: rebuild the group map from the non-empty groups."""
+        main, *groups = unpacked
+        values = dict(zip(self._secondary_groups, groups))
+        group_map = 0
+        subgroup_encodes = []
+        for group in self._secondary_groups:
+            value = values[group]
+            if not value:
+                continue
+            if group in self._group_map_bits:
+                group_map |= 1 << self._group_map_bits[group]
+            if group == self.PACKED_GROUP:
+                group_map |= value << self.PACKED_SHIFT
+            else:
+                subgroup_encodes.append(value)
+        return [main, group_map, *subgroup_encodes]
+
+    def combine_lists_of_encodings(
+        self,
+        encodings:list[list[int]],
+        method:Literal['union', 'intersection'] = 'union'
+    )->list[int]:
+        """
+        Combine encode_all outputs without decoding them to allergen names.
+
+        Bits are OR-ed (union: anything any member avoids) or AND-ed
+        (intersection: what every member avoids) group by group, and the group
+        map is rebuilt from the groups left non-empty. The result equals
+        encode_all of the union/intersection of the decoded allergen lists.
+
+        Raises:
+            ValueError: If there are no encodings, the method is unknown or an
+                encoding is malformed
+        """
+        if not encodings:
+            raise ValueError("No encodings to combine.")
+        if method not in ('union', 'intersection'):
+            raise ValueError(f"Unknown combine method '{method}'; use 'union' or 'intersection'.")
+
+        if method == 'union':
+            # Canonicalizing distributes over OR, so it is done once at the end
+            combined = self._unpack_encoding(encodings[0])
+            for encoding in encodings[1:]:
+                for slot, value in enumerate(self._unpack_encoding(encoding)):
+                    combined[slot] |= value
+            return self._pack_encoding(self._canonical(combined))
+
+        combined = self._canonical(self._unpack_encoding(encodings[0]))
+        for encoding in encodings[1:]:
+            for slot, value in enumerate(self._canonical(self._unpack_encoding(encoding))):
+                combined[slot] &= value
+        return self._pack_encoding(combined)
+
+    def profiles_to_matrix(self, profiles:list[list[str]])->numpy.ndarray:
+        """
+        Build a profile x allergen boolean matrix with columns in `allergen_columns` order.
+
+        Raises:
+            ValueError: If any allergen is not recognized
+        """
+        import numpy
+        matrix = numpy.zeros((len(profiles), len(self.allergen_columns)), dtype=bool)
+        for row, allergens in enumerate(profiles):
+            for allergen in self.lowercase_list(allergens):
+                column = self._column_index.get(allergen)
+                if column is None:
+                    raise ValueError(f"Allergen '{allergen}' not recognized.")
+                matrix[row, column] = True
+        return matrix
+
+    def matrix_to_profiles(self, matrix:numpy.ndarray)->list[list[str]]:
+        """Convert a boolean profile matrix back to allergen name lists."""
+        import numpy
+        return [
+            [self.allergen_columns[column] for column in numpy.flatnonzero(row)]
+            for row in numpy.asarray(matrix, dtype=bool)
+        ]
+
+    def encode_many(self, profiles:numpy.ndarray)->numpy.ndarray:
+        """
+        Encode many profiles at once.
+
+        Args:
+            profiles: Boolean matrix of shape (n_profiles, len(allergen_columns))
+
+        Returns:
+            int64 array of shape (n_profiles, len(array_columns)); row i holds the
+            same integers as encode_all for profile i, with absent groups as 0
+        """
+        import numpy
+        self._build_array_tables()
+        profiles = numpy.asarray(profiles, dtype=bool)
+        if profiles.ndim != 2 or profiles.shape[1] != len(self.allergen_columns):
+            raise ValueError(
+                f"Expected a matrix with {len(self.allergen_columns)} columns, got shape {profiles.shape}"
+            )
+        # Bits within a group are distinct, so a sum of weights equals their OR.
+        # Float matmul goes through BLAS and is exact for these small integers.
+        weights = profiles.astype(numpy.float64)
+        groups = (weights @ self._group_weights).astype(numpy.int64)
+
+        encoded = numpy.zeros((len(profiles), len(self.array_columns)), dtype=numpy.int64)
+        encoded[:, 0] = (weights @ self._main_weights).astype(numpy.int64)
+        for i, group in enumerate(self._secondary_groups):
+            if group not in self._group_map_bits:
+                continue
+            encoded[:, 1] |= (groups[:, i] != 0).astype(numpy.int64) << self._group_map_bits[group]
+            if group == self.PACKED_GROUP:
+                encoded[:, 1] |= groups[:, i] << self.PACKED_SHIFT
+            else:
+                encoded[:, self.array_columns.index(group)] = groups[:, i]
+        return encoded
+
+    def decode_many(self, encoded:numpy.ndarray)->numpy.ndarray:
+        """
+        Decode many fixed-width encodings at once.
+
+        Args:
+            encoded: Integer array of shape (n, len(array_columns)), as from encode_many
+
+        Returns:
+            Boolean matrix of shape (n, len(allergen_columns))
+        """
+        import numpy
+        self._build_array_tables()
+        encoded = numpy.asarray(encoded, dtype=numpy.int64)
+        if encoded.ndim != 2 or encoded.shape[1] != len(self.array_columns):
+            raise ValueError(
+                f"Expected an array with {len(self.array_columns)} columns, got shape {encoded.shape}"
+            )
+        hits = ((encoded[:, self._position_columns] >> self._position_shifts) & 1).astype(bool)
+        decoded = numpy.zeros((len(encoded), len(self.allergen_columns)), dtype=bool)
+        for positions, columns in self._decode_passes:
+            decoded[:, columns] |= hits[:, positions]
+        return decoded
+
+    def encodings_to_array(self, encodings:list[list[int]])->numpy.ndarray:
+        """Pack variable-length encode_all outputs into the fixed-width array layout."""
+        import numpy
+        array = numpy.zeros((len(encodings), len(self.array_columns)), dtype=numpy.int64)
+        for row, encoding in enumerate(encodings):
+            array[row, 0] = encoding[0]
+            if len(encoding) < 2:
+                continue
+            group_map = encoding[1]
+            array[row, 1] = group_map
+            i = 2
+            for column, group in enumerate(self._unpacked_groups, start=2):
+                if group_map & (1 << self._group_map_bits[group]):
+                    array[row, column] = encoding[i]
+                    i += 1
+        return array
+
+    def array_to_encodings(self, array:numpy.ndarray)->list[list[int]]:
+        """Unpack the fixed-width array layout into encode_all-style integer lists."""
+        import numpy
+        encodings = []
+        for main, group_map, *groups in numpy.asarray(array, dtype=numpy.int64).tolist():
+            present = [
+                value for group, value in zip(self._unpacked_groups, groups)
+                if group_map & (1 << self._group_map_bits[group])
+            ]
+            encodings.append([main, group_map, *present])
+        return encodings
     
-       
     
 if __name__ == "__main__":
     encoder = AllergiesEncoder()
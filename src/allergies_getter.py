@@ -1,9 +1,14 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union
 import logging
-import pickle
 from pathlib import Path
 
 from allergies_encoder import AllergiesEncoder
+from lru_cache import LRUCache
+from word_index import WordIndex
+from word_table import MappedWordTable, WordTableError
+
+# Outcome of one batch item: (result, None) on success, (None, error message) on failure
+BatchResult = Tuple[Optional[List[str]], Optional[str]]
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -12,23 +17,40 @@ logger = logging.getLogger(__name__)
 class AllergiesGetter:
     """Converts between allergies and database words using encoding."""
     
-    def __init__(self, auto_init_db: bool = True):
+    # Binary word table used when PostgreSQL is unavailable
+    WORD_TABLE_PATH = Path(__file__).parent.parent / "data" / "word_mapping.bin"
+    
+    def __init__(
+        self,
+        auto_init_db: bool = True,
+        preload_words: bool = True,
+        cache_size: int = 1024,
+        cache_ttl: Optional[float] = None
+    ):
         """
         Initialize AllergiesGetter with encoder and database connection.
         Automatically falls back to dump file if PostgreSQL is unavailable.
         
         Args:
             auto_init_db: Whether to automatically initialize database if needed
+            preload_words: Whether to load the whole word table into memory so
+                lookups never hit the database
+            cache_size: Maximum entries in each of the encode and decode caches
+            cache_ttl: Seconds a cached code stays valid (None = until evicted)
         """
         self.encoder = AllergiesEncoder()
         self.db = None
         self.use_dump = False
-        self.word_mapping = {}  # For dump file fallback
+        self.word_index: Optional[Union[WordIndex, MappedWordTable]] = None
+        # Keyed by sorted allergen set / normalized code words
+        self._encode_cache = LRUCache(cache_size, cache_ttl)
+        self._decode_cache = LRUCache(cache_size, cache_ttl)
         
         # Try PostgreSQL first
         try:
             from db_manager import DatabaseManager
-            self.db = DatabaseManager()
+            # Pooled so the getter can be shared across worker threads
+            self.db = DatabaseManager(use_pool=True)
             
             # Initialize database if it doesn't exist or is empty
             if auto_init_db:
@@ -52,12 +74,16 @@ class AllergiesGetter:
                     logger.info("Trying to use dump file instead...")
                     if not self._load_from_dump():
                         raise RuntimeError("Cannot initialize database or load dump file")
+
+            # Inside the try, so a failed word load also falls back to the dump
+            if preload_words and not self.use_dump:
+                self.reload_word_index()
                     
         except ImportError as e:
             logger.warning(f"PostgreSQL not available: {e}")
             logger.info("Using database dump file instead...")
             if not self._load_from_dump():
-                raise RuntimeError("Cannot load database dump file. Please ensure data/database/word_mapping.pkl exists")
+                raise RuntimeError(f"Cannot load database dump file. Please ensure {self.WORD_TABLE_PATH} exists")
         except Exception as e:
             logger.warning(f"Database connection failed: {e}")
             logger.info("Falling back to database dump file...")
@@ -65,26 +91,28 @@ class AllergiesGetter:
                 raise RuntimeError("Cannot connect to database or load dump file")
         
         if self.use_dump:
-            logger.info(f"Using dump file with {len(self.word_mapping)} words")
+            logger.info(f"Using dump file with {len(self.word_index)} words")
         else:
             logger.info("Using PostgreSQL database")
     
     def _load_from_dump(self) -> bool:
         """
-        Load word mapping from pickle dump file.
+        Memory-map the binary word table file (see word_table.py).
+        The mapping is read-only, so worker processes share its pages.
         
         Returns:
             True if successful, False otherwise
         """
-        dump_path = Path(__file__).parent.parent / "data" / "database" / "word_mapping.pkl"
+        dump_path = self.WORD_TABLE_PATH
         
         if not dump_path.exists():
             logger.error(f"Dump file not found at {dump_path}")
             return False
         
         try:
-            with open(dump_path, 'rb') as f:
-                self.word_mapping = pickle.load(f)
+            # A replaced table is left for the garbage collector, since other
+            # threads may still be reading from it
+            self.word_index = MappedWordTable(dump_path)
             
             self.use_dump = True
             # Close any database connection
@@ -95,37 +123,72 @@ class AllergiesGetter:
                     pass
                 self.db = None
             
-            logger.info(f"Loaded {len(self.word_mapping)} words from dump file")
+            logger.info(f"Loaded {len(self.word_index)} words from dump file")
             return True
             
-        except Exception as e:
+        except WordTableError as e:
             logger.error(f"Failed to load dump file: {e}")
             return False
     
-    def get_total_words(self) -> int:
-        """Get total number of words in the database or dump."""
+    def reload_word_index(self) -> int:
+        """
+        (Re)load the in-memory word index from the active backend.
+        Call this after the word mapping table has changed.
+        
+        Returns:
+            Number of words in the index
+        """
         if self.use_dump:
-            return len(self.word_mapping)
+            if not self._load_from_dump():
+                raise RuntimeError(f"Cannot reload word table from {self.WORD_TABLE_PATH}")
         else:
-            return self.db.get_total_words()
+            self.word_index = WordIndex(self.db.get_all_words())
+        
+        # Cached codes may refer to the old table
+        self._encode_cache.clear()
+        self._decode_cache.clear()
+        logger.info(f"Loaded word index with {len(self.word_index)} words")
+        return len(self.word_index)
+    
+    def get_total_words(self) -> int:
+        """Get total number of words in the database or dump."""
+        if self.word_index is not None:
+            return len(self.word_index)
+        return self.db.get_total_words()
     
     def get_word_by_number(self, number: int) -> Optional[str]:
         """Get word by its number."""
-        if self.use_dump:
-            return self.word_mapping.get(number)
-        else:
-            return self.db.get_word_by_number(number)
+        if self.word_index is not None:
+            return self.word_index.word_for(number)
+        return self.db.get_word_by_number(number)
     
     def get_number_by_word(self, word: str) -> Optional[int]:
         """Get number by word."""
-        if self.use_dump:
-            # Reverse lookup in dictionary
-            for num, w in self.word_mapping.items():
-                if w == word:
-                    return num
-            return None
-        else:
-            return self.db.get_number_by_word(word)
+        if self.word_index is not None:
+            return self.word_index.number_for(word)
+        return self.db.get_number_by_word(word)
+    
+    def get_words_by_numbers(self, numbers: List[int]) -> List[Optional[str]]:
+        """
+        Get words for many numbers in one pass (one query without the word index).
+        
+        Returns:
+            Words in input order, with None for every number that has no word
+        """
+        if self.word_index is not None:
+            return self.word_index.words_for(numbers)
+        return self.db.get_words_by_numbers(numbers)
+    
+    def get_numbers_by_words(self, words: List[str]) -> List[Optional[int]]:
+        """
+        Get numbers for many words in one pass (one query without the word index).
+        
+        Returns:
+            Numbers in input order, with None for every unknown word
+        """
+        if self.word_index is not None:
+            return self.word_index.numbers_for(words)
+        return self.db.get_numbers_by_words(words)
     
     def allergies_to_words(self, allergens: List[str]) -> List[Optional[str]]:
         """
@@ -137,29 +200,38 @@ class AllergiesGetter:
         Returns:
             List of words from database representing the encoded allergies
         """
+        cache_key = tuple(sorted(set(self.encoder.lowercase_list(allergens))))
+        cached = self._encode_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
         # Encode allergens to list of numbers
         encoded_numbers = self.encoder.encode_all(allergens)
         
         # Check if any encoding exceeds database range
         total_words = self.get_total_words()
-        words = []
-        
         for i, encoded_number in enumerate(encoded_numbers):
             if encoded_number > total_words:
                 logger.warning(
                     f"Encoded number {encoded_number} at index {i} exceeds database size ({total_words} words). "
                     f"This allergen combination cannot be represented."
                 )
-                words.append(None)
-            else:
-                word = self.get_word_by_number(encoded_number)
-                if not word:
-                    logger.warning(
-                        f"No word found for number {encoded_number} at index {i}. "
-                        f"Database may need to be reinitialized."
-                    )
-                words.append(word)
         
+        in_range = [n for n in encoded_numbers if n <= total_words]
+        found = dict(zip(in_range, self.get_words_by_numbers(in_range)))
+        words = []
+        
+        for i, encoded_number in enumerate(encoded_numbers):
+            word = found.get(encoded_number)
+            if encoded_number <= total_words and not word:
+                logger.warning(
+                    f"No word found for number {encoded_number} at index {i}. "
+                    f"Database may need to be reinitialized."
+                )
+            words.append(word)
+        
+        if all(word is not None for word in words):
+            self._encode_cache.put(cache_key, tuple(words))
         return words
     
     def words_to_allergies(self, words: List[str]) -> Optional[List[str]]:
@@ -172,20 +244,105 @@ class AllergiesGetter:
         Returns:
             List of allergen names, or None if any word not found
         """
+        cache_key = tuple(word.lower() for word in words)
+        cached = self._decode_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
         # Get numbers from database
-        numbers = []
-        for word in words:
-            number = self.get_number_by_word(word)
-            if number is None:
-                logger.warning(f"Word '{word}' not found in database")
-                return None
-            numbers.append(number)
+        numbers = self.get_numbers_by_words(words)
+        missing = [word for word, number in zip(words, numbers) if number is None]
+        if missing:
+            logger.warning(f"Words not found in database: {missing}")
+            return None
         
         # Decode numbers to allergens
         allergens = self.encoder.decode_all(numbers)
         
+        self._decode_cache.put(cache_key, tuple(allergens))
         return allergens
     
+    def allergies_to_words_batch(self, allergen_lists: List[List[str]]) -> List[BatchResult]:
+        """
+        Encode many allergen lists, resolving all their numbers in one word lookup.
+        
+        Args:
+            allergen_lists: One list of allergen names per code
+            
+        Returns:
+            (words, None) or (None, error) per input, in input order
+        """
+        results: List[Optional[BatchResult]] = [None] * len(allergen_lists)
+        pending = {}
+        for i, allergens in enumerate(allergen_lists):
+            cache_key = tuple(sorted(set(self.encoder.lowercase_list(allergens))))
+            cached = self._encode_cache.get(cache_key)
+            if cached is not None:
+                results[i] = (list(cached), None)
+                continue
+            try:
+                pending[i] = (cache_key, self.encoder.encode_all(allergens))
+            except ValueError as e:
+                results[i] = (None, str(e))
+        
+        if pending:
+            total_words = self.get_total_words()
+            numbers = sorted({n for _, encoded in pending.values() for n in encoded if n <= total_words})
+            found = dict(zip(numbers, self.get_words_by_numbers(numbers)))
+            for i, (cache_key, encoded) in pending.items():
+                words = [found.get(n) for n in encoded]
+                if any(word is None for word in words):
+                    results[i] = (None, "This allergen combination cannot be represented by the word table")
+                    continue
+                self._encode_cache.put(cache_key, tuple(words))
+                results[i] = (words, None)
+        return results
+    
+    def words_to_allergies_batch(self, codes: List[List[str]]) -> List[BatchResult]:
+        """
+        Decode many codes, resolving all their words in one word lookup.
+        
+        Args:
+            codes: One list of database words per code
+            
+        Returns:
+            (allergens, None) or (None, error) per input, in input order
+        """
+        results: List[Optional[BatchResult]] = [None] * len(codes)
+        pending = {}
+        for i, words in enumerate(codes):
+            cache_key = tuple(word.lower() for word in words)
+            cached = self._decode_cache.get(cache_key)
+            if cached is not None:
+                results[i] = (list(cached), None)
+            else:
+                pending[i] = cache_key
+        
+        if pending:
+            unique_words = list(dict.fromkeys(word for key in pending.values() for word in key))
+            found = dict(zip(unique_words, self.get_numbers_by_words(unique_words)))
+            for i, cache_key in pending.items():
+                missing = [word for word in cache_key if found[word] is None]
+                if missing:
+                    results[i] = (None, f"Words not found in database: {', '.join(missing)}")
+                    continue
+                try:
+                    allergens = self.encoder.decode_all([found[word] for word in cache_key])
+                except IndexError:
+                    # The group map names more groups than the code has words
+                    results[i] = (None, "Code is missing words for the allergen groups it encodes")
+                    continue
+                self._decode_cache.put(cache_key, tuple(allergens))
+                results[i] = (allergens, None)
+        return results
+    
+    def cache_stats(self) -> dict:
+        """Hit/miss/eviction counters of the encode and decode caches."""
+        return {
+            "encode": self._encode_cache.stats(),
+            "decode": self._decode_cache.stats()
+        }
+    
     def phrases_list_to_combined_encoding(self, phrases_list: List[List[str]], method: str ='union')->Optional[List[int]]:
         """
         Combine multiple lists of allergen phrases into a single encoding.
@@ -210,9 +367,11 @@ class AllergiesGetter:
         return combined_encoding
     
     def close(self):
-        """Close database connection."""
+        """Close database connection and release the word table mapping."""
         if self.db:
             self.db.close()
+        if isinstance(self.word_index, MappedWordTable):
+            self.word_index.close()
     
     def __enter__(self):
         """Context manager entry."""
@@ -276,6 +435,9 @@ if __name__ == "__main__":
         all_phrases = list(all_phrases)
         direct_encoding = getter.encoder.encode_all(all_phrases)
         print(f"\nDirect Encoding of all phrases: {direct_encoding}")
+        combined_encoding = getter.phrases_list_to_combined_encoding(phrases_list)
+        print(f"Combined encoding (bitwise union): {combined_encoding}")
+        print(f"Matches direct encoding: {combined_encoding == direct_encoding}")
 
         #additional check using phrases of different sizes
         phrases_list_varied = [
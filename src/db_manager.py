@@ -1,11 +1,19 @@
 import os
+import re
+import time
 import psycopg2
 from psycopg2 import sql
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-from typing import Optional, List, Tuple
+from contextlib import contextmanager
+from typing import Optional, List, Tuple, Dict, Any, Iterable, Iterator
 import logging
 from dotenv import load_dotenv
 import subprocess
+import threading
+
+from db_pool import ConnectionPool
+from dictionary_words import DICTIONARY_WORDS_PATH, DictionaryWordsError, load_word_list, rank_words
+from word_table import write_word_table
 
 # Load environment variables from .env file
 load_dotenv()
@@ -14,6 +22,69 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# One "(number, 'word')," row of an export_to_sql file
+SQL_EXPORT_ROW = re.compile(r"^\s*\((\d+),\s*'((?:[^']|'')*)'\)[,;]\s*$")
+
+
+def _copy_escape(value: str) -> str:
+    """Escape a value for PostgreSQL's COPY text format."""
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class CopyRowStream:
+    """
+    File-like reader that renders (number, word) rows as COPY text on demand,
+    so the rows never have to be materialised as one big buffer.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, str]], total: Optional[int] = None, progress_every: int = 50000):
+        """
+        Args:
+            rows: Rows to stream
+            total: Expected row count, for progress messages
+            progress_every: Log progress after this many rows
+        """
+        self._rows = iter(rows)
+        self._buffer = b""
+        self.total = total
+        self.progress_every = progress_every
+        self.rows = 0
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            number, word = row
+            self._buffer += f"{int(number)}\t{_copy_escape(word)}\n".encode("utf-8")
+            self.rows += 1
+            if self.rows % self.progress_every == 0:
+                of_total = f"/{self.total}" if self.total else ""
+                logger.info(f"Copied {self.rows}{of_total} rows...")
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+    def readline(self, size: int = -1) -> bytes:
+        return self.read(size)
+
+
+def parse_sql_export(lines: Iterable[str]) -> Optional[List[Tuple[int, str]]]:
+    """
+    Extract the (number, word) rows of a file written by export_to_sql.
+
+    Returns:
+        The rows, or None if the file has no rows in the export format
+    """
+    rows = []
+    for line in lines:
+        match = SQL_EXPORT_ROW.match(line)
+        if match:
+            rows.append((int(match.group(1)), match.group(2).replace("''", "'")))
+    return rows or None
+
+
 class DatabaseManager:
     """Manages PostgreSQL database for standard allergen encoding."""
     
@@ -27,7 +98,11 @@ class DatabaseManager:
         host: str = None,
         port: str = None,
         user: str = None,
-        password: str = None
+        password: str = None,
+        use_pool: bool = False,
+        pool_min_size: int = None,
+        pool_max_size: int = None,
+        pool_timeout: float = None
     ):
         """
         Initialize DatabaseManager with connection parameters.
@@ -38,6 +113,11 @@ class DatabaseManager:
             port: Database port (defaults to env var DB_PORT or '5432')
             user: Database user (defaults to env var DB_USER or 'postgres')
             password: Database password (defaults to env var DB_PASSWORD)
+            use_pool: Serve queries from a thread-safe connection pool instead
+                of the single shared connection
+            pool_min_size: Idle connections kept open (defaults to env var DB_POOL_MIN_SIZE or 1)
+            pool_max_size: Maximum open connections (defaults to env var DB_POOL_MAX_SIZE or 10)
+            pool_timeout: Seconds to wait for a free connection (defaults to env var DB_POOL_TIMEOUT or 5)
         """
         self.db_name = db_name
         self.host = host or os.getenv('DB_HOST', 'localhost')
@@ -52,6 +132,13 @@ class DatabaseManager:
             )
         
         self.connection: Optional[psycopg2.extensions.connection] = None
+        
+        self.use_pool = use_pool
+        self.pool_min_size = pool_min_size if pool_min_size is not None else int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+        self.pool_max_size = pool_max_size if pool_max_size is not None else int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+        self.pool_timeout = pool_timeout if pool_timeout is not None else float(os.getenv('DB_POOL_TIMEOUT', '5'))
+        self._pool: Optional[ConnectionPool] = None
+        self._pool_lock = threading.Lock()
     
     def _get_connection(self, database: str = 'postgres') -> psycopg2.extensions.connection:
         """Create a database connection."""
@@ -106,8 +193,7 @@ class DatabaseManager:
             return
         
         # Close any existing connections
-        if self.connection and not self.connection.closed:
-            self.connection.close()
+        self.close()
         
         conn = self._get_connection()
         conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
@@ -139,10 +225,84 @@ class DatabaseManager:
             logger.info(f"Connected to database '{self.db_name}'.")
     
     def close(self):
-        """Close the database connection."""
+        """Close the database connection and the pool, if any."""
         if self.connection and not self.connection.closed:
             self.connection.close()
             logger.info("Database connection closed.")
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+    
+    def _get_pool(self) -> ConnectionPool:
+        """Create the connection pool on first use, once even with concurrent callers."""
+        pool = self._pool
+        if pool is None:
+            with self._pool_lock:
+                pool = self._pool
+                if pool is None:
+                    pool = ConnectionPool(
+                        lambda: self._get_connection(self.db_name),
+                        min_size=self.pool_min_size,
+                        max_size=self.pool_max_size,
+                        timeout=self.pool_timeout,
+                        broken_errors=(psycopg2.OperationalError, psycopg2.InterfaceError)
+                    )
+                    self._pool = pool
+                    logger.info(
+                        f"Connection pool for '{self.db_name}' ready "
+                        f"({self.pool_min_size}-{self.pool_max_size} connections)."
+                    )
+        return pool
+    
+    @contextmanager
+    def cursor(self) -> Iterator[psycopg2.extensions.cursor]:
+        """
+        Yield a cursor for a read query.
+        Uses a pooled connection in pool mode, otherwise the shared connection.
+        """
+        if self.use_pool:
+            with self._get_pool().connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    yield cursor
+                finally:
+                    cursor.close()
+        else:
+            self.connect()
+            cursor = self.connection.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+    
+    @contextmanager
+    def transaction(self) -> Iterator[psycopg2.extensions.cursor]:
+        """
+        Yield a cursor for writes, committed on success and rolled back on error.
+        Uses a pooled connection in pool mode, otherwise the shared connection.
+        """
+        with (self._get_pool().connection() if self.use_pool else self._shared_connection()) as conn:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+    
+    @contextmanager
+    def _shared_connection(self) -> Iterator[psycopg2.extensions.connection]:
+        self.connect()
+        yield self.connection
+    
+    def pool_stats(self) -> Optional[Dict[str, Any]]:
+        """Get connection pool statistics, or None when not pooling."""
+        if self._pool is None:
+            return None
+        return self._pool.stats()
     
     def create_word_mapping_table(self):
         """Create the word mapping table if it doesn't exist."""
@@ -169,12 +329,21 @@ class DatabaseManager:
     
     def get_dictionary_words(self, max_words: int = None) -> List[str]:
         """
-        Get English dictionary words between 3-6 letters.
-        Uses nltk words corpus with frequency data, falls back to system dictionary.
+        Get English dictionary words between 3-7 letters, most common first.
+        Reads the precomputed list in data/dictionary_words.txt; if it is
+        missing or stale, counts the nltk Brown corpus, then falls back to
+        the nltk words corpus and the system dictionary.
         
         Args:
             max_words: Maximum number of most common words to return (None = all words)
         """
+        try:
+            words = load_word_list(DICTIONARY_WORDS_PATH, self.MIN_WORD_LENGTH, self.MAX_WORD_LENGTH)
+            logger.info(f"Loaded {len(words)} words from {DICTIONARY_WORDS_PATH}")
+            return words[:max_words] if max_words else words
+        except DictionaryWordsError as e:
+            logger.warning(f"Precomputed word list unavailable: {e}")
+        
         # Try using nltk with word frequency first (most portable)
         try:
             import nltk
@@ -188,19 +357,10 @@ class DatabaseManager:
                 nltk.download('brown', quiet=False)
                 from nltk.corpus import brown
             
-            # Get word frequencies from Brown corpus
-            word_freq = {}
-            for word in brown.words():
-                word_lower = word.lower()
-                if word_lower.isalpha() and self.MIN_WORD_LENGTH <= len(word_lower) <= self.MAX_WORD_LENGTH:
-                    word_freq[word_lower] = word_freq.get(word_lower, 0) + 1
-            
-            # Sort by frequency and take most common (or all if max_words is None)
-            sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
+            # Rank words by frequency in the Brown corpus
+            filtered_words = rank_words(brown.words(), self.MIN_WORD_LENGTH, self.MAX_WORD_LENGTH)
             if max_words:
-                filtered_words = [word for word, freq in sorted_words[:max_words]]
-            else:
-                filtered_words = [word for word, freq in sorted_words]
+                filtered_words = filtered_words[:max_words]
             
             logger.info(f"Loaded {len(filtered_words)} most common words from Brown corpus")
             return filtered_words
@@ -256,45 +416,91 @@ class DatabaseManager:
         logger.warning("No dictionary found, using fallback words.")
         return ['the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'her']
     
-    def populate_word_mapping(self):
-        """Populate the word mapping table with dictionary words."""
-        self.connect()
-        cursor = self.connection.cursor()
+    def bulk_load_words(self, rows: Iterable[Tuple[int, str]], total: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Bulk-load (number, word) rows into word_mapping.
         
-        try:
+        Rows are streamed with COPY FROM STDIN into a temporary staging table,
+        then merged with a single INSERT ... SELECT that skips numbers or words
+        already present. Everything runs in one transaction.
+        
+        Args:
+            rows: Rows to load, in any order
+            total: Expected row count, for progress messages
+        
+        Returns:
+            Dictionary with "copied" and "inserted" row counts and
+            "copy_seconds", "merge_seconds" and "total_seconds" timings
+        """
+        started = time.perf_counter()
+        stream = CopyRowStream(rows, total)
+        
+        with self.transaction() as cursor:
+            cursor.execute("""
+                CREATE TEMP TABLE word_mapping_staging (
+                    number INTEGER NOT NULL,
+                    word TEXT NOT NULL
+                ) ON COMMIT DROP
+            """)
+            cursor.copy_expert("COPY word_mapping_staging (number, word) FROM STDIN", stream)
+            copied = time.perf_counter()
+            logger.info(f"Copied {stream.rows} rows into staging in {copied - started:.2f}s.")
+            
+            cursor.execute("""
+                INSERT INTO word_mapping (number, word)
+                SELECT number, word
+                FROM word_mapping_staging
+                ORDER BY number
+                ON CONFLICT DO NOTHING
+            """)
+            inserted = cursor.rowcount
+            cursor.execute("ANALYZE word_mapping")
+            merged = time.perf_counter()
+        
+        stats = {
+            "copied": stream.rows,
+            "inserted": inserted,
+            "copy_seconds": copied - started,
+            "merge_seconds": merged - copied,
+            "total_seconds": time.perf_counter() - started,
+        }
+        logger.info(
+            f"Merged {inserted} new words in {stats['merge_seconds']:.2f}s "
+            f"({stats['total_seconds']:.2f}s total)."
+        )
+        return stats
+    
+    def populate_word_mapping(self) -> Optional[Dict[str, Any]]:
+        """
+        Populate the word mapping table with dictionary words.
+        
+        Returns:
+            bulk_load_words statistics, or None if the table already had data
+        """
+        with self.cursor() as cursor:
             # Check if table already has data
             cursor.execute("SELECT COUNT(*) FROM word_mapping")
             count = cursor.fetchone()[0]
-            
-            if count > 0:
-                logger.info(f"Word mapping table already contains {count} entries.")
-                return
-            
-            # Get dictionary words
-            words = self.get_dictionary_words()
-            
-            # Insert words with sequential numbers, starting with "none" at 0
-            insert_query = """
-                INSERT INTO word_mapping (number, word)
-                VALUES (%s, %s)
-                ON CONFLICT (word) DO NOTHING
-            """
-            
-            # Add "none" as the first entry (number 0)
-            data = [(0, 'none')]
-            # Then add all dictionary words starting from 1
-            data.extend([(i, word) for i, word in enumerate(words, start=1)])
-            
-            cursor.executemany(insert_query, data)
-            self.connection.commit()
-            
-            logger.info(f"Inserted {cursor.rowcount} words into word_mapping table (including 'none' at 0).")
+        
+        if count > 0:
+            logger.info(f"Word mapping table already contains {count} entries.")
+            return None
+        
+        # Get dictionary words
+        words = self.get_dictionary_words()
+        
+        # "none" takes number 0, then dictionary words from 1
+        data = [(0, 'none')]
+        data.extend((i, word) for i, word in enumerate(words, start=1))
+        
+        try:
+            stats = self.bulk_load_words(data, total=len(data))
         except Exception as e:
-            self.connection.rollback()
             logger.error(f"Error populating word mapping: {e}")
             raise
-        finally:
-            cursor.close()
+        
+        logger.info(f"Inserted {stats['inserted']} words into word_mapping table (including 'none' at 0).")
+        return stats
     
     def initialize(self):
         """Initialize the database and populate with data."""
@@ -310,27 +516,71 @@ class DatabaseManager:
     
     def get_word_by_number(self, number: int) -> Optional[str]:
         """Get word for a given number."""
-        self.connect()
-        cursor = self.connection.cursor()
-        
-        try:
+        with self.cursor() as cursor:
             cursor.execute("SELECT word FROM word_mapping WHERE number = %s", (number,))
             result = cursor.fetchone()
             return result[0] if result else None
-        finally:
-            cursor.close()
     
     def get_number_by_word(self, word: str) -> Optional[int]:
         """Get number for a given word."""
-        self.connect()
-        cursor = self.connection.cursor()
-        
-        try:
+        with self.cursor() as cursor:
             cursor.execute("SELECT number FROM word_mapping WHERE word = %s", (word.lower(),))
             result = cursor.fetchone()
             return result[0] if result else None
-        finally:
-            cursor.close()
+    
+    def get_words_by_numbers(self, numbers: List[int]) -> List[Optional[str]]:
+        """
+        Get words for many numbers in a single query.
+        
+        Args:
+            numbers: Numbers to look up
+            
+        Returns:
+            Words in the same order as `numbers`, with None for missing numbers
+        """
+        if not numbers:
+            return []
+        
+        with self.cursor() as cursor:
+            cursor.execute(
+                "SELECT number, word FROM word_mapping WHERE number = ANY(%s)",
+                (list(set(numbers)),)
+            )
+            found = dict(cursor.fetchall())
+        return [found.get(number) for number in numbers]
+    
+    def get_numbers_by_words(self, words: List[str]) -> List[Optional[int]]:
+        """
+        Get numbers for many words in a single query.
+        
+        Args:
+            words: Words to look up (case-insensitive)
+            
+        Returns:
+            Numbers in the same order as `words`, with None for missing words
+        """
+        if not words:
+            return []
+        
+        lowered = [word.lower() for word in words]
+        with self.cursor() as cursor:
+            cursor.execute(
+                "SELECT word, number FROM word_mapping WHERE word = ANY(%s)",
+                (list(set(lowered)),)
+            )
+            found = dict(cursor.fetchall())
+        return [found.get(word) for word in lowered]
+    
+    def get_all_words(self) -> List[Tuple[int, str]]:
+        """
+        Get every entry of the word mapping table.
+        
+        Returns:
+            List of (number, word) tuples ordered by number
+        """
+        with self.cursor() as cursor:
+            cursor.execute("SELECT number, word FROM word_mapping ORDER BY number")
+            return cursor.fetchall()
     
     def view_database_sample(self, limit: int = 20) -> List[Tuple[int, str]]:
         """
@@ -342,29 +592,19 @@ class DatabaseManager:
         Returns:
             List of (number, word) tuples
         """
-        self.connect()
-        cursor = self.connection.cursor()
-        
-        try:
+        with self.cursor() as cursor:
             cursor.execute(
                 "SELECT number, word FROM word_mapping ORDER BY number LIMIT %s",
                 (limit,)
             )
             results = cursor.fetchall()
             return results
-        finally:
-            cursor.close()
     
     def get_total_words(self) -> int:
         """Get total count of words in database."""
-        self.connect()
-        cursor = self.connection.cursor()
-        
-        try:
+        with self.cursor() as cursor:
             cursor.execute("SELECT COUNT(*) FROM word_mapping")
             return cursor.fetchone()[0]
-        finally:
-            cursor.close()
     
     def search_words(self, pattern: str) -> List[Tuple[int, str]]:
         """
@@ -376,17 +616,12 @@ class DatabaseManager:
         Returns:
             List of (number, word) tuples
         """
-        self.connect()
-        cursor = self.connection.cursor()
-        
-        try:
+        with self.cursor() as cursor:
             cursor.execute(
                 "SELECT number, word FROM word_mapping WHERE word LIKE %s ORDER BY word LIMIT 50",
                 (pattern,)
             )
             return cursor.fetchall()
-        finally:
-            cursor.close()
 
     def export_to_sql(self, output_file: str = "data/word_mapping.sql"):
         """
@@ -420,7 +655,8 @@ class DatabaseManager:
                 
                 for i, (number, word) in enumerate(rows):
                     comma = "," if i < len(rows) - 1 else ";"
-                    f.write(f"    ({number}, '{word}'){comma}\n")
+                    escaped = word.replace("'", "''")
+                    f.write(f"    ({number}, '{escaped}'){comma}\n")
                 
                 f.write("\n-- End of export\n")
             
@@ -429,13 +665,29 @@ class DatabaseManager:
         finally:
             cursor.close()
     
-    def import_from_sql(self, input_file: str = "data/word_mapping.sql"):
+    def import_from_sql(self, input_file: str = "data/word_mapping.sql") -> Optional[Dict[str, Any]]:
         """
         Import database from SQL file.
         
+        Files written by export_to_sql are loaded through bulk_load_words;
+        any other SQL file is executed as-is.
+        
         Args:
             input_file: Path to input SQL file
+        
+        Returns:
+            bulk_load_words statistics for export files, otherwise None
         """
+        with open(input_file, 'r') as f:
+            rows = parse_sql_export(f)
+        
+        if rows is not None:
+            self.create_word_mapping_table()
+            stats = self.bulk_load_words(rows, total=len(rows))
+            logger.info(f"Database imported from {input_file}")
+            print(f"✓ Imported {stats['inserted']} words from {input_file} in {stats['total_seconds']:.2f}s")
+            return stats
+        
         self.connect()
         cursor = self.connection.cursor()
         
@@ -454,6 +706,20 @@ class DatabaseManager:
             raise
         finally:
             cursor.close()
+        return None
+
+    def export_to_word_table(self, output_file: str = "data/word_mapping.bin"):
+        """
+        Export the word mapping to the binary word-table file that
+        AllergiesGetter memory-maps when PostgreSQL is unavailable.
+        
+        Args:
+            output_file: Path to output word-table file
+        """
+        count = write_word_table(output_file, self.get_all_words())
+        size_kb = os.path.getsize(output_file) / 1024
+        logger.info(f"Word table exported to {output_file} ({count} words, {size_kb:.0f} KB)")
+        print(f"Exported {count} words to {output_file} ({size_kb:.0f} KB)")
 
     def export_to_dump(self, output_file: str = "data/word_mapping.dump"):
         """
@@ -0,0 +1,207 @@
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+import logging
+import threading
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available before the checkout timeout."""
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of DB-API connections."""
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 5.0,
+        max_lifetime: Optional[float] = None,
+        broken_errors: Tuple[Type[BaseException], ...] = ()
+    ):
+        """
+        Initialize the pool and open `min_size` connections.
+
+        Args:
+            connect: Callable returning a new connection
+            min_size: Connections kept open even when idle
+            max_size: Upper bound on open connections
+            timeout: Seconds to wait for a free connection before giving up
+            max_lifetime: Recycle connections older than this many seconds (None = never)
+            broken_errors: Exception types that mean the connection is unusable
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool bounds: min_size={min_size}, max_size={max_size}")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.broken_errors = broken_errors
+
+        self._cond = threading.Condition()
+        self._idle: List[Any] = []
+        self._created_at: Dict[int, float] = {}
+        self._in_use = 0
+        self._closed = False
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "created": 0,
+            "recycled": 0,
+        }
+
+        for _ in range(min_size):
+            self._idle.append(self._open())
+
+    def _open(self) -> Any:
+        """
+        Open a new connection and remember when it was created.
+        Connecting happens outside the lock; only the bookkeeping takes it.
+        """
+        conn = self._connect()
+        with self._cond:
+            self._created_at[id(conn)] = time.monotonic()
+            self._stats["created"] += 1
+        return conn
+
+    def _discard(self, conn: Any):
+        """Close a connection and forget it."""
+        self._created_at.pop(id(conn), None)
+        self._stats["recycled"] += 1
+        try:
+            if not getattr(conn, "closed", False):
+                conn.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled connection: {e}")
+
+    def _is_usable(self, conn: Any) -> bool:
+        """Check an idle connection before handing it out."""
+        if getattr(conn, "closed", False):
+            return False
+        if self.max_lifetime is not None:
+            age = time.monotonic() - self._created_at.get(id(conn), 0.0)
+            if age > self.max_lifetime:
+                return False
+        return True
+
+    def getconn(self, timeout: Optional[float] = None) -> Any:
+        """
+        Check a connection out of the pool.
+
+        Args:
+            timeout: Override the pool's checkout timeout
+
+        Raises:
+            PoolTimeoutError: If no connection frees up in time
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            waited = False
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+
+                while self._idle:
+                    conn = self._idle.pop()
+                    if self._is_usable(conn):
+                        self._in_use += 1
+                        self._stats["checkouts"] += 1
+                        return conn
+                    self._discard(conn)
+
+                if self._in_use < self.max_size:
+                    # Reserve the slot before connecting so other threads see it
+                    self._in_use += 1
+                    break
+
+                if not waited:
+                    self._stats["waits"] += 1
+                    waited = True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available after {timeout:.1f}s "
+                        f"({self.max_size} in use)"
+                    )
+                self._cond.wait(remaining)
+
+        try:
+            conn = self._open()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._stats["checkouts"] += 1
+        return conn
+
+    def putconn(self, conn: Any, broken: bool = False):
+        """
+        Return a connection to the pool.
+
+        Args:
+            conn: Connection previously obtained from getconn()
+            broken: Discard the connection instead of reusing it
+        """
+        if not broken and not getattr(conn, "closed", False):
+            try:
+                # Never hand out a connection with an open transaction
+                conn.rollback()
+            except Exception:
+                broken = True
+
+        with self._cond:
+            self._in_use -= 1
+            if broken or self._closed or getattr(conn, "closed", False):
+                self._discard(conn)
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Context manager that checks a connection out and always returns it."""
+        conn = self.getconn(timeout)
+        broken = False
+        try:
+            yield conn
+        except self.broken_errors:
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, broken=broken)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool usage counters for monitoring."""
+        with self._cond:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "size": self._in_use + len(self._idle),
+                **self._stats,
+            }
+
+    def closeall(self):
+        """Close every idle connection; checked-out ones are closed on return."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            for conn in idle:
+                self._discard(conn)
+            self._cond.notify_all()
+        logger.info("Connection pool closed.")
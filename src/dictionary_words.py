@@ -0,0 +1,204 @@
+"""
+Precomputed, frequency-ranked dictionary word list.
+
+The word mapping table numbers dictionary words by how common they are in
+the NLTK Brown corpus. Counting the corpus takes seconds and may need a
+download, so the ranked list is built once into a small text artifact that
+database initialization reads instead.
+
+Layout:
+
+    # dictionary-words v1 source=brown min_length=3 max_length=7 words=N sha256=...
+    the
+    and
+    ...
+
+One word per line, most frequent first. The checksum covers every line
+after the header.
+
+Rebuild:
+    python src/dictionary_words.py                   # count the Brown corpus
+    python src/dictionary_words.py --from-word-table # reuse data/word_mapping.bin
+"""
+
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+import argparse
+import hashlib
+import os
+
+FORMAT_VERSION = 1
+DICTIONARY_WORDS_PATH = Path(__file__).parent.parent / "data" / "dictionary_words.txt"
+
+
+class DictionaryWordsError(Exception):
+    """Raised when a word-list file is missing, corrupt or was built with other settings."""
+
+
+def rank_words(tokens: Iterable[str], min_length: int, max_length: int) -> List[str]:
+    """
+    Rank corpus tokens by frequency.
+
+    Tokens are lowercased and kept if alphabetic and within the length bounds.
+    Ties keep first-occurrence order, so rebuilding from the same corpus
+    always gives the same numbering.
+
+    Args:
+        tokens: Corpus tokens
+        min_length: Shortest word kept
+        max_length: Longest word kept
+
+    Returns:
+        Words, most frequent first
+    """
+    counts = Counter(
+        token for token in map(str.lower, tokens)
+        if min_length <= len(token) <= max_length and token.isalpha()
+    )
+    return [word for word, _ in counts.most_common()]
+
+
+def _checksum(words: List[str]) -> str:
+    return hashlib.sha256("\n".join(words).encode("utf-8")).hexdigest()
+
+
+def write_word_list(
+    path: Union[str, Path],
+    words: List[str],
+    min_length: int,
+    max_length: int,
+    source: str = "brown"
+) -> int:
+    """
+    Write a ranked word list, replacing any existing file atomically.
+
+    Returns:
+        Number of words written
+    """
+    header = (
+        f"# dictionary-words v{FORMAT_VERSION} source={source} "
+        f"min_length={min_length} max_length={max_length} "
+        f"words={len(words)} sha256={_checksum(words)}\n"
+    )
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(header)
+        f.writelines(f"{word}\n" for word in words)
+    os.replace(tmp_path, path)
+    return len(words)
+
+
+def _parse_header(line: str) -> Dict[str, str]:
+    parts = line.split()
+    if len(parts) < 3 or parts[:2] != ["#", "dictionary-words"]:
+        raise DictionaryWordsError("Not a dictionary word-list file")
+    fields = {"version": parts[2]}
+    for part in parts[3:]:
+        key, _, value = part.partition("=")
+        fields[key] = value
+    return fields
+
+
+def load_word_list(
+    path: Union[str, Path] = DICTIONARY_WORDS_PATH,
+    min_length: Optional[int] = None,
+    max_length: Optional[int] = None
+) -> List[str]:
+    """
+    Read a ranked word list written by write_word_list.
+
+    Args:
+        path: Word-list file
+        min_length: If given, the length bound the list must have been built with
+        max_length: If given, the length bound the list must have been built with
+
+    Returns:
+        Words, most frequent first
+
+    Raises:
+        DictionaryWordsError: If the file is missing, corrupt, of another
+            version or built with different length bounds
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            fields = _parse_header(f.readline())
+            words = f.read().splitlines()
+    except OSError as e:
+        raise DictionaryWordsError(f"Cannot read word list {path}: {e}") from e
+
+    if fields["version"] != f"v{FORMAT_VERSION}":
+        raise DictionaryWordsError(f"Unsupported word-list version {fields['version']} in {path}")
+    for name, expected in (("min_length", min_length), ("max_length", max_length)):
+        if expected is not None and fields.get(name) != str(expected):
+            raise DictionaryWordsError(
+                f"Word list {path} was built with {name}={fields.get(name)}, expected {expected}"
+            )
+    if fields.get("words") != str(len(words)) or fields.get("sha256") != _checksum(words):
+        raise DictionaryWordsError(f"Word list {path} is corrupt (count or checksum mismatch)")
+    return words
+
+
+def build_from_brown(min_length: int, max_length: int) -> List[str]:
+    """Rank the words of the NLTK Brown corpus, downloading it if needed."""
+    import nltk
+    try:
+        from nltk.corpus import brown
+        brown.words()
+    except LookupError:
+        nltk.download("brown", quiet=True)
+        from nltk.corpus import brown
+    return rank_words(brown.words(), min_length, max_length)
+
+
+def build_from_word_table(path: Union[str, Path]) -> List[str]:
+    """
+    Recover the ranked list from a word-table file.
+
+    Number 0 is the reserved 'none' entry, and number n is the n-th ranked
+    word. The only word that can be missing is 'none' itself: it is ranked
+    too, but its row was skipped because 0 already holds it.
+    """
+    from word_table import MappedWordTable
+    table = MappedWordTable(path)
+    try:
+        words, missing = [], []
+        number = 1
+        while len(words) - len(missing) < len(table) - 1:
+            word = table.word_for(number)
+            if word is None:
+                missing.append(number)
+                word = "none"
+            words.append(word)
+            number += 1
+    finally:
+        table.close()
+    if len(missing) > 1:
+        raise DictionaryWordsError(f"Word table {path} has gaps in its numbering at {missing}")
+    return words
+
+
+def main():
+    from db_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Rebuild the precomputed dictionary word list.")
+    parser.add_argument("--output", default=str(DICTIONARY_WORDS_PATH), help="Word-list file to write")
+    parser.add_argument(
+        "--from-word-table", nargs="?", const=str(DICTIONARY_WORDS_PATH.with_name("word_mapping.bin")),
+        metavar="PATH", help="Recover the list from an existing word table instead of counting Brown"
+    )
+    args = parser.parse_args()
+
+    min_length, max_length = DatabaseManager.MIN_WORD_LENGTH, DatabaseManager.MAX_WORD_LENGTH
+    if args.from_word_table:
+        words, source = build_from_word_table(args.from_word_table), "word-table"
+    else:
+        words, source = build_from_brown(min_length, max_length), "brown"
+    count = write_word_list(args.output, words, min_length, max_length, source=source)
+    print(f"Wrote {count} words to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
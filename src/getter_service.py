@@ -0,0 +1,155 @@
+from typing import Any, Callable, Dict, Optional
+import logging
+import threading
+import time
+
+from allergies_getter import AllergiesGetter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class GetterService:
+    """Process-wide AllergiesGetter shared by all Flask worker threads."""
+
+    def __init__(
+        self,
+        factory: Callable[[], AllergiesGetter] = AllergiesGetter,
+        retry_interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the service without touching the database.
+
+        Args:
+            factory: Callable that builds the AllergiesGetter on first use
+            retry_interval: Seconds a failed build is reported without calling
+                the factory again
+            clock: Time source, replaceable in tests
+        """
+        self._factory = factory
+        self.retry_interval = retry_interval
+        self._clock = clock
+        self._getter: Optional[AllergiesGetter] = None
+        # _lock guards state and is only held briefly; _build_lock serializes
+        # the (possibly slow) factory call
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._failed_at: Optional[float] = None
+        self._closed = False
+        self._last_error: Optional[str] = None
+        self._warmup_seconds: Optional[float] = None
+        self._requests = 0
+
+    def get(self) -> AllergiesGetter:
+        """
+        Return the shared getter, building it on first use.
+
+        Raises:
+            RuntimeError: If the service has already been shut down
+        """
+        getter = self._getter
+        if getter is None:
+            getter = self._build()
+        with self._lock:
+            self._requests += 1
+        return getter
+
+    def _build(self) -> AllergiesGetter:
+        """
+        Build the getter exactly once, even with concurrent first requests.
+
+        A failure is remembered for retry_interval seconds, during which
+        callers get it straight away instead of each waiting on the factory.
+        """
+        with self._build_lock:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("Getter service has been shut down")
+                if self._getter is not None:
+                    return self._getter
+                if self._failed_at is not None:
+                    retry_in = self._failed_at + self.retry_interval - self._clock()
+                    if retry_in > 0:
+                        raise RuntimeError(
+                            f"AllergiesGetter unavailable (retrying in {retry_in:.1f}s): {self._last_error}"
+                        )
+
+            start = time.perf_counter()
+            try:
+                getter = self._factory()
+            except Exception as e:
+                with self._lock:
+                    self._last_error = str(e)
+                    self._failed_at = self._clock()
+                logger.error(f"Could not warm up AllergiesGetter: {e}")
+                raise
+
+            with self._lock:
+                if self._closed:
+                    getter.close()
+                    raise RuntimeError("Getter service has been shut down")
+                self._getter = getter
+                self._warmup_seconds = time.perf_counter() - start
+                self._last_error = None
+                self._failed_at = None
+            logger.info(f"AllergiesGetter warmed up in {self._warmup_seconds:.3f}s")
+            return getter
+
+    def warm_up(self) -> bool:
+        """
+        Build the getter ahead of the first request.
+
+        Returns:
+            True if the getter is ready, False if warm-up failed
+        """
+        try:
+            self._build()
+            return True
+        except Exception:
+            return False
+
+    def warm_up_in_background(self) -> threading.Thread:
+        """Start warm-up on a daemon thread so app start-up is not blocked."""
+        thread = threading.Thread(target=self.warm_up, name="getter-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def health(self) -> Dict[str, Any]:
+        """Report service state without triggering warm-up."""
+        getter = self._getter
+        if self._closed:
+            status = "closed"
+        elif getter is not None:
+            status = "ready"
+        elif self._last_error:
+            status = "error"
+        else:
+            status = "cold"
+
+        report: Dict[str, Any] = {
+            "status": status,
+            "requests": self._requests,
+            "warmup_seconds": self._warmup_seconds,
+            "last_error": self._last_error,
+        }
+        if getter is not None:
+            report["backend"] = "dump" if getter.use_dump else "postgres"
+            if getter.word_index is not None:
+                report["words"] = len(getter.word_index)
+            if getter.db is not None:
+                report["pool"] = getter.db.pool_stats()
+            report["cache"] = getter.cache_stats()
+        return report
+
+    def close(self):
+        """Release the shared getter; later calls to get() will fail."""
+        with self._lock:
+            self._closed = True
+            getter, self._getter = self._getter, None
+        if getter is not None:
+            try:
+                getter.close()
+            except Exception as e:
+                logger.warning(f"Error closing AllergiesGetter: {e}")
+            logger.info("AllergiesGetter service shut down.")
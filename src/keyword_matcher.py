@@ -0,0 +1,128 @@
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Tuple, Union
+
+
+class KeywordMatch(NamedTuple):
+    """One keyword hit in a text; `start`/`end` index the original text."""
+    key: str
+    term: str
+    start: int
+    end: int
+    text: str
+
+
+def _is_word_char(ch: str) -> bool:
+    # Same notion of a word character as the regex \b the matcher replaces
+    return ch.isalnum() or ch == '_'
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive multi-keyword matcher (Aho-Corasick automaton).
+
+    The automaton is built once per keyword set; each text is then scanned
+    in a single pass, however many keywords there are.
+    """
+
+    def __init__(self, keywords: Union[Mapping[str, Iterable[str]], Iterable[str]], whole_words: bool = True):
+        """
+        Build the automaton.
+
+        Args:
+            keywords: Either {key: [terms]} or a plain list of terms (each term is
+                then its own key). Terms are literal text, not regexes.
+            whole_words: Only report hits not surrounded by word characters,
+                like the regex \\bterm\\b; otherwise report substring hits too
+        """
+        if not isinstance(keywords, Mapping):
+            keywords = {term: [term] for term in keywords}
+
+        self.whole_words = whole_words
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, str]]] = [[]]
+        self._n_terms = 0
+
+        for key, terms in keywords.items():
+            for term in terms:
+                self._add(key, term)
+        self._link()
+
+    def _add(self, key: str, term: str):
+        if not term:
+            raise ValueError(f"Empty keyword for '{key}'")
+        state = 0
+        for ch in term.lower():
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((key, term.lower()))
+        self._n_terms += 1
+
+    def _link(self):
+        """Breadth-first pass setting failure links and merging their outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __len__(self) -> int:
+        return self._n_terms
+
+    def find_all(self, text: str) -> List[KeywordMatch]:
+        """
+        Find every keyword occurrence in a single pass over the text.
+
+        Returns:
+            Matches ordered by start position (overlapping hits included)
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        # Original index of every lowered character; lower() can expand one
+        # character into several, so spans cannot assume a 1:1 mapping
+        origin: List[int] = []
+        matches = []
+        state = 0
+        for i, ch in enumerate(text):
+            for lc in ch.lower():
+                origin.append(i)
+                while state and lc not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(lc, 0)
+                for key, term in out[state]:
+                    start = origin[len(origin) - len(term)]
+                    end = i + 1
+                    if self.whole_words and not self._at_boundaries(text, start, end):
+                        continue
+                    matches.append(KeywordMatch(key, term, start, end, text[start:end]))
+        matches.sort(key=lambda m: (m.start, m.end))
+        return matches
+
+    @staticmethod
+    def _at_boundaries(text: str, start: int, end: int) -> bool:
+        if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+            return False
+        if end < len(text) and _is_word_char(text[end]) and _is_word_char(text[end - 1]):
+            return False
+        return True
+
+    def first_matches(self, text: str) -> Dict[str, KeywordMatch]:
+        """Earliest match for each key that occurs in the text."""
+        first: Dict[str, KeywordMatch] = {}
+        for match in self.find_all(text):
+            first.setdefault(match.key, match)
+        return first
+
+    def matched_keys(self, text: str) -> set:
+        """Keys with at least one match in the text."""
+        return {match.key for match in self.find_all(text)}
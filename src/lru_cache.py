@@ -0,0 +1,83 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import threading
+import time
+
+
+class LRUCache:
+    """Thread-safe bounded LRU cache with optional time-to-live and hit/miss counters."""
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            maxsize: Maximum number of entries; least recently used entries are evicted
+            ttl: Seconds an entry stays valid (None = until evicted or cleared)
+            clock: Time source, replaceable in tests
+        """
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1, got {maxsize}")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value and mark it recently used, or `default` on a miss."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            stored_at, value = entry
+            if self.ttl is not None and self._clock() - stored_at > self.ttl:
+                del self._data[key]
+                self._expirations += 1
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = (self._clock(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        """Drop every entry; counters are kept."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of cache counters for monitoring."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,187 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+import logging
+import threading
+import time
+import uuid
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+@dataclass
+class Job:
+    """A unit of background work and its outcome."""
+    id: str
+    status: str = QUEUED
+    meta: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable view of the job."""
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            **self.meta,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.started_at is not None:
+            data["queued_seconds"] = self.started_at - self.created_at
+        if self.started_at is not None and self.finished_at is not None:
+            data["run_seconds"] = self.finished_at - self.started_at
+        if self.status == DONE:
+            data["result"] = self.result
+        if self.status == FAILED:
+            data["error"] = self.error
+        return data
+
+
+class JobQueue:
+    """
+    Background worker pool for slow request work (e.g. menu OCR).
+
+    Submitting returns immediately with a job whose status can be polled.
+    The number of queued-or-running jobs is capped so a burst of uploads
+    is rejected instead of piling up, and only the most recent finished
+    jobs are kept.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_pending: int = 100,
+        max_finished: int = 1000,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            workers: Worker threads running jobs
+            max_pending: Queued plus running jobs allowed before submit() refuses
+            max_finished: Finished jobs kept for status lookups
+            clock: Time source, replaceable in tests
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="menu-job")
+        self._jobs: Dict[str, Job] = {}
+        self._finished: list = []
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._completed = 0
+        self._failed = 0
+        self._closed = False
+
+    def submit(self, fn: Callable[..., Any], *args, meta: Optional[Dict[str, Any]] = None, **kwargs) -> Job:
+        """
+        Queue fn(*args, **kwargs) to run on a worker.
+
+        Raises:
+            QueueFullError: If max_pending jobs are already queued or running
+            RuntimeError: If the queue has been shut down
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Job queue has been shut down")
+            if self._pending >= self.max_pending:
+                raise QueueFullError(f"Job queue is full ({self._pending} jobs pending)")
+            job = Job(id=uuid.uuid4().hex, meta=dict(meta or {}), created_at=self._clock())
+            self._jobs[job.id] = job
+            self._pending += 1
+        try:
+            self._executor.submit(self._run, job, fn, args, kwargs)
+        except RuntimeError:
+            # Shut down between the check above and handing the job over
+            with self._lock:
+                self._jobs.pop(job.id, None)
+                self._pending -= 1
+            raise
+        return job
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: dict):
+        with self._lock:
+            if job.status != QUEUED:
+                # Cancelled by shutdown() before a worker picked it up
+                return
+            job.status = RUNNING
+            job.started_at = self._clock()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            logger.exception(f"Job {job.id} failed")
+            with self._lock:
+                job.error = str(e)
+                job.status = FAILED
+                self._failed += 1
+        else:
+            with self._lock:
+                job.result = result
+                job.status = DONE
+                self._completed += 1
+        with self._lock:
+            self._finish(job)
+
+    def _finish(self, job: Job):
+        """Record a job as finished; the caller holds the lock."""
+        job.finished_at = self._clock()
+        self._pending -= 1
+        self._finished.append(job.id)
+        while len(self._finished) > self.max_finished:
+            self._jobs.pop(self._finished.pop(0), None)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id, or None if unknown or already forgotten."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue counters for monitoring."""
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job.status == RUNNING)
+            return {
+                "workers": self.workers,
+                "queued": self._pending - running,
+                "running": running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "max_pending": self.max_pending,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop accepting work and, optionally, wait for running jobs.
+
+        Without wait, jobs that have not started are cancelled and marked
+        FAILED so pollers see a final status.
+        """
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+        with self._lock:
+            cancelled = [job for job in self._jobs.values() if job.status == QUEUED]
+            for job in cancelled:
+                job.status = FAILED
+                job.error = "Cancelled at shutdown"
+                self._failed += 1
+                self._finish(job)
+        if cancelled:
+            logger.info(f"Cancelled {len(cancelled)} queued jobs at shutdown.")
@@ -0,0 +1,202 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import logging
+
+import numpy
+
+from allergies_encoder import AllergiesEncoder
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+Encodings = Union[numpy.ndarray, Sequence[Sequence[int]]]
+
+
+class MenuSafetyEngine:
+    """
+    Vectorized dish x user allergen checks.
+    Dishes and users are both given as encode_all-style integer lists (or the
+    fixed-width array from AllergiesEncoder.encode_many), and a dish is unsafe
+    for a user when `dish & user` shares any allergen bit.
+    """
+
+    def __init__(self, encoder: AllergiesEncoder, chunk_size: int = 1024):
+        """
+        Args:
+            encoder: Encoder defining the bit layout
+            chunk_size: Users evaluated per block, bounding the temporary
+                users x dishes x columns array
+        """
+        self.encoder = encoder
+        self.chunk_size = chunk_size
+
+    def to_array(self, encodings: Encodings) -> numpy.ndarray:
+        """Accept fixed-width arrays as-is and pack encode_all lists."""
+        if isinstance(encodings, numpy.ndarray):
+            return encodings.astype(numpy.int64, copy=False)
+        return self.encoder.encodings_to_array(list(encodings))
+
+    def conflict_matrix(self, dishes: Encodings, users: Encodings) -> numpy.ndarray:
+        """
+        Returns:
+            Boolean array of shape (n_users, n_dishes), True where the dish
+            contains at least one of the user's allergens
+        """
+        dishes = self.to_array(dishes) & self.encoder.array_allergen_mask
+        users = self.to_array(users)
+        conflicts = numpy.zeros((len(users), len(dishes)), dtype=bool)
+        for start in range(0, len(users), self.chunk_size):
+            block = users[start:start + self.chunk_size]
+            conflicts[start:start + len(block)] = (block[:, None, :] & dishes[None, :, :]).any(axis=2)
+        return conflicts
+
+    def matched_allergens(
+        self,
+        dishes: Encodings,
+        users: Encodings,
+        conflicts: numpy.ndarray
+    ) -> Dict[Tuple[int, int], List[str]]:
+        """
+        Decode the shared allergens, only for conflicting (user, dish) pairs.
+
+        Returns:
+            {(user index, dish index): allergen names in allergen_columns order}
+        """
+        dishes = self.to_array(dishes)
+        users = self.to_array(users)
+        user_idx, dish_idx = numpy.nonzero(conflicts)
+        overlap = users[user_idx] & dishes[dish_idx] & self.encoder.array_allergen_mask
+        names = self.encoder.matrix_to_profiles(self.encoder.decode_many(overlap))
+        return dict(zip(zip(user_idx.tolist(), dish_idx.tolist()), names))
+
+    def evaluate(self, dishes: Encodings, users: Encodings) -> List[List[Dict[str, Any]]]:
+        """
+        Check every dish for every user.
+
+        Returns:
+            For each user, one dict per dish with "allowed", "status"
+            ("SAFE" or "AVOID") and "matched_allergens"
+        """
+        dishes = self.to_array(dishes)
+        users = self.to_array(users)
+        conflicts = self.conflict_matrix(dishes, users)
+        matched = self.matched_allergens(dishes, users, conflicts)
+
+        results = []
+        for u, row in enumerate(conflicts.tolist()):
+            results.append([
+                {
+                    "allowed": not conflict,
+                    "status": "AVOID" if conflict else "SAFE",
+                    "matched_allergens": matched.get((u, d), [])
+                }
+                for d, conflict in enumerate(row)
+            ])
+        return results
+
+
+class CompiledMenu:
+    """
+    A menu whose items have been resolved to allergen bitmasks once, so
+    checking a user against it needs no database or getter work.
+    """
+
+    def __init__(
+        self,
+        meals: List[str],
+        item_allergens: List[List[str]],
+        encoder: AllergiesEncoder,
+        masks: Optional[numpy.ndarray] = None,
+        unknown: Optional[List[bool]] = None
+    ):
+        """
+        Compile a menu from already-decoded item allergens.
+
+        Args:
+            meals: Menu item names
+            item_allergens: Allergen names for each item, in display order
+            encoder: Encoder defining the bit layout
+            masks: Precomputed encodings of item_allergens (e.g. from a menu
+                store), one encode_many row per item; computed if None
+            unknown: Per item, True if its allergens could not be determined;
+                such items are never reported as safe
+        """
+        if len(meals) != len(item_allergens):
+            raise ValueError("Each meal needs exactly one allergen list")
+        self.unknown = list(unknown) if unknown is not None else [False] * len(meals)
+        if len(self.unknown) != len(meals):
+            raise ValueError("Each meal needs exactly one unknown flag")
+        self.encoder = encoder
+        self.meals = list(meals)
+        self.item_allergens = [encoder.lowercase_list(allergens) for allergens in item_allergens]
+        # One fixed-width encoding row per item (see AllergiesEncoder.encode_many)
+        if masks is None:
+            masks = encoder.encode_many(encoder.profiles_to_matrix(self.item_allergens))
+        elif masks.shape != (len(self.meals), len(encoder.array_columns)):
+            raise ValueError(f"Expected masks of shape {(len(self.meals), len(encoder.array_columns))}, got {masks.shape}")
+        self.masks = masks
+        self.engine = MenuSafetyEngine(encoder)
+
+    @classmethod
+    def from_phrases(cls, items: List[Dict[str, Any]], getter) -> "CompiledMenu":
+        """
+        Compile a menu whose items carry encoded allergen phrases, as in HARDCODED_MENU.
+
+        Args:
+            items: Dicts with "meal" and "allergen_phrases" keys
+            getter: AllergiesGetter used to decode each item's phrases once
+
+        Items whose phrases cannot be decoded are compiled with no known
+        allergens and flagged unknown, so they are reported as unsafe rather
+        than allergen-free, without failing the rest of the menu.
+        """
+        item_allergens = []
+        unknown = []
+        for item in items:
+            phrases = item['allergen_phrases']
+            try:
+                # IndexError/ValueError: words that decode to an inconsistent group layout
+                allergens = getter.words_to_allergies(phrases) if phrases else []
+            except (IndexError, ValueError) as e:
+                logger.warning(f"Could not decode phrases {phrases} for '{item['meal']}': {e}")
+                allergens = None
+            else:
+                if allergens is None:
+                    logger.warning(f"Could not decode phrases {phrases} for '{item['meal']}'")
+            unknown.append(allergens is None)
+            item_allergens.append(allergens or [])
+        return cls([item['meal'] for item in items], item_allergens, getter.encoder, unknown=unknown)
+
+    def user_mask(self, user_allergens: List[str]) -> numpy.ndarray:
+        """Encode a user's allergens into the same fixed-width layout as the menu."""
+        return self.encoder.encode_many(self.encoder.profiles_to_matrix([user_allergens]))[0]
+
+    def conflicts(self, user_allergens: List[str]) -> numpy.ndarray:
+        """Boolean array: True where an item shares at least one allergen with the user."""
+        return self.engine.conflict_matrix(self.masks, self.user_mask(user_allergens)[None, :])[0]
+
+    def check(self, user_allergens: List[str]) -> List[Dict[str, Any]]:
+        """
+        Check every item against a user's allergens with one bitwise AND per item.
+
+        Returns:
+            One dict per item with "meal", "has_match", "matched_allergens",
+            "item_allergens" and "unknown" keys
+        """
+        users = self.user_mask(user_allergens)[None, :]
+        conflicts = self.engine.conflict_matrix(self.masks, users)
+        # Decoded only for the overlapping bits of conflicting items
+        shared = self.engine.matched_allergens(self.masks, users, conflicts)
+
+        results = []
+        for i, meal in enumerate(self.meals):
+            shared_set = set(shared.get((0, i), ()))
+            matched = [a for a in self.item_allergens[i] if a in shared_set]
+            results.append({
+                "meal": meal,
+                "has_match": bool(matched),
+                "matched_allergens": matched,
+                "item_allergens": self.item_allergens[i],
+                "unknown": self.unknown[i]
+            })
+        return results
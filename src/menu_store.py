@@ -0,0 +1,455 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, ContextManager, Dict, List, Optional
+import json
+import logging
+import sqlite3
+import threading
+
+import numpy
+
+from allergies_encoder import AllergiesEncoder
+from lru_cache import LRUCache
+from menu_safety import CompiledMenu
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class MenuStore(ABC):
+    """
+    Repository of restaurants, menus and dishes.
+
+    Each dish is stored with its allergen names (display order) and its
+    allergen encoding, one BIGINT column per AllergiesEncoder.array_columns
+    entry, computed once when the menu is saved. Checking a user against a
+    stored menu then needs no text parsing or phrase decoding.
+
+    Subclasses provide the connection handling and DDL for one database.
+    """
+
+    # DB-API parameter placeholder
+    PARAM = "%s"
+    # DDL for the tables, in creation order
+    SCHEMA: List[str] = []
+
+    def __init__(self, encoder: Optional[AllergiesEncoder] = None, cache_size: int = 128):
+        """
+        Args:
+            encoder: Encoder defining the bit layout (a new one if None)
+            cache_size: Compiled menus kept in memory
+        """
+        self.encoder = encoder or AllergiesEncoder()
+        self.encoding_columns = [f"enc_{column}" for column in self.encoder.array_columns]
+        # Stored menus never change, so compiled copies stay valid until deleted
+        self._compiled = LRUCache(maxsize=cache_size)
+
+    @abstractmethod
+    def _cursor(self) -> ContextManager[Any]:
+        """Context manager yielding a cursor for a read query."""
+
+    @abstractmethod
+    def _transaction(self) -> ContextManager[Any]:
+        """Context manager yielding a cursor whose work is committed together."""
+
+    def _sql(self, query: str) -> str:
+        return query.replace("%s", self.PARAM)
+
+    def _encoding_ddl(self) -> str:
+        return ",\n".join(f"{column} BIGINT NOT NULL DEFAULT 0" for column in self.encoding_columns)
+
+    def create_tables(self):
+        """Create the menu tables and indexes if they don't exist."""
+        with self._transaction() as cursor:
+            for statement in self.SCHEMA:
+                cursor.execute(statement.format(
+                    encoding_columns=self._encoding_ddl(),
+                    encoding_column_names=", ".join(self.encoding_columns)
+                ))
+        logger.info("Menu tables created/verified.")
+
+    def add_restaurant(self, name: str) -> int:
+        """Get the id of a restaurant, creating it if needed."""
+        with self._transaction() as cursor:
+            return self._restaurant_id(cursor, name)
+
+    def _restaurant_id(self, cursor, name: str) -> int:
+        cursor.execute(self._sql("SELECT id FROM restaurants WHERE name = %s"), (name,))
+        row = cursor.fetchone()
+        if row:
+            return row[0]
+        cursor.execute(self._sql("INSERT INTO restaurants (name) VALUES (%s) RETURNING id"), (name,))
+        return cursor.fetchone()[0]
+
+    def add_menu(
+        self,
+        restaurant: str,
+        items: List[Dict[str, Any]],
+        name: Optional[str] = None,
+        source: Optional[str] = None
+    ) -> int:
+        """
+        Store a menu, encoding every dish's allergens once.
+
+        Args:
+            restaurant: Restaurant name (created if new)
+            items: Dicts with "meal" and "allergens" (allergen names) keys
+            name: Menu name, e.g. "Dinner"
+            source: Where the menu came from, e.g. an image file name
+
+        Returns:
+            The new menu's id
+
+        Raises:
+            ValueError: If an allergen name is not recognised
+        """
+        meals = [item["meal"] for item in items]
+        item_allergens = [self.encoder.lowercase_list(item.get("allergens") or []) for item in items]
+        masks = self.encoder.encode_many(self.encoder.profiles_to_matrix(item_allergens))
+
+        columns = ", ".join(["menu_id", "position", "name", "allergens", *self.encoding_columns])
+        placeholders = ", ".join(["%s"] * (4 + len(self.encoding_columns)))
+        insert_dish = self._sql(f"INSERT INTO dishes ({columns}) VALUES ({placeholders})")
+
+        with self._transaction() as cursor:
+            restaurant_id = self._restaurant_id(cursor, restaurant)
+            cursor.execute(
+                self._sql("INSERT INTO menus (restaurant_id, name, source) VALUES (%s, %s, %s) RETURNING id"),
+                (restaurant_id, name, source)
+            )
+            menu_id = cursor.fetchone()[0]
+            cursor.executemany(insert_dish, [
+                (menu_id, position, meal, json.dumps(allergens), *map(int, mask))
+                for position, (meal, allergens, mask) in enumerate(zip(meals, item_allergens, masks))
+            ])
+        logger.info(f"Stored menu {menu_id} for '{restaurant}' with {len(items)} dishes.")
+        return menu_id
+
+    def add_menu_from_phrases(
+        self,
+        restaurant: str,
+        items: List[Dict[str, Any]],
+        getter,
+        name: Optional[str] = None,
+        source: Optional[str] = None
+    ) -> int:
+        """
+        Store a menu whose items carry encoded allergen phrases, as in HARDCODED_MENU.
+
+        The phrases are decoded once, here; see CompiledMenu.from_phrases.
+
+        Raises:
+            ValueError: If any item's phrases cannot be decoded; nothing is stored
+        """
+        compiled = CompiledMenu.from_phrases(items, getter)
+        # Stored dishes have no unknown state, so an undecodable item must not be saved as allergen-free
+        undecodable = [meal for meal, unknown in zip(compiled.meals, compiled.unknown) if unknown]
+        if undecodable:
+            raise ValueError(f"Could not decode allergen phrases for {', '.join(repr(m) for m in undecodable)}")
+        return self.add_menu(
+            restaurant,
+            [{"meal": meal, "allergens": allergens} for meal, allergens in zip(compiled.meals, compiled.item_allergens)],
+            name=name,
+            source=source
+        )
+
+    def list_menus(self) -> List[Dict[str, Any]]:
+        """All stored menus with their restaurant and dish count."""
+        with self._cursor() as cursor:
+            cursor.execute("""
+                SELECT m.id, r.name, m.name, m.source, COUNT(d.id)
+                FROM menus m
+                JOIN restaurants r ON r.id = m.restaurant_id
+                LEFT JOIN dishes d ON d.menu_id = m.id
+                GROUP BY m.id, r.name, m.name, m.source
+                ORDER BY m.id
+            """)
+            return [
+                {"id": row[0], "restaurant": row[1], "name": row[2], "source": row[3], "dishes": row[4]}
+                for row in cursor.fetchall()
+            ]
+
+    def get_menu(self, menu_id: int) -> Optional[Dict[str, Any]]:
+        """A stored menu with its dishes in menu order, or None if unknown."""
+        with self._cursor() as cursor:
+            cursor.execute(self._sql("""
+                SELECT m.id, r.name, m.name, m.source
+                FROM menus m JOIN restaurants r ON r.id = m.restaurant_id
+                WHERE m.id = %s
+            """), (menu_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            cursor.execute(
+                self._sql("SELECT id, name, allergens FROM dishes WHERE menu_id = %s ORDER BY position"),
+                (menu_id,)
+            )
+            dishes = [
+                {"id": dish_id, "meal": meal, "allergens": json.loads(allergens)}
+                for dish_id, meal, allergens in cursor.fetchall()
+            ]
+        return {"id": row[0], "restaurant": row[1], "name": row[2], "source": row[3], "dishes": dishes}
+
+    def load_compiled_menu(self, menu_id: int) -> Optional[CompiledMenu]:
+        """
+        Load a menu as a CompiledMenu straight from its stored encodings.
+
+        Returns:
+            The compiled menu, or None if the menu id is unknown
+        """
+        compiled = self._compiled.get(menu_id)
+        if compiled is not None:
+            return compiled
+
+        columns = ", ".join(["name", "allergens", *self.encoding_columns])
+        with self._cursor() as cursor:
+            cursor.execute(self._sql("SELECT 1 FROM menus WHERE id = %s"), (menu_id,))
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute(
+                self._sql(f"SELECT {columns} FROM dishes WHERE menu_id = %s ORDER BY position"),
+                (menu_id,)
+            )
+            rows = cursor.fetchall()
+
+        masks = numpy.array([row[2:] for row in rows], dtype=numpy.int64).reshape(len(rows), len(self.encoding_columns))
+        compiled = CompiledMenu(
+            [row[0] for row in rows],
+            [json.loads(row[1]) for row in rows],
+            self.encoder,
+            masks=masks
+        )
+        self._compiled.put(menu_id, compiled)
+        return compiled
+
+    def find_dishes(
+        self,
+        encoding: List[int],
+        safe: bool = True,
+        restaurant: Optional[str] = None,
+        menu_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Filter dishes against a user's allergen encoding inside the database.
+
+        The user's encoding is laid out like the dish columns and each non-zero
+        column becomes a `(enc_column & mask) = 0` test, so only matching rows
+        leave the database.
+
+        Args:
+            encoding: encode_all-style integers, e.g. the numbers behind a user's code
+            safe: Return dishes sharing no allergen with the user (False: dishes to avoid)
+            restaurant: Only dishes from this restaurant's menus
+            menu_id: Only dishes from this menu
+
+        Returns:
+            Dishes with "id", "menu_id", "restaurant", "meal" and "allergens", in menu order
+        """
+        user = self.encoder.encodings_to_array([encoding])[0] & self.encoder.array_allergen_mask
+        tests = [(column, int(mask)) for column, mask in zip(self.encoding_columns, user) if mask]
+
+        where, params = [], []
+        if tests:
+            joiner, comparison = (" AND ", "= 0") if safe else (" OR ", "<> 0")
+            where.append("(" + joiner.join(f"(d.{column} & %s) {comparison}" for column, _ in tests) + ")")
+            params.extend(mask for _, mask in tests)
+        elif not safe:
+            # Nothing to avoid
+            return []
+        if restaurant is not None:
+            where.append("r.name = %s")
+            params.append(restaurant)
+        if menu_id is not None:
+            where.append("d.menu_id = %s")
+            params.append(menu_id)
+
+        query = f"""
+            SELECT d.id, d.menu_id, r.name, d.name, d.allergens
+            FROM dishes d
+            JOIN menus m ON m.id = d.menu_id
+            JOIN restaurants r ON r.id = m.restaurant_id
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY d.menu_id, d.position
+        """
+        with self._cursor() as cursor:
+            cursor.execute(self._sql(query), params)
+            return [
+                {"id": row[0], "menu_id": row[1], "restaurant": row[2], "meal": row[3], "allergens": json.loads(row[4])}
+                for row in cursor.fetchall()
+            ]
+
+    def find_dishes_for_allergens(self, allergens: List[str], safe: bool = True, **scope) -> List[Dict[str, Any]]:
+        """find_dishes for allergen names rather than an encoding."""
+        return self.find_dishes(self.encoder.encode_all(allergens), safe, **scope)
+
+    def delete_menu(self, menu_id: int) -> bool:
+        """Delete a menu and its dishes; returns whether it existed."""
+        with self._transaction() as cursor:
+            cursor.execute(self._sql("DELETE FROM dishes WHERE menu_id = %s"), (menu_id,))
+            cursor.execute(self._sql("DELETE FROM menus WHERE id = %s"), (menu_id,))
+            deleted = cursor.rowcount > 0
+        self._compiled.clear()
+        return deleted
+
+    def close(self):
+        """Release database resources."""
+
+
+class PostgresMenuStore(MenuStore):
+    """Menu tables in the PostgreSQL database managed by DatabaseManager."""
+
+    PARAM = "%s"
+    SCHEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS restaurants (
+            id SERIAL PRIMARY KEY,
+            name TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS menus (
+            id SERIAL PRIMARY KEY,
+            restaurant_id INTEGER NOT NULL REFERENCES restaurants(id),
+            name TEXT,
+            source TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS dishes (
+            id SERIAL PRIMARY KEY,
+            menu_id INTEGER NOT NULL REFERENCES menus(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            allergens TEXT NOT NULL DEFAULT '[]',
+            {encoding_columns},
+            UNIQUE (menu_id, position)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS menus_restaurant_idx ON menus (restaurant_id)",
+        # Bitwise tests cannot use a B-tree, so narrow by menu and carry the
+        # encodings in the index: the mask filter then runs as an index-only scan
+        "CREATE INDEX IF NOT EXISTS dishes_menu_encoding_idx ON dishes (menu_id) INCLUDE ({encoding_column_names})",
+    ]
+
+    def __init__(self, db, encoder: Optional[AllergiesEncoder] = None, cache_size: int = 128):
+        """
+        Args:
+            db: DatabaseManager for the allergen database
+            encoder: Encoder defining the bit layout
+            cache_size: Compiled menus kept in memory
+        """
+        super().__init__(encoder, cache_size)
+        self.db = db
+        self.create_tables()
+
+    @contextmanager
+    def _cursor(self):
+        with self.db.cursor() as cursor:
+            yield cursor
+
+    @contextmanager
+    def _transaction(self):
+        with self.db.transaction() as cursor:
+            yield cursor
+
+    def close(self):
+        self.db.close()
+
+
+class SQLiteMenuStore(MenuStore):
+    """SQLite stand-in for development and tests (":memory:" for a throwaway store)."""
+
+    PARAM = "?"
+    SCHEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS restaurants (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS menus (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            restaurant_id INTEGER NOT NULL REFERENCES restaurants(id),
+            name TEXT,
+            source TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS dishes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            menu_id INTEGER NOT NULL REFERENCES menus(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            allergens TEXT NOT NULL DEFAULT '[]',
+            {encoding_columns},
+            UNIQUE (menu_id, position)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS menus_restaurant_idx ON menus (restaurant_id)",
+        # No INCLUDE in SQLite; a composite index covers the mask filter instead
+        "CREATE INDEX IF NOT EXISTS dishes_menu_encoding_idx ON dishes (menu_id, {encoding_column_names})",
+    ]
+
+    def __init__(self, path: str = ":memory:", encoder: Optional[AllergiesEncoder] = None, cache_size: int = 128):
+        """
+        Args:
+            path: SQLite database file, or ":memory:"
+            encoder: Encoder defining the bit layout
+            cache_size: Compiled menus kept in memory
+        """
+        super().__init__(encoder, cache_size)
+        self.path = path
+        # One connection shared across threads, serialised by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._lock = threading.RLock()
+        self.create_tables()
+
+    @contextmanager
+    def _cursor(self):
+        with self._lock:
+            cursor = self._conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            cursor = self._conn.cursor()
+            try:
+                yield cursor
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_menu_store(backend: str = "sqlite", path: str = ":memory:", encoder: Optional[AllergiesEncoder] = None) -> MenuStore:
+    """
+    Open the configured menu store.
+
+    Args:
+        backend: "postgres" for the allergen database (see DatabaseManager),
+            or "sqlite" for a local file / in-memory stand-in
+        path: SQLite database file (ignored for postgres)
+        encoder: Encoder defining the bit layout
+    """
+    if backend == "postgres":
+        from db_manager import DatabaseManager
+        return PostgresMenuStore(DatabaseManager(use_pool=True), encoder)
+    if backend == "sqlite":
+        return SQLiteMenuStore(path, encoder)
+    raise ValueError(f"Unknown menu store backend '{backend}'. Choose 'postgres' or 'sqlite'.")
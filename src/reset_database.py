@@ -15,5 +15,6 @@ if __name__ == "__main__":
     print("\nExporting database...")
     # db.export_to_sql()      # SQL format (human-readable, for git)
     db.export_to_dump()     # Binary format (efficient, industry standard)
+    db.export_to_word_table()  # Memory-mapped fallback used without PostgreSQL
     
     print(f"\nTotal words: {db.get_total_words()}")
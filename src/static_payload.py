@@ -0,0 +1,85 @@
+"""
+Pre-encoded HTTP payloads for responses that only change on deploy.
+
+The body is serialized and compressed once; each variant (identity, gzip,
+and brotli when the optional `brotli` package is installed) gets its own
+strong ETag derived from the content version, so conditional requests can
+be answered without touching the body.
+"""
+
+from typing import Callable, Dict, Iterable, Optional, Tuple
+import gzip
+import hashlib
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 256
+
+
+def _compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    compressors = {"gzip": lambda body: gzip.compress(body, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        pass
+    else:
+        compressors["br"] = lambda body: brotli.compress(body, quality=11)
+    return compressors
+
+
+class StaticPayload:
+    """One response body, pre-encoded, with validators and cache headers."""
+
+    # Preferred order when the client accepts several encodings equally
+    ENCODING_PREFERENCE = ("br", "gzip")
+
+    def __init__(
+        self,
+        body: bytes,
+        version: Optional[str] = None,
+        mimetype: str = "application/json",
+        max_age: int = 300,
+        compress: bool = True
+    ):
+        """
+        Args:
+            body: Serialized response body
+            version: Content version (e.g. a catalog digest); defaults to a hash of body
+            mimetype: Response content type
+            max_age: Seconds clients and proxies may reuse the response without revalidating
+            compress: Also keep compressed variants of bodies above MIN_COMPRESS_BYTES
+        """
+        self.mimetype = mimetype
+        self.version = version or hashlib.sha256(body).hexdigest()
+        tag = hashlib.sha256(self.version.encode("utf-8")).hexdigest()[:32]
+        self.cache_control = f"public, max-age={max_age}"
+
+        # encoding (None = identity) -> (etag, body)
+        self.variants: Dict[Optional[str], Tuple[str, bytes]] = {None: (tag, body)}
+        if compress and len(body) >= MIN_COMPRESS_BYTES:
+            for encoding, compress_fn in _compressors().items():
+                compressed = compress_fn(body)
+                if len(compressed) < len(body):
+                    self.variants[encoding] = (f"{tag}-{encoding}", compressed)
+
+    @property
+    def etags(self) -> Iterable[str]:
+        """Every variant's ETag (unquoted)."""
+        return (etag for etag, _ in self.variants.values())
+
+    def select(self, accepted: Dict[str, float]) -> Tuple[Optional[str], str, bytes]:
+        """
+        Pick the variant to send.
+
+        Args:
+            accepted: Content-coding -> quality from the request's Accept-Encoding
+
+        Returns:
+            (content encoding or None for identity, ETag, body)
+        """
+        best, best_quality = None, 0.0
+        for encoding in self.ENCODING_PREFERENCE:
+            quality = accepted.get(encoding, 0.0)
+            if encoding in self.variants and quality > best_quality:
+                best, best_quality = encoding, quality
+        etag, body = self.variants[best]
+        return best, etag, body
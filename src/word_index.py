@@ -0,0 +1,54 @@
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+class WordIndex:
+    """In-memory bidirectional mapping between encoded numbers and words."""
+
+    def __init__(self, pairs: Iterable[Tuple[int, str]]):
+        """
+        Build the index from (number, word) pairs.
+
+        Args:
+            pairs: Rows of the word mapping table, in any order
+        """
+        self._numbers: Dict[str, int] = {}
+        self._words: List[Optional[str]] = []
+
+        for number, word in pairs:
+            if number < 0:
+                raise ValueError(f"Word number must be non-negative, got {number}")
+            if number >= len(self._words):
+                self._words.extend([None] * (number + 1 - len(self._words)))
+            word = word.lower()
+            self._words[number] = word
+            self._numbers[word] = number
+
+    @classmethod
+    def from_mapping(cls, mapping: Mapping[int, str]) -> "WordIndex":
+        """Build the index from a {number: word} dictionary."""
+        return cls(mapping.items())
+
+    def word_for(self, number: int) -> Optional[str]:
+        """Get word by its number, or None if the number is unused."""
+        if 0 <= number < len(self._words):
+            return self._words[number]
+        return None
+
+    def number_for(self, word: str) -> Optional[int]:
+        """Get number by word (case-insensitive), or None if unknown."""
+        return self._numbers.get(word.lower())
+
+    def words_for(self, numbers: Iterable[int]) -> List[Optional[str]]:
+        """Get words for many numbers, None where a number is unused."""
+        return [self.word_for(number) for number in numbers]
+
+    def numbers_for(self, words: Iterable[str]) -> List[Optional[int]]:
+        """Get numbers for many words, None where a word is unknown."""
+        get = self._numbers.get
+        return [get(word.lower()) for word in words]
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def __contains__(self, word: str) -> bool:
+        return word.lower() in self._numbers
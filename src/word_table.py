@@ -0,0 +1,191 @@
+"""
+Compact binary word-table file shared between processes via mmap.
+
+Layout (all integers little-endian):
+
+    header   magic b'AWTB', version u16, reserved u16, slots u32,
+             words u32, blob size u32, crc32 u32 of everything after the header
+    offsets  u32 * (slots + 1); number n maps to blob[offsets[n]:offsets[n + 1]],
+             an empty slice means the number is unused
+    index    u32 * words; numbers sorted by their UTF-8 word bytes, for
+             binary-search reverse lookups
+    blob     packed UTF-8 words
+"""
+
+from array import array
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+MAGIC = b"AWTB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIII")
+
+
+class WordTableError(Exception):
+    """Raised when a word-table file is missing, corrupt or of an unknown version."""
+
+
+def write_word_table(path: Union[str, Path], pairs: Iterable[Tuple[int, str]]) -> int:
+    """
+    Write (number, word) pairs to a binary word-table file.
+
+    The file is written to a temporary name and renamed into place so readers
+    never see a partial table.
+
+    Args:
+        path: Output file path
+        pairs: Rows of the word mapping table, in any order
+
+    Returns:
+        Number of words written
+    """
+    words = {}
+    for number, word in pairs:
+        if number < 0:
+            raise ValueError(f"Word number must be non-negative, got {number}")
+        words[number] = word.lower().encode("utf-8")
+
+    slots = max(words) + 1 if words else 0
+    offsets = array("I", [0] * (slots + 1))
+    blob = bytearray()
+    for number in range(slots):
+        blob += words.get(number, b"")
+        offsets[number + 1] = len(blob)
+
+    index = array("I", sorted(words, key=words.__getitem__))
+
+    if sys.byteorder != "little":
+        offsets.byteswap()
+        index.byteswap()
+    body = offsets.tobytes() + index.tobytes() + bytes(blob)
+    header = HEADER.pack(MAGIC, VERSION, 0, slots, len(words), len(blob), zlib.crc32(body))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(body)
+    os.replace(tmp_path, path)
+    return len(words)
+
+
+class MappedWordTable:
+    """Read-only, memory-mapped word table; pages are shared between processes."""
+
+    def __init__(self, path: Union[str, Path], verify: bool = True):
+        """
+        Open and validate a word-table file.
+
+        Args:
+            path: Path to a file written by write_word_table
+            verify: Check the CRC32 of the file body
+
+        Raises:
+            WordTableError: If the file is missing, corrupt or of another version
+        """
+        self.path = Path(path)
+        try:
+            with open(self.path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise WordTableError(f"Cannot map word table {self.path}: {e}") from e
+
+        try:
+            self._parse(verify)
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _parse(self, verify: bool):
+        if len(self._mmap) < HEADER.size:
+            raise WordTableError(f"{self.path} is too small to be a word table")
+        magic, version, _, slots, n_words, blob_size, checksum = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise WordTableError(f"{self.path} is not a word table (bad magic {magic!r})")
+        if version != VERSION:
+            raise WordTableError(f"{self.path} has unsupported version {version} (expected {VERSION})")
+
+        offsets_start = HEADER.size
+        index_start = offsets_start + 4 * (slots + 1)
+        blob_start = index_start + 4 * n_words
+        if len(self._mmap) != blob_start + blob_size:
+            raise WordTableError(f"{self.path} is truncated or has trailing data")
+
+        if verify:
+            with memoryview(self._mmap) as view:
+                crc = zlib.crc32(view[HEADER.size:])
+            if crc != checksum:
+                raise WordTableError(f"{self.path} failed its checksum")
+
+        if sys.byteorder == "little":
+            with memoryview(self._mmap) as view:
+                self._offsets = view[offsets_start:index_start].cast("I")
+                self._index = view[index_start:blob_start].cast("I")
+        else:
+            self._offsets = array("I", self._mmap[offsets_start:index_start])
+            self._offsets.byteswap()
+            self._index = array("I", self._mmap[index_start:blob_start])
+            self._index.byteswap()
+        self._blob_start = blob_start
+        self._slots = slots
+        self._n_words = n_words
+        self.version = version
+        self.checksum = checksum
+
+    def _word_bytes(self, number: int) -> bytes:
+        start = self._blob_start + self._offsets[number]
+        end = self._blob_start + self._offsets[number + 1]
+        return self._mmap[start:end]
+
+    def word_for(self, number: int) -> Optional[str]:
+        """Get word by its number, or None if the number is unused."""
+        if not 0 <= number < self._slots:
+            return None
+        word = self._word_bytes(number)
+        return word.decode("utf-8") if word else None
+
+    def number_for(self, word: str) -> Optional[int]:
+        """Get number by word (case-insensitive) using binary search over the sorted index."""
+        target = word.lower().encode("utf-8")
+        lo, hi = 0, self._n_words
+        while lo < hi:
+            mid = (lo + hi) // 2
+            number = self._index[mid]
+            candidate = self._word_bytes(number)
+            if candidate == target:
+                return number
+            if candidate < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def words_for(self, numbers: Iterable[int]) -> List[Optional[str]]:
+        """Get words for many numbers, None where a number is unused."""
+        return [self.word_for(number) for number in numbers]
+
+    def numbers_for(self, words: Iterable[str]) -> List[Optional[int]]:
+        """Get numbers for many words, None where a word is unknown."""
+        return [self.number_for(word) for word in words]
+
+    def __len__(self) -> int:
+        return self._n_words
+
+    def __contains__(self, word: str) -> bool:
+        return self.number_for(word) is not None
+
+    def close(self):
+        """Release the memory mapping."""
+        if self._mmap.closed:
+            return
+        # Memoryview casts must be released before the mmap can close
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+            self._index.release()
+        self._mmap.close()
@@ -0,0 +1,68 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from allergen_catalog import compile_catalog, load_catalog
+from allergies_encoder import AllergiesEncoder
+
+MAIN_CSV = b"id,allergen\n1,Milk\n0,Eggs\n2,Mustard\n"
+SECONDARY_CSV = b"id,allergen,group_id\n0,almond,0\n1,mustard,0\n\n2,cod,5\n3,Tuna,5\n"
+
+
+class TestCompileCatalog:
+    def setup_method(self):
+        self.catalog = compile_catalog(MAIN_CSV, SECONDARY_CSV)
+
+    def test_lists_in_id_order(self):
+        assert self.catalog.main == ("eggs", "milk", "mustard")
+        assert self.catalog.groups == {0: ("almond", "mustard"), 5: ("cod", "tuna")}
+
+    def test_bit_positions(self):
+        assert self.catalog.main_bits == {"eggs": 0, "milk": 1, "mustard": 2}
+        assert self.catalog.secondary_bits["mustard"] == ((0, 1),)
+        assert self.catalog.secondary_bits["tuna"] == ((5, 1),)
+
+    def test_display_list_and_json(self):
+        assert self.catalog.display == ("Eggs", "Milk", "Mustard", "Tuna", "almond", "cod", "mustard")
+        assert json.loads(self.catalog.display_json) == {"allergens": list(self.catalog.display)}
+
+    def test_membership_is_case_insensitive(self):
+        assert "TUNA" in self.catalog
+        assert "walnut" not in self.catalog
+
+    def test_digest_tracks_contents(self):
+        assert compile_catalog(MAIN_CSV, SECONDARY_CSV).digest == self.catalog.digest
+        changed = compile_catalog(MAIN_CSV, SECONDARY_CSV.replace(b"Tuna", b"Hake"))
+        assert changed.digest != self.catalog.digest
+
+
+class TestLoadCatalog:
+    def test_compiled_once_per_directory(self, tmp_path):
+        (tmp_path / "main_allergens.csv").write_bytes(MAIN_CSV)
+        (tmp_path / "secondary_allergens.csv").write_bytes(SECONDARY_CSV)
+        assert load_catalog(tmp_path) is load_catalog(tmp_path)
+        assert load_catalog(tmp_path) is not load_catalog()
+
+    def test_encoder_uses_catalog(self, tmp_path):
+        (tmp_path / "main_allergens.csv").write_bytes(MAIN_CSV)
+        (tmp_path / "secondary_allergens.csv").write_bytes(SECONDARY_CSV)
+        encoder = AllergiesEncoder(load_catalog(tmp_path))
+        assert encoder.encode_all(["milk", "tuna"]) == [0b10, 0b100000 | (0b10 << 6)]
+        assert encoder.decode_all(encoder.encode_all(["milk", "tuna"])) == ["milk", "tuna"]
+
+    def test_default_encoder_shares_process_catalog(self):
+        assert AllergiesEncoder().catalog is load_catalog()
+
+
+def test_api_allergens_serves_catalog():
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from flaskr import create_app
+
+    client = create_app({"TESTING": True}).test_client()
+    response = client.get("/api/allergens")
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    allergens = response.get_json()["allergens"]
+    assert allergens == sorted(set(allergens))
+    assert {"milk", "tuna", "cereals containing gluten"} <= set(allergens)
@@ -85,3 +85,110 @@ class TestAllergiesEncoderAll():
         decoded = self.encoder.decode_all(encoded)
         assert decoded == self.encoder._decode_main(encoded[0])
         assert decoded ==['eggs', 'milk']
+
+    def test_group_5_packed_in_group_map(self):
+        encoded = self.encoder.encode_all(['tuna', 'almond'])
+        group_map = encoded[1]
+        assert group_map & 0b1  # group 0 present
+        assert group_map & (1 << 5)  # group 5 present
+        assert group_map >> 6 == 1 << self.encoder.lists[5].index('tuna')
+        assert len(encoded) == 3
+        assert set(self.encoder.decode_all(encoded)) == {'tuna', 'almond'}
+
+    def test_round_trip_every_allergen(self):
+        for allergen in set(self.encoder.all_list):
+            assert self.encoder.decode_all(self.encoder.encode_all([allergen])) == [allergen]
+
+
+class TestAllergiesEncoderMany():
+    def setup_method(self):
+        self.encoder = AllergiesEncoder()
+        self.profiles = [
+            [],
+            ['eggs', 'milk'],
+            ['cereals containing gluten', 'crustaceans', 'mackerel'],
+            ['Pine nut', 'eggs', 'Milk', 'peanuts', 'tuna', 'tomato', 'garlic'],
+        ]
+
+    def test_encode_many_matches_encode_all(self):
+        matrix = self.encoder.profiles_to_matrix(self.profiles)
+        encoded = self.encoder.encode_many(matrix)
+        assert encoded.shape == (len(self.profiles), len(self.encoder.array_columns))
+        assert self.encoder.array_to_encodings(encoded) == [
+            self.encoder.encode_all(profile) for profile in self.profiles
+        ]
+
+    def test_decode_many_round_trip(self):
+        matrix = self.encoder.profiles_to_matrix(self.profiles)
+        decoded = self.encoder.decode_many(self.encoder.encode_many(matrix))
+        assert (decoded == matrix).all()
+        assert [set(p) for p in self.encoder.matrix_to_profiles(decoded)] == [
+            set(self.encoder.lowercase_list(p)) for p in self.profiles
+        ]
+
+    def test_encodings_to_array_round_trip(self):
+        encodings = [self.encoder.encode_all(profile) for profile in self.profiles]
+        array = self.encoder.encodings_to_array(encodings)
+        assert self.encoder.array_to_encodings(array) == encodings
+
+    def test_unknown_allergen_in_profile(self):
+        with pytest.raises(ValueError):
+            self.encoder.profiles_to_matrix([['nonexistent allergy']])
+
+    def test_wrong_matrix_shape(self):
+        with pytest.raises(ValueError):
+            self.encoder.encode_many([[True, False]])
+
+
+class TestCombineEncodings():
+    def setup_method(self):
+        self.encoder = AllergiesEncoder()
+        self.profiles = [
+            ['eggs', 'milk'],
+            ['cereals containing gluten', 'crustaceans', 'mackerel'],
+            ['Pine nut', 'eggs', 'Milk', 'peanuts', 'tuna', 'tomato', 'garlic'],
+            ['tuna', 'cod', 'walnut'],
+        ]
+        self.encodings = [self.encoder.encode_all(p) for p in self.profiles]
+
+    def decoded(self, encoding):
+        return set(self.encoder.decode_all(encoding))
+
+    def test_union_matches_reencoding(self):
+        union = set().union(*(self.decoded(e) for e in self.encodings))
+        assert self.encoder.combine_lists_of_encodings(self.encodings) == self.encoder.encode_all(sorted(union))
+
+    def test_intersection_matches_reencoding(self):
+        pairs = [(0, 2), (2, 3), (0, 1)]
+        for a, b in pairs:
+            encodings = [self.encodings[a], self.encodings[b]]
+            shared = self.decoded(encodings[0]) & self.decoded(encodings[1])
+            combined = self.encoder.combine_lists_of_encodings(encodings, method='intersection')
+            assert combined == self.encoder.encode_all(sorted(shared))
+
+    def test_group_5_and_group_map_rebuilt(self):
+        # Both have group 5; only the first has group 0
+        first = self.encoder.encode_all(['tuna', 'walnut'])
+        second = self.encoder.encode_all(['tuna', 'cod'])
+        assert self.encoder.combine_lists_of_encodings([first, second], method='intersection') == \
+            self.encoder.encode_all(['tuna'])
+        assert self.encoder.combine_lists_of_encodings([first, second]) == \
+            self.encoder.encode_all(['tuna', 'walnut', 'cod'])
+
+    def test_stray_bits_canonicalized(self):
+        # Secondary "mustard" bit (group 0, bit 9) decodes to the main allergen
+        code = [0, (1 << 0), 1 << 9]
+        assert self.decoded(code) == {'mustard'}
+        assert self.encoder.combine_lists_of_encodings([code]) == self.encoder.encode_all(['mustard'])
+        # Bits past the end of a group name nothing
+        assert self.encoder.combine_lists_of_encodings([[1 << 40, 0]]) == [0, 0]
+
+    def test_invalid_input(self):
+        with pytest.raises(ValueError):
+            self.encoder.combine_lists_of_encodings([])
+        with pytest.raises(ValueError):
+            self.encoder.combine_lists_of_encodings(self.encodings, method='xor')
+        with pytest.raises(ValueError):
+            self.encoder.combine_lists_of_encodings([[0, 0b11, 5]])
+        with pytest.raises(ValueError):
+            self.encoder.combine_lists_of_encodings([[3]])
@@ -0,0 +1,150 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from flaskr import create_app
+
+
+@pytest.fixture(scope="module")
+def app():
+    app = create_app({"TESTING": True, "BATCH_MAX_ITEMS": 50, "BATCH_CHUNK_SIZE": 2})
+    yield app
+    app.extensions["menu_jobs"].shutdown()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+class CountingIndex:
+    """Wraps the getter's word index to count bulk lookups."""
+
+    def __init__(self, index):
+        self.index = index
+        self.calls = 0
+
+    def __getattr__(self, name):
+        return getattr(self.index, name)
+
+    def __len__(self):
+        return len(self.index)
+
+    def words_for(self, numbers):
+        self.calls += 1
+        return self.index.words_for(numbers)
+
+    def numbers_for(self, words):
+        self.calls += 1
+        return self.index.numbers_for(words)
+
+
+class TestGetterBatch:
+    @pytest.fixture
+    def getter(self, app):
+        getter = app.extensions["allergies_getter"].get()
+        original = getter.word_index
+        getter.word_index = CountingIndex(original)
+        getter._encode_cache.clear()
+        getter._decode_cache.clear()
+        yield getter
+        getter.word_index = original
+
+    def test_encode_batch_single_lookup(self, getter):
+        results = getter.allergies_to_words_batch([["milk"], ["eggs", "tuna"], ["nope"], ["milk"]])
+        assert getter.word_index.calls == 1
+        assert results[0] == (getter.allergies_to_words(["milk"]), None)
+        assert results[1][0] == getter.allergies_to_words(["eggs", "tuna"])
+        assert results[2] == (None, "Allergen 'nope' not recognized.")
+        assert results[3] == results[0]
+
+    def test_decode_batch_single_lookup(self, getter):
+        milk = getter.allergies_to_words(["milk"])
+        getter.word_index.calls = 0
+        results = getter.words_to_allergies_batch([milk, ["zzzqx", "the"], milk[:1]])
+        assert getter.word_index.calls == 1
+        assert results[0] == (["milk"], None)
+        assert results[1] == (None, "Words not found in database: zzzqx")
+        assert results[2][0] is None
+
+
+class TestBatchRoutes:
+    def test_encode_then_decode(self, client):
+        items = [["milk", "eggs"], ["bogus"], [], ["tuna"]]
+        data = client.post("/api/encode/batch", json={"items": items}).get_json()
+        assert data["count"] == 4 and data["failed"] == 2
+        assert [r["index"] for r in data["results"]] == [0, 1, 2, 3]
+        assert data["results"][1]["error"] == "Allergen 'bogus' not recognized."
+
+        codes = [data["results"][0]["code"], "", data["results"][3]["code"]]
+        decoded = client.post("/api/decode/batch", json={"codes": codes}).get_json()
+        assert [r["success"] for r in decoded["results"]] == [True, False, True]
+        assert sorted(decoded["results"][0]["allergens"]) == ["eggs", "milk"]
+        assert decoded["results"][2]["allergens"] == ["tuna"]
+
+    def test_ndjson_stream(self, client):
+        codes = ["the", "zzzqx", "", "none none"]
+        response = client.post(
+            "/api/decode/batch", json={"codes": codes}, headers={"Accept": "application/x-ndjson"}
+        )
+        assert response.mimetype == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.data.decode().splitlines()]
+        assert [line["index"] for line in lines[:-1]] == [0, 1, 2, 3]
+        assert lines[-1] == {"done": True, "count": 4, "failed": 3}
+        assert lines[3] == {"index": 3, "success": True, "code": "none none", "allergens": []}
+
+    def test_rejects_bad_bodies(self, client):
+        assert client.post("/api/decode/batch", json={"codes": []}).status_code == 400
+        assert client.post("/api/encode/batch", json={"items": "milk"}).status_code == 400
+        assert client.post("/api/encode/batch", data="not json").status_code == 400
+        assert client.post("/api/decode/batch", json={"codes": ["x"] * 51}).status_code == 413
+
+
+    def test_getter_failure_is_json_error(self):
+        app = create_app({"TESTING": True})
+
+        def broken():
+            raise RuntimeError("no database")
+
+        app.extensions["allergies_getter"]._factory = broken
+        client = app.test_client()
+        try:
+            for url, body in (("/api/encode/batch", {"items": [["milk"]]}),
+                              ("/api/decode/batch", {"codes": ["after none"]})):
+                response = client.post(url, json=body)
+                assert response.status_code == 500
+                data = response.get_json()
+                assert data["success"] is False
+                assert "no database" in data["error"]
+        finally:
+            app.extensions["menu_jobs"].shutdown()
+
+
+class TestCombineRoute:
+    def test_union_and_intersection(self, app, client):
+        getter = app.extensions["allergies_getter"].get()
+        codes = [" ".join(getter.allergies_to_words(a)) for a in (["milk", "tuna"], ["tuna", "eggs"])]
+
+        union = client.post("/api/combine-codes", json={"codes": codes}).get_json()
+        assert union["success"] and union["method"] == "union"
+        assert union["combined_allergens"] == ["eggs", "milk", "tuna"]
+        assert union["combined_words"] == getter.allergies_to_words(["eggs", "milk", "tuna"])
+        assert [r["allergens"] for r in union["individual_allergens"]] == [["milk", "tuna"], ["eggs", "tuna"]]
+
+        shared = client.post("/api/combine-codes", json={"codes": codes, "method": "intersection"}).get_json()
+        assert shared["combined_allergens"] == ["tuna"]
+        assert shared["combined_code"] == " ".join(getter.allergies_to_words(["tuna"]))
+
+    def test_rejects_bad_codes(self, client):
+        assert client.post("/api/combine-codes", json={"codes": ["none none"], "method": "xor"}).status_code == 400
+        assert client.post("/api/combine-codes", json={"codes": ["zzzqx none"]}).status_code == 400
+        assert client.post("/api/combine-codes", json={"codes": ["the"]}).status_code == 400
+
+    def test_getter_phrases_list_to_combined_encoding(self, app):
+        getter = app.extensions["allergies_getter"].get()
+        combined = getter.phrases_list_to_combined_encoding([["Peanuts", "Eggs"], ["Milk", "Pine nut"]])
+        assert combined == getter.encoder.encode_all(["peanuts", "eggs", "milk", "pine nut"])
+        assert getter.phrases_list_to_combined_encoding([["nope"]]) is None
@@ -0,0 +1,90 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import db_manager
+from db_manager import CopyRowStream, DatabaseManager, parse_sql_export
+
+
+class TestCopyRowStream:
+    def test_renders_copy_text(self):
+        stream = CopyRowStream([(0, "none"), (1, "apple")])
+        assert stream.read() == b"0\tnone\n1\tapple\n"
+        assert stream.read() == b""
+        assert stream.rows == 2
+
+    def test_escapes_special_characters(self):
+        stream = CopyRowStream([(1, "a\tb"), (2, "c\\d"), (3, "e\nf")])
+        assert stream.read() == b"1\ta\\tb\n2\tc\\\\d\n3\te\\nf\n"
+
+    def test_sized_reads_concatenate(self):
+        rows = [(i, f"w{i}") for i in range(100)]
+        stream = CopyRowStream(rows)
+        chunks = []
+        while True:
+            chunk = stream.read(7)
+            if not chunk:
+                break
+            assert len(chunk) <= 7
+            chunks.append(chunk)
+        assert b"".join(chunks) == CopyRowStream(rows).read()
+
+    def test_rows_are_consumed_lazily(self):
+        consumed = []
+
+        def rows():
+            for i in range(1000):
+                consumed.append(i)
+                yield i, "word"
+
+        stream = CopyRowStream(rows())
+        stream.read(10)
+        assert len(consumed) < 10
+
+
+class TestParseSqlExport:
+    def test_parses_export_rows(self):
+        lines = [
+            "-- Word Mapping Database Export\n",
+            "CREATE TABLE IF NOT EXISTS word_mapping (\n",
+            "    number INTEGER UNIQUE NOT NULL,\n",
+            ");\n",
+            "INSERT INTO word_mapping (number, word) VALUES\n",
+            "    (0, 'none'),\n",
+            "    (1, 'o''neil'),\n",
+            "    (2, 'apple');\n",
+            "\n",
+            "-- End of export\n",
+        ]
+        assert parse_sql_export(lines) == [(0, "none"), (1, "o'neil"), (2, "apple")]
+
+    def test_other_sql_is_not_export(self):
+        lines = ["CREATE TABLE t (a INT);\n", "INSERT INTO t VALUES (1);\n"]
+        assert parse_sql_export(lines) is None
+
+
+class TestConnectionPool:
+    def test_pool_is_created_once_across_threads(self, monkeypatch):
+        created = []
+
+        class SlowPool:
+            def __init__(self, *args, **kwargs):
+                time.sleep(0.05)
+                created.append(self)
+
+            def closeall(self):
+                pass
+
+        monkeypatch.setattr(db_manager, "ConnectionPool", SlowPool)
+        manager = DatabaseManager(password="unused", use_pool=True)
+        pools = []
+        threads = [threading.Thread(target=lambda: pools.append(manager._get_pool())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(created) == 1
+        assert all(pool is created[0] for pool in pools)
+        manager.close()
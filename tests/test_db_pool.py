@@ -0,0 +1,122 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from db_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.rollbacks = 0
+
+    def rollback(self):
+        if self.closed:
+            raise RuntimeError("connection already closed")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class BrokenConnectionError(Exception):
+    pass
+
+
+class TestConnectionPool:
+    def setup_method(self):
+        self.pool = ConnectionPool(
+            FakeConnection,
+            min_size=1,
+            max_size=2,
+            timeout=0.05,
+            broken_errors=(BrokenConnectionError,)
+        )
+
+    def test_min_size_opened_up_front(self):
+        stats = self.pool.stats()
+        assert stats['idle'] == 1
+        assert stats['created'] == 1
+
+    def test_connection_is_reused(self):
+        with self.pool.connection() as first:
+            pass
+        with self.pool.connection() as second:
+            pass
+        assert first is second
+        assert self.pool.stats()['created'] == 1
+
+    def test_checkout_timeout(self):
+        a = self.pool.getconn()
+        b = self.pool.getconn()
+        with pytest.raises(PoolTimeoutError):
+            self.pool.getconn()
+        assert self.pool.stats()['timeouts'] == 1
+        self.pool.putconn(a)
+        self.pool.putconn(b)
+
+    def test_waiter_gets_returned_connection(self):
+        a = self.pool.getconn()
+        b = self.pool.getconn()
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(self.pool.getconn(timeout=1)))
+        waiter.start()
+        self.pool.putconn(a)
+        waiter.join()
+        assert got == [a]
+        self.pool.putconn(b)
+        self.pool.putconn(a)
+
+    def test_broken_connection_is_recycled(self):
+        with pytest.raises(BrokenConnectionError):
+            with self.pool.connection() as conn:
+                raise BrokenConnectionError()
+        assert conn.closed
+        with self.pool.connection() as fresh:
+            assert fresh is not conn
+        assert self.pool.stats()['recycled'] == 1
+
+    def test_closed_idle_connection_is_replaced(self):
+        with self.pool.connection() as conn:
+            pass
+        conn.closed = True
+        with self.pool.connection() as fresh:
+            assert fresh is not conn
+
+    def test_invalid_bounds(self):
+        with pytest.raises(ValueError):
+            ConnectionPool(FakeConnection, min_size=3, max_size=2)
+
+    def test_failed_connect_releases_slot(self):
+        attempts = []
+
+        def connect():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise OSError("connection refused")
+            return FakeConnection()
+
+        pool = ConnectionPool(connect, min_size=0, max_size=1, timeout=0.05)
+        with pytest.raises(OSError):
+            pool.getconn()
+        assert pool.stats()['in_use'] == 0
+        with pool.connection():
+            pass
+        assert pool.stats()['created'] == 1
+
+    def test_concurrent_opens_are_all_counted(self):
+        pool = ConnectionPool(FakeConnection, min_size=0, max_size=50, timeout=1)
+        conns = []
+        threads = [threading.Thread(target=lambda: conns.append(pool.getconn())) for _ in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = pool.stats()
+        assert stats['created'] == stats['checkouts'] == 50
+        assert len(pool._created_at) == 50
+        for conn in conns:
+            pool.putconn(conn)
@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from dictionary_words import (
+    DICTIONARY_WORDS_PATH,
+    DictionaryWordsError,
+    build_from_word_table,
+    load_word_list,
+    rank_words,
+    write_word_list,
+)
+from word_table import write_word_table
+
+
+class TestRankWords:
+    def test_most_frequent_first_ties_in_first_seen_order(self):
+        tokens = ["The", "cat", "and", "the", "dog", "AND", "the", "x1", "a", "elephants"]
+        assert rank_words(tokens, 3, 7) == ["the", "and", "cat", "dog"]
+
+
+class TestWordListFile:
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "words.txt"
+        assert write_word_list(path, ["the", "and", "cat"], 3, 7) == 3
+        assert load_word_list(path, 3, 7) == ["the", "and", "cat"]
+
+    def test_rejects_other_length_bounds(self, tmp_path):
+        path = tmp_path / "words.txt"
+        write_word_list(path, ["the"], 3, 6)
+        with pytest.raises(DictionaryWordsError, match="max_length"):
+            load_word_list(path, 3, 7)
+
+    def test_rejects_edited_file(self, tmp_path):
+        path = tmp_path / "words.txt"
+        write_word_list(path, ["the", "and"], 3, 7)
+        path.write_text(path.read_text().replace("and", "cat"))
+        with pytest.raises(DictionaryWordsError, match="corrupt"):
+            load_word_list(path)
+
+    def test_rejects_missing_and_foreign_files(self, tmp_path):
+        with pytest.raises(DictionaryWordsError):
+            load_word_list(tmp_path / "missing.txt")
+        other = tmp_path / "other.txt"
+        other.write_text("the\nand\n")
+        with pytest.raises(DictionaryWordsError, match="Not a dictionary"):
+            load_word_list(other)
+
+    def test_shipped_list_matches_word_table(self):
+        words = load_word_list(DICTIONARY_WORDS_PATH, 3, 7)
+        assert words == build_from_word_table(DICTIONARY_WORDS_PATH.with_name("word_mapping.bin"))
+
+
+class TestBuildFromWordTable:
+    def test_restores_skipped_none(self, tmp_path):
+        path = tmp_path / "table.bin"
+        write_word_table(path, [(0, "none"), (1, "the"), (3, "and")])
+        assert build_from_word_table(path) == ["the", "none", "and"]
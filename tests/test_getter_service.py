@@ -0,0 +1,100 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from getter_service import GetterService
+
+
+class FakeGetter:
+    use_dump = True
+    word_index = None
+    db = None
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def cache_stats(self):
+        return {}
+
+
+class TestGetterService:
+    def setup_method(self):
+        self.built = []
+
+        def factory():
+            getter = FakeGetter()
+            self.built.append(getter)
+            return getter
+
+        self.service = GetterService(factory=factory)
+
+    def test_lazy_warm_up(self):
+        assert self.service.health()['status'] == 'cold'
+        assert self.built == []
+        getter = self.service.get()
+        assert self.service.health()['status'] == 'ready'
+        assert self.service.get() is getter
+
+    def test_builds_once_across_threads(self):
+        threads = [threading.Thread(target=self.service.get) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(self.built) == 1
+
+    def test_counts_every_request_across_threads(self):
+        def worker():
+            for _ in range(500):
+                self.service.get()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert self.service.health()['requests'] == 4000
+
+    def test_close_releases_getter(self):
+        getter = self.service.get()
+        self.service.close()
+        assert getter.closed
+        assert self.service.health()['status'] == 'closed'
+        with pytest.raises(RuntimeError):
+            self.service.get()
+
+    def test_failed_warm_up_is_reported(self):
+        def broken():
+            raise RuntimeError("no database")
+
+        service = GetterService(factory=broken)
+        assert service.warm_up() is False
+        health = service.health()
+        assert health['status'] == 'error'
+        assert 'no database' in health['last_error']
+
+    def test_failed_build_is_not_retried_until_interval_passes(self):
+        calls = []
+        now = [100.0]
+
+        def broken():
+            calls.append(1)
+            raise RuntimeError("connect timeout")
+
+        service = GetterService(factory=broken, retry_interval=5, clock=lambda: now[0])
+        with pytest.raises(RuntimeError, match="connect timeout"):
+            service.get()
+        with pytest.raises(RuntimeError, match="retrying"):
+            service.get()
+        assert len(calls) == 1
+
+        now[0] += 5
+        with pytest.raises(RuntimeError, match="connect timeout"):
+            service.get()
+        assert len(calls) == 2
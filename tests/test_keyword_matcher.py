@@ -0,0 +1,47 @@
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from keyword_matcher import KeywordMatcher
+
+
+class TestKeywordMatcher:
+    def test_whole_words_case_insensitive(self):
+        matcher = KeywordMatcher({"nuts": ["nut", "nuts", "walnut"], "milk": ["milk"]})
+        matches = matcher.find_all("Walnut cake, NUTS on top, donut, Milkshake")
+        assert [(m.key, m.text, m.start, m.end) for m in matches] == [
+            ("nuts", "Walnut", 0, 6),
+            ("nuts", "NUTS", 13, 17),
+        ]
+
+    def test_substring_mode_reports_overlapping_hits(self):
+        matcher = KeywordMatcher(["he", "she", "hers", "his"], whole_words=False)
+        assert [(m.term, m.start) for m in matcher.find_all("ushers")] == [("she", 1), ("he", 2), ("hers", 2)]
+
+    def test_multi_word_and_punctuated_terms(self):
+        matcher = KeywordMatcher({"gluten-free": ["gluten-free", "gluten free"], "gluten": ["gluten"]})
+        first = matcher.first_matches("Bread (Gluten Free) and gluten-free pasta")
+        assert first["gluten-free"].text == "Gluten Free"
+        assert first["gluten"].start == 7
+
+    def test_spans_survive_case_expansion(self):
+        # 'İ'.lower() is two characters long
+        text = "İİ egg"
+        match = KeywordMatcher(["egg"]).find_all(text)[0]
+        assert text[match.start:match.end] == "egg"
+
+    def test_empty_keyword_rejected(self):
+        with pytest.raises(ValueError):
+            KeywordMatcher(["milk", ""])
+
+    def test_agrees_with_regex_word_boundaries(self):
+        terms = ["egg", "eggs", "v", "veg", "soy", "soya"]
+        text = "Veg stir-fry (V) with soya & eggs; eggplant, soy_sauce, vegan, egg-free"
+        expected = sorted(
+            (m.start(), m.end())
+            for t in terms for m in re.finditer(rf"\b{re.escape(t)}\b", text, re.IGNORECASE)
+        )
+        assert [(m.start, m.end) for m in KeywordMatcher(terms).find_all(text)] == expected
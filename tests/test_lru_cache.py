@@ -0,0 +1,58 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from lru_cache import LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCache:
+    def test_hit_and_miss_counters(self):
+        cache = LRUCache(maxsize=2)
+        assert cache.get('a') is None
+        cache.put('a', 1)
+        assert cache.get('a') == 1
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses']) == (1, 1)
+        assert stats['hit_rate'] == 0.5
+
+    def test_least_recently_used_is_evicted(self):
+        cache = LRUCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.get('c') == 3
+        assert cache.stats()['evictions'] == 1
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = LRUCache(maxsize=2, ttl=10, clock=clock)
+        cache.put('a', 1)
+        clock.now = 5
+        assert cache.get('a') == 1
+        clock.now = 11
+        assert cache.get('a') is None
+        assert cache.stats()['expirations'] == 1
+
+    def test_clear(self):
+        cache = LRUCache(maxsize=2)
+        cache.put('a', 1)
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.get('a') is None
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            LRUCache(maxsize=0)
@@ -0,0 +1,171 @@
+import io
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from menu_jobs import DONE, FAILED, JobQueue, QueueFullError
+
+
+def wait_for(queue, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job.status in (DONE, FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+class TestJobQueue:
+    def setup_method(self):
+        self.queue = JobQueue(workers=2, max_pending=2, max_finished=2)
+
+    def teardown_method(self):
+        self.queue.shutdown()
+
+    def test_runs_job_and_reports_result(self):
+        job = self.queue.submit(lambda a, b: a + b, 2, b=3, meta={"source_file": "menu.jpg"})
+        data = wait_for(self.queue, job.id).to_dict()
+        assert data["status"] == DONE
+        assert data["result"] == 5
+        assert data["source_file"] == "menu.jpg"
+        assert data["run_seconds"] >= 0
+
+    def test_failure_is_recorded(self):
+        def boom():
+            raise RuntimeError("tesseract crashed")
+        job = wait_for(self.queue, self.queue.submit(boom).id)
+        assert job.status == FAILED
+        assert job.to_dict()["error"] == "tesseract crashed"
+        assert self.queue.stats()["failed"] == 1
+
+    def test_rejects_when_full(self):
+        release = threading.Event()
+        jobs = [self.queue.submit(release.wait) for _ in range(2)]
+        with pytest.raises(QueueFullError):
+            self.queue.submit(release.wait)
+        release.set()
+        for job in jobs:
+            wait_for(self.queue, job.id)
+        assert self.queue.stats()["queued"] == 0
+
+    def test_shutdown_without_wait_fails_queued_jobs(self):
+        queue = JobQueue(workers=1, max_pending=3)
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait()
+            return "done"
+
+        running = queue.submit(block)
+        queued = [queue.submit(lambda: "never") for _ in range(2)]
+        started.wait(5)
+        queue.shutdown(wait=False)
+        release.set()
+
+        for job in queued:
+            data = queue.get(job.id).to_dict()
+            assert data["status"] == FAILED
+            assert data["error"] == "Cancelled at shutdown"
+        assert wait_for(queue, running.id).result == "done"
+        stats = queue.stats()
+        assert stats["queued"] == 0 and stats["running"] == 0
+        assert stats["failed"] == 2
+
+    def test_submit_after_shutdown_is_refused(self):
+        queue = JobQueue(workers=1)
+        queue.shutdown()
+        with pytest.raises(RuntimeError):
+            queue.submit(lambda: 1)
+        assert queue.stats()["queued"] == 0
+        assert queue._jobs == {}
+
+    def test_executor_refusal_undoes_registration(self):
+        queue = JobQueue(workers=1)
+        # Executor already stopped, as when shutdown() races a submit
+        queue._executor.shutdown()
+        with pytest.raises(RuntimeError):
+            queue.submit(lambda: 1)
+        assert queue.stats()["queued"] == 0
+        assert queue._jobs == {}
+
+    def test_forgets_oldest_finished_jobs(self):
+        ids = []
+        for i in range(3):
+            ids.append(self.queue.submit(lambda i=i: i).id)
+            wait_for(self.queue, ids[-1])
+        assert self.queue.get(ids[0]) is None
+        assert self.queue.get(ids[2]).result == 2
+
+
+class TestMenuUploadApi:
+    @pytest.fixture
+    def client(self, tmp_path):
+        from flaskr import create_app
+        app = create_app({
+            "TESTING": True,
+            "MENU_OCR_BACKEND": "fake",
+            "MENU_UPLOAD_DIR": str(tmp_path),
+        })
+        yield app.test_client()
+        app.extensions["menu_jobs"].shutdown()
+
+    @staticmethod
+    def image_bytes():
+        buf = io.BytesIO()
+        Image.new("RGB", (200, 100), "white").save(buf, format="PNG")
+        buf.seek(0)
+        return buf
+
+    def test_upload_returns_job_and_result(self, client, tmp_path):
+        response = client.post("/api/menus", data={"image": (self.image_bytes(), "menu.png")})
+        assert response.status_code == 202
+        status_url = response.get_json()["status_url"]
+
+        deadline = time.monotonic() + 5
+        while True:
+            data = client.get(status_url).get_json()
+            if data["status"] in (DONE, FAILED) or time.monotonic() > deadline:
+                break
+            time.sleep(0.01)
+
+        assert data["status"] == DONE
+        assert data["source_file"] == "menu.png"
+        assert data["result"]["ocr_text"].startswith("fake OCR")
+        assert data["result"]["meals"][0]["meal"] == data["result"]["ocr_text"]
+        # Uploaded file is removed once processed
+        assert list(tmp_path.iterdir()) == []
+
+    def test_rejects_missing_or_unsupported_files(self, client):
+        assert client.post("/api/menus", data={}).status_code == 400
+        response = client.post("/api/menus", data={"image": (io.BytesIO(b"%PDF"), "menu.pdf")})
+        assert response.status_code == 400
+
+    def test_unknown_job(self, client):
+        assert client.get("/api/menus/nope").status_code == 404
+
+    def test_undecodable_code_fails_job(self, client, tmp_path):
+        response = client.post("/api/menus", data={
+            "image": (self.image_bytes(), "menu.png"),
+            "allergen_phrases": "zzzqx none",
+        })
+        assert response.status_code == 202
+        status_url = response.get_json()["status_url"]
+
+        deadline = time.monotonic() + 5
+        while True:
+            data = client.get(status_url).get_json()
+            if data["status"] in (DONE, FAILED) or time.monotonic() > deadline:
+                break
+            time.sleep(0.01)
+
+        assert data["status"] == FAILED
+        assert "Could not decode" in data["error"]
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,150 @@
+import sys
+import time
+import types
+
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from PIL import Image, ImageDraw, ImageFont
+
+import menu_ocr
+from menu_ocr import FakeBackend, estimate_text_height, get_backend, ocr_images, ocr_single_image, preprocess_image
+
+
+def fake_ocr(path, psm=6, scale=None, lang="eng", backend=None):
+    """Stands in for tesseract: 'bad' images fail, earlier images are slower."""
+    name = Path(path).name
+    if name.startswith("bad"):
+        raise OSError("cannot identify image file")
+    time.sleep(0.05 / (int(name.split(".")[0][-1]) + 1))
+    return f"text of {name} (psm {psm})"
+
+
+PATHS = [Path(f"img{i}.jpg") for i in range(4)] + [Path("bad5.jpg")]
+
+
+class TestOcrImages:
+    def test_sequential(self):
+        results = list(ocr_images(PATHS, psm=4, workers=1, ocr_fn=fake_ocr))
+        assert [r.path for r in results] == PATHS
+        assert results[0].text == "text of img0.jpg (psm 4)"
+        assert all(r.seconds >= 0 for r in results)
+
+    def test_failure_is_isolated(self):
+        results = list(ocr_images(PATHS, workers=2, ocr_fn=fake_ocr))
+        assert [r.ok for r in results] == [True, True, True, True, False]
+        assert results[-1].text is None
+        assert "cannot identify image file" in results[-1].error
+
+    def test_pool_keeps_input_order(self):
+        results = list(ocr_images(PATHS, workers=3, max_in_flight=2, ocr_fn=fake_ocr))
+        assert [r.index for r in results] == list(range(len(PATHS)))
+
+    def test_unordered_yields_every_image_once(self):
+        results = list(ocr_images(PATHS, workers=3, ordered=False, ocr_fn=fake_ocr))
+        assert sorted(r.index for r in results) == list(range(len(PATHS)))
+
+
+def text_image(path, size, font_size, lines=20):
+    img = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=font_size)
+    for i in range(lines):
+        draw.text((20, 20 + i * font_size * 2), "Green Curry with Chicken 1 3 6", fill="black", font=font)
+    img.save(path)
+    return path
+
+
+class TestPreprocessImage:
+    def test_estimates_text_height(self, tmp_path):
+        small = estimate_text_height(Image.open(text_image(tmp_path / "s.png", (800, 1000), 12)).convert("L"))
+        large = estimate_text_height(Image.open(text_image(tmp_path / "l.png", (800, 1000), 24)).convert("L"))
+        assert 6 <= small <= 14
+        assert 1.5 < large / small < 2.5
+        assert estimate_text_height(Image.new("L", (100, 100), 255)) is None
+
+    def test_small_text_is_upscaled(self, tmp_path):
+        img = preprocess_image(text_image(tmp_path / "menu.png", (600, 800), 10))
+        assert img.mode == "L"
+        assert img.width > 600
+
+    def test_large_photo_is_downscaled_within_budget(self, tmp_path):
+        path = text_image(tmp_path / "menu.jpg", (3000, 4000), 120, lines=12)
+        img = preprocess_image(path, max_pixels=4_000_000)
+        assert img.width < 3000
+        assert img.width * img.height <= 4_000_000
+
+    def test_fixed_scale_and_exif_rotation(self, tmp_path):
+        path = tmp_path / "rotated.jpg"
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotated 90 degrees
+        Image.new("RGB", (400, 200), "white").save(path, exif=exif)
+        assert preprocess_image(path, scale=0.5).size == (100, 200)
+        assert preprocess_image(path, scale=2).size == (400, 800)
+
+
+class TestBackends:
+    def test_fake_backend_through_ocr_single_image(self, tmp_path):
+        path = text_image(tmp_path / "menu.png", (600, 800), 10)
+        text = ocr_single_image(path, psm=4, scale=1, backend="fake")
+        assert text == "fake OCR 600x800 psm=4 lang=eng"
+
+    def test_backend_instance_is_shared_per_process(self):
+        assert get_backend("fake") is get_backend("fake")
+        assert isinstance(get_backend("fake"), FakeBackend)
+
+    def test_backend_must_implement_image_to_string(self):
+        class Incomplete(menu_ocr.OCRBackend):
+            name = "incomplete"
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_tesserocr_api_gets_int_psm(self, monkeypatch):
+        calls = []
+
+        class PSM:
+            SINGLE_BLOCK = 6
+
+            def __init__(self, *args):
+                raise TypeError("PSM is an enum and cannot be instantiated")
+
+        class PyTessBaseAPI:
+            def __init__(self, **kwargs):
+                calls.append(kwargs)
+
+            def SetImage(self, img):
+                self.size = img.size
+
+            def GetUTF8Text(self):
+                return f"text {self.size[0]}x{self.size[1]}"
+
+            def End(self):
+                pass
+
+        stub = types.SimpleNamespace(PSM=PSM, PyTessBaseAPI=PyTessBaseAPI)
+        monkeypatch.setitem(sys.modules, "tesserocr", stub)
+        backend = menu_ocr.TesserocrBackend()
+        img = Image.new("L", (30, 20), 255)
+        assert backend.image_to_string(img, psm=4, lang="deu") == "text 30x20"
+        backend.image_to_string(img, psm=4, lang="deu")
+        backend.close()
+        assert calls == [{"lang": "deu", "psm": 4}]
+
+    def test_auto_prefers_persistent_engine(self, monkeypatch):
+        monkeypatch.setattr(menu_ocr.TesserocrBackend, "available", classmethod(lambda cls: True))
+        assert menu_ocr.resolve_backend_name("auto") == "tesserocr"
+        monkeypatch.setattr(menu_ocr.TesserocrBackend, "available", classmethod(lambda cls: False))
+        assert menu_ocr.resolve_backend_name("auto") == "tesseract"
+
+    def test_env_var_and_unknown_backend(self, monkeypatch):
+        monkeypatch.setenv("OCR_BACKEND", "fake")
+        assert menu_ocr.resolve_backend_name() == "fake"
+        with pytest.raises(ValueError):
+            menu_ocr.resolve_backend_name("easyocr")
+
+    def test_pool_workers_use_named_backend(self, tmp_path):
+        paths = [text_image(tmp_path / f"m{i}.png", (300, 400), 10, lines=5) for i in range(3)]
+        results = list(ocr_images(paths, scale=1, workers=2, backend="fake"))
+        assert [r.text for r in results] == ["fake OCR 300x400 psm=6 lang=eng"] * 3
@@ -0,0 +1,148 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from allergies_encoder import AllergiesEncoder
+from menu_safety import CompiledMenu, MenuSafetyEngine
+
+
+class FakeGetter:
+    def __init__(self, encoder, codes):
+        self.encoder = encoder
+        self.codes = codes
+
+    def words_to_allergies(self, words):
+        return self.codes.get(tuple(words))
+
+
+class TestCompiledMenu:
+    def setup_method(self):
+        self.encoder = AllergiesEncoder()
+        self.menu = CompiledMenu(
+            ['Pizza', 'Salmon', 'Fries', 'Satay'],
+            [['milk', 'cereals containing gluten', 'tomato'], ['fish', 'salmon'], [], ['Peanuts', 'mustard']],
+            self.encoder
+        )
+
+    def test_conflicts(self):
+        assert self.menu.conflicts(['milk', 'salmon']).tolist() == [True, True, False, False]
+
+    def test_matched_allergens_keep_item_order(self):
+        results = self.menu.check(['tomato', 'milk', 'mustard'])
+        assert results[0]['matched_allergens'] == ['milk', 'tomato']
+        assert results[3]['matched_allergens'] == ['mustard']
+        assert [r['has_match'] for r in results] == [True, False, False, True]
+
+    def test_no_user_allergens(self):
+        assert not any(r['has_match'] for r in self.menu.check([]))
+
+    def test_from_phrases_decodes_each_item_once(self):
+        getter = FakeGetter(self.encoder, {('ocean',): ['eggs']})
+        menu = CompiledMenu.from_phrases([
+            {'meal': 'Omelette', 'allergen_phrases': ['ocean']},
+            {'meal': 'Salad', 'allergen_phrases': []},
+        ], getter)
+        assert menu.item_allergens == [['eggs'], []]
+        assert menu.check(['eggs'])[0]['has_match']
+
+    def test_from_phrases_flags_undecodable_item(self):
+        class RaisingGetter(FakeGetter):
+            def words_to_allergies(self, words):
+                if words == ['broken']:
+                    raise IndexError("list index out of range")
+                return super().words_to_allergies(words)
+
+        getter = RaisingGetter(self.encoder, {('ocean',): ['eggs']})
+        menu = CompiledMenu.from_phrases([
+            {'meal': 'Omelette', 'allergen_phrases': ['ocean']},
+            {'meal': 'Unknown', 'allergen_phrases': ['bad']},
+            {'meal': 'Broken', 'allergen_phrases': ['broken']},
+            {'meal': 'Salad', 'allergen_phrases': []},
+        ], getter)
+        assert menu.item_allergens == [['eggs'], [], [], []]
+        assert [r['unknown'] for r in menu.check(['milk'])] == [False, True, True, False]
+
+    def test_undecodable_hardcoded_item_is_never_safe(self):
+        import run_filter_meals
+        menu = CompiledMenu.from_phrases(run_filter_meals.HARDCODED_MENU, FakeGetter(self.encoder, {}))
+        results = run_filter_meals.analyse_compiled_menu(menu, ['milk'])
+        for item, result in zip(run_filter_meals.HARDCODED_MENU, results):
+            assert result['allowed'] == (not item['allergen_phrases'])
+
+    def test_same_group_different_allergen_is_safe(self):
+        menu = CompiledMenu(['Cashew curry'], [['cashew']], self.encoder)
+        assert menu.conflicts(['almond']).tolist() == [False]
+        assert menu.conflicts(['cashew']).tolist() == [True]
+
+
+class TestMenuSafetyEngine:
+    def setup_method(self):
+        self.encoder = AllergiesEncoder()
+        self.engine = MenuSafetyEngine(self.encoder, chunk_size=2)
+        self.dishes = [self.encoder.encode_all(d) for d in [
+            ['milk', 'wheat'], ['tuna', 'cod'], [], ['almond', 'eggs'],
+        ]]
+        self.users = [self.encoder.encode_all(u) for u in [
+            ['milk'], ['cod'], ['cashew'], ['wheat', 'eggs', 'tuna'], [],
+        ]]
+
+    def test_conflict_matrix(self):
+        conflicts = self.engine.conflict_matrix(self.dishes, self.users)
+        assert conflicts.tolist() == [
+            [True, False, False, False],
+            [False, True, False, False],
+            [False, False, False, False],
+            [True, True, False, True],
+            [False, False, False, False],
+        ]
+
+    def test_evaluate_decodes_only_shared_allergens(self):
+        results = self.engine.evaluate(self.dishes, self.users)
+        assert results[3][0] == {"allowed": False, "status": "AVOID", "matched_allergens": ['wheat']}
+        assert results[3][1]['matched_allergens'] == ['tuna']
+        assert results[0][1] == {"allowed": True, "status": "SAFE", "matched_allergens": []}
+
+    def test_accepts_fixed_width_arrays(self):
+        dishes = self.encoder.encodings_to_array(self.dishes)
+        users = self.encoder.encodings_to_array(self.users)
+        assert (self.engine.conflict_matrix(dishes, users)
+                == self.engine.conflict_matrix(self.dishes, self.users)).all()
+
+
+class TestAnalyzeMenuApi:
+    @pytest.fixture
+    def app(self, monkeypatch):
+        import run_filter_meals
+        from flaskr import create_app
+        monkeypatch.setattr(run_filter_meals, '_compiled_menu', None)
+        app = create_app({"TESTING": True})
+        yield app
+        app.extensions["menu_jobs"].shutdown()
+
+    def test_hardcoded_menu_with_real_word_table(self, app):
+        import run_filter_meals
+        getter = app.extensions["allergies_getter"].get()
+        response = app.test_client().post("/api/analyze-menu", json={
+            "allergen_phrases": getter.allergies_to_words(["milk"])
+        })
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["user_allergens"] == ["milk"]
+        assert data["stats"]["total"] == len(run_filter_meals.HARDCODED_MENU)
+
+        menu = run_filter_meals.get_compiled_menu(getter)
+        for unknown, result in zip(menu.unknown, data["results"]):
+            if unknown:
+                assert not result["allowed"]
+            else:
+                assert result["allowed"] == ("milk" not in result["item_allergens"])
+        # Items without phrases are allergen-free
+        assert {r["meal"]: r["allowed"] for r in data["results"]}["French Fries"]
+
+    def test_undecodable_user_code_is_rejected(self, app):
+        response = app.test_client().post("/api/analyze-menu", json={"allergen_phrases": ["zzzqx", "none"]})
+        assert response.status_code == 400
+        assert response.get_json()["success"] is False
@@ -0,0 +1,198 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from allergies_encoder import AllergiesEncoder
+from menu_store import MenuStore, SQLiteMenuStore, open_menu_store
+
+
+class FakeGetter:
+    def __init__(self, encoder, codes):
+        self.encoder = encoder
+        self.codes = codes
+
+    def words_to_allergies(self, words):
+        return self.codes.get(tuple(words))
+
+
+MENU = [
+    {"meal": "Pad Thai", "allergens": ["Peanuts", "eggs", "fish"]},
+    {"meal": "Green Curry", "allergens": ["fish"]},
+    {"meal": "Rice", "allergens": []},
+    {"meal": "Cashew Stir Fry", "allergens": ["cashew", "soybeans"]},
+]
+
+
+class TestSQLiteMenuStore:
+    def setup_method(self):
+        self.encoder = AllergiesEncoder()
+        self.store = SQLiteMenuStore(":memory:", self.encoder)
+
+    def teardown_method(self):
+        self.store.close()
+
+    def test_base_store_requires_connection_handling(self):
+        with pytest.raises(TypeError):
+            MenuStore(self.encoder)
+
+    def test_add_and_get_menu(self):
+        menu_id = self.store.add_menu("ThaiAngle", MENU, name="Dinner", source="menu.jpg")
+        menu = self.store.get_menu(menu_id)
+        assert menu["restaurant"] == "ThaiAngle"
+        assert menu["name"] == "Dinner"
+        assert [d["meal"] for d in menu["dishes"]] == ["Pad Thai", "Green Curry", "Rice", "Cashew Stir Fry"]
+        assert menu["dishes"][0]["allergens"] == ["peanuts", "eggs", "fish"]
+        assert self.store.get_menu(menu_id + 1) is None
+
+    def test_restaurants_are_shared(self):
+        first = self.store.add_menu("ThaiAngle", MENU[:1], name="Lunch")
+        second = self.store.add_menu("ThaiAngle", MENU[1:], name="Dinner")
+        assert self.store.add_restaurant("ThaiAngle") == self.store.add_restaurant("ThaiAngle")
+        menus = self.store.list_menus()
+        assert [(m["id"], m["restaurant"], m["dishes"]) for m in menus] == [(first, "ThaiAngle", 1), (second, "ThaiAngle", 3)]
+
+    def test_stored_encodings_match_encoder(self):
+        menu_id = self.store.add_menu("ThaiAngle", MENU)
+        compiled = self.store.load_compiled_menu(menu_id)
+        expected = self.encoder.encode_many(self.encoder.profiles_to_matrix([
+            [a.lower() for a in item["allergens"]] for item in MENU
+        ]))
+        assert (compiled.masks == expected).all()
+        assert self.encoder.array_to_encodings(compiled.masks)[0] == self.encoder.encode_all(["peanuts", "eggs", "fish"])
+
+    def test_compiled_menu_checks_from_stored_masks(self):
+        menu_id = self.store.add_menu("ThaiAngle", MENU)
+        results = self.store.load_compiled_menu(menu_id).check(["fish", "almond"])
+        assert [r["matched_allergens"] for r in results] == [["fish"], ["fish"], [], []]
+        assert self.store.load_compiled_menu(menu_id) is self.store.load_compiled_menu(menu_id)
+        assert self.store.load_compiled_menu(menu_id + 1) is None
+
+    def test_unknown_allergen_rolls_back(self):
+        with pytest.raises(ValueError):
+            self.store.add_menu("ThaiAngle", [{"meal": "Mystery", "allergens": ["kryptonite"]}])
+        assert self.store.list_menus() == []
+
+    def test_add_menu_from_phrases(self):
+        getter = FakeGetter(self.encoder, {("too", "harry"): ["milk", "peanuts"]})
+        menu_id = self.store.add_menu_from_phrases("Cafe", [
+            {"meal": "Shake", "allergen_phrases": ["too", "harry"]},
+            {"meal": "Water", "allergen_phrases": []},
+        ], getter)
+        assert [d["allergens"] for d in self.store.get_menu(menu_id)["dishes"]] == [["milk", "peanuts"], []]
+
+    def test_undecodable_phrases_store_nothing(self):
+        getter = FakeGetter(self.encoder, {("too", "harry"): ["milk", "peanuts"]})
+        with pytest.raises(ValueError):
+            self.store.add_menu_from_phrases("Cafe", [
+                {"meal": "Shake", "allergen_phrases": ["too", "harry"]},
+                {"meal": "Mystery", "allergen_phrases": ["zzzqx"]},
+            ], getter)
+        assert self.store.list_menus() == []
+
+    def test_delete_menu(self):
+        menu_id = self.store.add_menu("ThaiAngle", MENU)
+        self.store.load_compiled_menu(menu_id)
+        assert self.store.delete_menu(menu_id)
+        assert self.store.load_compiled_menu(menu_id) is None
+        assert not self.store.delete_menu(menu_id)
+
+    def test_file_store_persists(self, tmp_path):
+        path = str(tmp_path / "menus.sqlite3")
+        store = open_menu_store("sqlite", path, self.encoder)
+        menu_id = store.add_menu("ThaiAngle", MENU)
+        store.close()
+        reopened = open_menu_store("sqlite", path, self.encoder)
+        assert len(reopened.get_menu(menu_id)["dishes"]) == 4
+        reopened.close()
+        with pytest.raises(ValueError):
+            open_menu_store("mongodb")
+
+
+class TestFindDishes:
+    def setup_method(self):
+        self.encoder = AllergiesEncoder()
+        self.store = SQLiteMenuStore(":memory:", self.encoder)
+        self.thai = self.store.add_menu("ThaiAngle", MENU)
+        self.cafe = self.store.add_menu("Cafe", [
+            {"meal": "Almond Croissant", "allergens": ["almond", "wheat", "milk"]},
+            {"meal": "Tea", "allergens": []},
+        ])
+
+    def teardown_method(self):
+        self.store.close()
+
+    def meals(self, dishes):
+        return [d["meal"] for d in dishes]
+
+    def test_safe_dishes_for_restaurant(self):
+        dishes = self.store.find_dishes(self.encoder.encode_all(["fish"]), restaurant="ThaiAngle")
+        assert self.meals(dishes) == ["Rice", "Cashew Stir Fry"]
+        assert dishes[0]["menu_id"] == self.thai
+
+    def test_dishes_to_avoid(self):
+        encoding = self.encoder.encode_all(["peanuts", "cashew"])
+        assert self.meals(self.store.find_dishes(encoding, safe=False)) == ["Pad Thai", "Cashew Stir Fry"]
+
+    def test_same_group_different_allergen_is_safe(self):
+        # almond and cashew share a secondary group but are different allergens
+        dishes = self.store.find_dishes_for_allergens(["almond"], menu_id=self.thai)
+        assert "Cashew Stir Fry" in self.meals(dishes)
+        assert self.meals(self.store.find_dishes_for_allergens(["almond"], safe=False)) == ["Almond Croissant"]
+
+    def test_matches_in_memory_engine(self):
+        for allergens in (["milk"], ["fish", "wheat"], ["soybeans", "almond"], []):
+            compiled = self.store.load_compiled_menu(self.thai)
+            expected = [r["meal"] for r in compiled.check(allergens) if not r["has_match"]]
+            assert self.meals(self.store.find_dishes_for_allergens(allergens, menu_id=self.thai)) == expected
+
+    def test_no_allergens_means_everything_is_safe(self):
+        assert len(self.store.find_dishes([0, 0])) == 6
+        assert self.store.find_dishes([0, 0], safe=False) == []
+
+    def test_filter_uses_covering_index(self):
+        with self.store._cursor() as cursor:
+            cursor.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM dishes WHERE menu_id = ? AND (enc_main & ?) = 0",
+                (self.thai, 1)
+            )
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        assert "dishes_menu_encoding_idx" in plan
+
+
+class TestStoredMenusApi:
+    @pytest.fixture
+    def app(self, tmp_path):
+        sys.path.insert(0, str(Path(__file__).parent.parent))
+        from flaskr import create_app
+        app = create_app({"TESTING": True, "MENU_STORE_PATH": str(tmp_path / "menus.sqlite3")})
+        yield app
+        app.extensions["menu_jobs"].shutdown()
+
+    def test_undecodable_phrase_is_rejected(self, app):
+        client = app.test_client()
+        getter = app.extensions["allergies_getter"].get()
+        good = getter.allergies_to_words(["milk"])
+        response = client.post("/api/stored-menus", json={
+            "restaurant": "Cafe",
+            "items": [
+                {"meal": "Shake", "allergen_phrases": good},
+                {"meal": "Mystery", "allergen_phrases": ["zzzqx", "none"]},
+            ],
+        })
+        assert response.status_code == 400
+        assert "Mystery" in response.get_json()["error"]
+        assert client.get("/api/stored-menus").get_json()["menus"] == []
+        assert client.get("/api/safe-dishes", query_string={"code": " ".join(good)}).get_json()["dishes"] == []
+
+    def test_decodable_phrases_are_stored(self, app):
+        client = app.test_client()
+        getter = app.extensions["allergies_getter"].get()
+        response = client.post("/api/stored-menus", json={
+            "restaurant": "Cafe",
+            "items": [{"meal": "Shake", "allergen_phrases": getter.allergies_to_words(["milk"])}],
+        })
+        assert response.status_code == 201
+        menu = client.get(f"/api/stored-menus/{response.get_json()['menu_id']}").get_json()
+        assert menu["menu"]["dishes"][0]["allergens"] == ["milk"]
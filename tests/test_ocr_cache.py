@@ -0,0 +1,85 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from menu_ocr import ocr_images
+from ocr_cache import OCRCache
+
+CALLS_FILE = "calls.log"
+
+
+def counting_ocr(path, psm=6, scale=None, lang="eng", backend=None):
+    """Fake OCR that logs each call next to the image so pool workers are counted too."""
+    path = Path(path)
+    with open(path.parent / CALLS_FILE, "a") as f:
+        f.write(f"{path.name}\n")
+    return f"{path.read_text()} psm={psm}"
+
+
+def ocr_calls(folder):
+    log = folder / CALLS_FILE
+    return log.read_text().split() if log.exists() else []
+
+
+@pytest.fixture
+def images(tmp_path):
+    folder = tmp_path / "images"
+    folder.mkdir()
+    paths = []
+    for name, content in [("a.jpg", "menu A"), ("b.jpg", "menu B"), ("a_copy.jpg", "menu A")]:
+        (folder / name).write_text(content)
+        paths.append(folder / name)
+    return paths
+
+
+class TestOCRCache:
+    def test_key_depends_on_content_and_params(self, images):
+        a, b, a_copy = images
+        assert OCRCache.key(a, 6, 2, "eng") == OCRCache.key(a_copy, 6, 2, "eng")
+        assert OCRCache.key(a, 6, 2, "eng") != OCRCache.key(b, 6, 2, "eng")
+        assert OCRCache.key(a, 6, 2, "eng") != OCRCache.key(a, 4, 2, "eng")
+        assert OCRCache.key(a, 6, 2, "eng") != OCRCache.key(a, 6, 3, "eng")
+        assert OCRCache.key(a, 6, 2, "eng") != OCRCache.key(a, 6, 2, "deu")
+        assert OCRCache.key(a, 6, 2, "eng") != OCRCache.key(a, 6, 2, "eng", backend="fake")
+
+    def test_put_get_and_persistence(self, tmp_path):
+        cache = OCRCache(tmp_path / "cache")
+        assert cache.get("k") is None
+        cache.put("k", "text", {"source_file": "a.jpg"})
+        entry = OCRCache(tmp_path / "cache").get("k")
+        assert entry["text"] == "text"
+        assert entry["metadata"]["source_file"] == "a.jpg"
+        assert cache.stats()["hit_rate"] == 0.0
+
+    def test_size_eviction_drops_least_recently_used(self, tmp_path):
+        cache = OCRCache(tmp_path / "cache", max_bytes=250)
+        cache.put("old", "x" * 60)
+        cache.put("used", "y" * 60)
+        os.utime(cache.cache_dir / "old.json", (1, 1))
+        os.utime(cache.cache_dir / "used.json", (2, 2))
+        cache.get("used")
+        cache.put("new", "z" * 60)
+        assert cache.get("old") is None
+        assert cache.get("used") is not None
+        assert cache.get("new") is not None
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] <= 250
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_ocr_images_skips_cached_images(self, tmp_path, images, workers):
+        cache = OCRCache(tmp_path / "cache")
+        first = list(ocr_images(images, workers=workers, ocr_fn=counting_ocr, cache=cache))
+        # The renamed duplicate is looked up before "a.jpg" has been stored in
+        # pool mode, so it may be OCRed once; a second run hits every image
+        calls_after_first = len(ocr_calls(images[0].parent))
+        second = list(ocr_images(images, workers=workers, ocr_fn=counting_ocr, cache=cache))
+
+        assert [r.text for r in second] == [r.text for r in first] == ["menu A psm=6", "menu B psm=6", "menu A psm=6"]
+        assert all(r.cached for r in second)
+        assert len(ocr_calls(images[0].parent)) == calls_after_first
+        if workers == 1:
+            assert calls_after_first == 2
+            assert first[2].cached
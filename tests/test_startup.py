@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+from bench_startup import HEAVY_MODULES, measure_startup, parse_importtime
+
+
+def test_parse_importtime():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |   _io",
+        "import time:        30 |         30 |     numpy.core",
+        "import time:       500 |        650 | flaskr",
+        "unrelated warning",
+    ])
+    assert parse_importtime(stderr) == [
+        ("_io", 120, 120, 1),
+        ("numpy.core", 30, 30, 2),
+        ("flaskr", 500, 650, 0),
+    ]
+
+
+def test_create_app_skips_heavy_modules():
+    result = measure_startup()
+    assert result["imports"]
+    assert result["heavy"] == [], f"create_app imported {result['heavy']}; import them where they are used"
+
+
+def test_guard_detects_heavy_imports():
+    assert "numpy" in HEAVY_MODULES
+    assert measure_startup("import numpy")["heavy"] == ["numpy"]
@@ -0,0 +1,70 @@
+import gzip
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from static_payload import MIN_COMPRESS_BYTES, StaticPayload
+
+BODY = json.dumps({"allergens": [f"allergen {i}" for i in range(100)]}).encode("utf-8")
+
+
+class TestStaticPayload:
+    def test_etag_follows_version(self):
+        assert StaticPayload(BODY, version="v1").variants[None][0] == StaticPayload(b"{}", version="v1").variants[None][0]
+        assert StaticPayload(BODY).variants[None][0] != StaticPayload(BODY + b" ").variants[None][0]
+
+    def test_gzip_variant(self):
+        payload = StaticPayload(BODY)
+        encoding, etag, body = payload.select({"gzip": 1.0, "deflate": 1.0})
+        assert encoding == "gzip"
+        assert etag.endswith("-gzip") and etag != payload.variants[None][0]
+        assert gzip.decompress(body) == BODY
+
+    def test_identity_when_not_accepted(self):
+        payload = StaticPayload(BODY)
+        assert payload.select({}) == (None, payload.variants[None][0], BODY)
+        assert payload.select({"gzip": 0.0})[0] is None
+
+    def test_small_bodies_not_compressed(self):
+        payload = StaticPayload(b"x" * (MIN_COMPRESS_BYTES - 1))
+        assert list(payload.variants) == [None]
+
+    def test_cache_control(self):
+        assert StaticPayload(BODY, max_age=60).cache_control == "public, max-age=60"
+
+
+class TestCachedRoutes:
+    def setup_method(self):
+        sys.path.insert(0, str(Path(__file__).parent.parent))
+        from flaskr import create_app
+        self.client = create_app({"TESTING": True, "API_CACHE_MAX_AGE": 120}).test_client()
+
+    def test_allergens_headers_and_304(self):
+        first = self.client.get("/api/allergens")
+        assert first.status_code == 200
+        assert first.headers["Cache-Control"] == "public, max-age=120"
+        assert first.headers["Vary"] == "Accept-Encoding"
+        etag = first.headers["ETag"]
+
+        again = self.client.get("/api/allergens", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.data == b""
+        assert again.headers["ETag"] == etag
+
+        stale = self.client.get("/api/allergens", headers={"If-None-Match": '"other"'})
+        assert stale.status_code == 200
+
+    def test_menu_gzip(self):
+        response = self.client.get("/api/menu", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["Content-Encoding"] == "gzip"
+        menu = json.loads(gzip.decompress(response.data))
+        assert menu["success"] is True
+        assert menu["menu"][0]["meal"] == "Margherita Pizza"
+
+        revalidated = self.client.get(
+            "/api/menu",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]}
+        )
+        assert revalidated.status_code == 304
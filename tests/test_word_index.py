@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from word_index import WordIndex
+
+
+class TestWordIndex:
+    def setup_method(self):
+        self.index = WordIndex([(0, 'none'), (1, 'the'), (2, 'and'), (5, 'Ocean')])
+
+    def test_number_to_word(self):
+        assert self.index.word_for(0) == 'none'
+        assert self.index.word_for(5) == 'ocean'
+
+    def test_word_to_number(self):
+        assert self.index.number_for('and') == 2
+        assert self.index.number_for('OCEAN') == 5
+
+    def test_missing_entries(self):
+        assert self.index.word_for(3) is None
+        assert self.index.word_for(100) is None
+        assert self.index.word_for(-1) is None
+        assert self.index.number_for('maple') is None
+
+    def test_len_and_contains(self):
+        assert len(self.index) == 4
+        assert 'the' in self.index
+        assert 'maple' not in self.index
+
+    def test_from_mapping(self):
+        index = WordIndex.from_mapping({1: 'the', 0: 'none'})
+        assert index.number_for('the') == 1
+
+    def test_negative_number_rejected(self):
+        with pytest.raises(ValueError):
+            WordIndex([(-1, 'bad')])
+
+    def test_batch_lookups_preserve_order(self):
+        assert self.index.words_for([5, 3, 0]) == ['ocean', None, 'none']
+        assert self.index.numbers_for(['the', 'maple', 'Ocean']) == [1, None, 5]
@@ -0,0 +1,96 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from word_table import MappedWordTable, WordTableError, write_word_table
+
+ROWS = [(0, 'none'), (1, 'the'), (2, 'and'), (4, 'café'), (3, 'Ocean')]
+
+
+class TestWordTable:
+    def setup_method(self):
+        self.table = None
+
+    def teardown_method(self):
+        if self.table is not None:
+            self.table.close()
+
+    def open(self, tmp_path, rows=ROWS):
+        path = tmp_path / 'words.bin'
+        write_word_table(path, rows)
+        self.table = MappedWordTable(path)
+        return path
+
+    def test_lookups_both_ways(self, tmp_path):
+        self.open(tmp_path)
+        for number, word in ROWS:
+            assert self.table.word_for(number) == word.lower()
+            assert self.table.number_for(word.upper()) == number
+        assert len(self.table) == len(ROWS)
+
+    def test_missing_entries(self, tmp_path):
+        self.open(tmp_path, [(0, 'none'), (3, 'gap')])
+        assert self.table.word_for(1) is None
+        assert self.table.word_for(10) is None
+        assert self.table.number_for('absent') is None
+        assert self.table.numbers_for(['gap', 'absent']) == [3, None]
+        assert self.table.words_for([3, 2]) == ['gap', None]
+
+    def test_empty_table(self, tmp_path):
+        self.open(tmp_path, [])
+        assert len(self.table) == 0
+        assert self.table.number_for('the') is None
+
+    def test_corrupt_body_fails_checksum(self, tmp_path):
+        path = tmp_path / 'words.bin'
+        write_word_table(path, ROWS)
+        data = bytearray(path.read_bytes())
+        data[-1] ^= 0xFF
+        path.write_bytes(bytes(data))
+        with pytest.raises(WordTableError):
+            MappedWordTable(path)
+
+    def test_bad_magic(self, tmp_path):
+        path = tmp_path / 'words.bin'
+        path.write_bytes(b'PGDMP' + bytes(64))
+        with pytest.raises(WordTableError):
+            MappedWordTable(path)
+
+    def test_shipped_table_is_valid(self):
+        path = Path(__file__).parent.parent / 'data' / 'word_mapping.bin'
+        self.table = MappedWordTable(path)
+        assert self.table.word_for(0) == 'none'
+        assert self.table.number_for('the') == 1
+
+
+class TestGetterFallback:
+    def test_failed_word_load_falls_back_to_table(self, monkeypatch):
+        import db_manager
+        from allergies_getter import AllergiesGetter
+
+        class FlakyDatabase:
+            def __init__(self, **kwargs):
+                self.closed = False
+
+            def database_exists(self):
+                return True
+
+            def get_total_words(self):
+                return 10
+
+            def get_all_words(self):
+                raise RuntimeError("connection reset")
+
+            def close(self):
+                self.closed = True
+
+        monkeypatch.setattr(db_manager, "DatabaseManager", FlakyDatabase)
+        getter = AllergiesGetter()
+        try:
+            assert getter.use_dump
+            assert getter.db is None
+            assert getter.word_index.word_for(0) == 'none'
+        finally:
+            getter.close()